@@ -1,5 +1,7 @@
+from .content_scanner import ScanCache, scan_patch, scan_patches
 from .deception_agent import calculate_risk, run_deception_agent
-from .dedupe_agent import cluster_prs, run_dedupe_agent
+from .dedupe_agent import cluster_prs, run_dedupe_agent, similar_title_pairs
+from .engine import AGENT_REGISTRY, AgentSpec, register_agent, run_agents
 from .prioritization_agent import calculate_priority
 from .trust_agent import calculate_trust, run_trust_agent
 
@@ -8,7 +10,15 @@ __all__ = [
 	"run_dedupe_agent",
 	"run_trust_agent",
 	"cluster_prs",
+	"similar_title_pairs",
 	"calculate_trust",
 	"calculate_risk",
 	"calculate_priority",
+	"AGENT_REGISTRY",
+	"AgentSpec",
+	"register_agent",
+	"run_agents",
+	"ScanCache",
+	"scan_patch",
+	"scan_patches",
 ]
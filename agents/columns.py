@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def records_frame(pr_records: list[dict[str, object]]) -> pd.DataFrame:
+	"""Builds a PR frame from ``run_*_agent`` style records (``number`` -> ``pr_number``)."""
+	return pd.DataFrame(pr_records).rename(columns={"number": "pr_number"})
+
+
+def numeric_column(df: pd.DataFrame, column: str, default: float) -> np.ndarray:
+	"""Returns ``df[column]`` as a float64 array, or ``default`` when the column is absent."""
+	if column not in df.columns:
+		return np.full(len(df), default, dtype=np.float64)
+	return df[column].to_numpy(dtype=np.float64)
+
+
+def clamp_scores(values: np.ndarray, lower: float = 0.0, upper: float = 100.0) -> np.ndarray:
+	"""Vectorised ``max(lower, min(upper, value))``.
+
+	Builtin ``min(upper, nan)`` returns ``upper``, so NaN clamps to ``upper`` here too.
+	"""
+	return np.where(np.isnan(values), upper, np.clip(values, lower, upper))
+
+
+def round_scores(values: np.ndarray, ndigits: int = 2) -> np.ndarray:
+	"""Rounds like builtin ``round``; ``np.round`` scales by 10**n and can differ in the last bit."""
+	return np.fromiter((round(value, ndigits) for value in values.tolist()), dtype=np.float64, count=len(values))
+
+
+def score_bands(scores: np.ndarray, *, high: float, medium: float) -> np.ndarray:
+	return np.select([scores >= high, scores >= medium], ["high", "medium"], default="low").astype(object)
+
+
+def top_k_indices(keys: Sequence[np.ndarray], k: int, *, ascending: Sequence[bool] | None = None) -> np.ndarray:
+	"""Row positions of the first ``k`` rows when sorted by ``keys`` (then by position).
+
+	Same order as a stable multi-column ``sort_values(...).head(k)``, but only the rows
+	tied with or ahead of the k-th primary key (found with ``np.partition`` in O(n)) are
+	sorted, so selecting a short list from a large frame stays linear.
+	"""
+	directions = list(ascending) if ascending is not None else [True] * len(keys)
+	signed = [
+		np.asarray(key, dtype=np.float64) if direction else -np.asarray(key, dtype=np.float64)
+		for key, direction in zip(keys, directions)
+	]
+	rows = len(signed[0]) if signed else 0
+	k = max(0, min(k, rows))
+	if not k:
+		return np.empty(0, dtype=np.int64)
+
+	candidates = np.arange(rows)
+	primary = signed[0]
+	if k < rows:
+		threshold = np.partition(primary, k - 1)[k - 1]
+		if not np.isnan(threshold):
+			candidates = np.flatnonzero(primary <= threshold)
+	order = np.lexsort((candidates, *(key[candidates] for key in reversed(signed))))
+	return candidates[order[:k]]
+
+
+def top_k_rows(df: pd.DataFrame, by: Sequence[str], k: int, *, ascending: Sequence[bool] | None = None) -> pd.DataFrame:
+	"""``df.sort_values(by, ascending=ascending).head(k)`` via :func:`top_k_indices`."""
+	return df.iloc[top_k_indices([df[column].to_numpy() for column in by], k, ascending=ascending)]
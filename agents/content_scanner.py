@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import math
+import re
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from memory.patch_store import DEFAULT_PATCH_STORE, PatchStore
+from metrics import record_cache
+
+from .engine import AgentSpec, process_pool_context, register_agent
+
+LOGGER = logging.getLogger(__name__)
+
+FINDING_KINDS = ("secret", "encoded_blob", "high_entropy", "obfuscation")
+MAX_LINE_LENGTH = 4096
+MIN_ENTROPY_TOKEN_LENGTH = 32
+ENTROPY_THRESHOLD = 4.5
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+# One alternation, tried left to right at each position: specific credential shapes win
+# over generic blobs, and generic blobs over the entropy candidate.
+_PATTERNS: tuple[tuple[str, str, str], ...] = (
+	("aws_key", "secret", r"\bAKIA[0-9A-Z]{16}\b"),
+	("github_token", "secret", r"\bgh[pousr]_[A-Za-z0-9]{36,}"),
+	("slack_token", "secret", r"\bxox[abprs]-[A-Za-z0-9-]{10,}"),
+	("private_key", "secret", r"-----BEGIN (?:[A-Z]+ )?PRIVATE KEY-----"),
+	(
+		"assigned_secret",
+		"secret",
+		r"(?i:\b(?:password|passwd|secret|api_?key|access_?token|auth_?token)\b\s*[:=]\s*['\"][^'\"\s]{8,}['\"])",
+	),
+	("base64_blob", "encoded_blob", r"[A-Za-z0-9+/]{80,}={0,2}"),
+	("hex_blob", "encoded_blob", r"\b[0-9a-fA-F]{64,}\b"),
+	("escaped_bytes", "obfuscation", r"(?:\\x[0-9a-fA-F]{2}){8,}"),
+	(
+		"dynamic_eval",
+		"obfuscation",
+		r"\b(?:eval|exec)\s*\(\s*(?:atob|base64\.b64decode|codecs\.decode|bytes\.fromhex|zlib\.decompress)"
+		r"|String\.fromCharCode\s*\((?:\s*\d+\s*,){8,}"
+		r"|\bnew\s+Function\s*\(\s*atob",
+	),
+	("entropy_candidate", "high_entropy", r"[A-Za-z0-9+/=_\-]{%d,}" % MIN_ENTROPY_TOKEN_LENGTH),
+)
+_SCANNER = re.compile("|".join(f"(?P<{name}>{pattern})" for name, _, pattern in _PATTERNS))
+_KIND_BY_GROUP = {name: kind for name, kind, _ in _PATTERNS}
+
+
+def shannon_entropy(token: str) -> float:
+	counts = Counter(token)
+	length = len(token)
+	return -sum((count / length) * math.log2(count / length) for count in counts.values())
+
+
+def added_lines(patch: str) -> Iterator[str]:
+	"""Streams added lines of a unified diff, truncated to ``MAX_LINE_LENGTH``.
+
+	``+++ `` file headers are only skipped before a file's first ``@@`` hunk, so added
+	lines whose content starts with ``++`` (``+++i;``) are still scanned.
+	"""
+	in_hunk = False
+	for line in io.StringIO(patch):
+		if line.startswith("@@"):
+			in_hunk = True
+		elif line.startswith("diff "):
+			in_hunk = False
+		elif line.startswith("+") and (in_hunk or not line.startswith("+++ ")):
+			yield line[1:MAX_LINE_LENGTH]
+
+
+def scan_patch(patch: str) -> dict[str, int]:
+	"""Counts findings per kind over the added lines of ``patch``."""
+	findings = dict.fromkeys(FINDING_KINDS, 0)
+	for line in added_lines(patch):
+		for match in _SCANNER.finditer(line):
+			kind = _KIND_BY_GROUP[match.lastgroup]
+			if kind == "high_entropy" and shannon_entropy(match.group()) < ENTROPY_THRESHOLD:
+				continue
+			findings[kind] += 1
+	return findings
+
+
+def _scan_batch(batch: list[tuple[str, str]]) -> list[tuple[str, dict[str, int]]]:
+	return [(key, scan_patch(patch)) for key, patch in batch]
+
+
+class ScanCache:
+	"""Scan results keyed by patch hash, optionally persisted as JSON."""
+
+	def __init__(self, path: str | Path | None = None) -> None:
+		self.path = Path(path) if path else None
+		self.results: dict[str, dict[str, int]] = {}
+		if self.path is not None and self.path.exists():
+			self.results = json.loads(self.path.read_text(encoding="utf-8"))
+
+	def save(self) -> None:
+		if self.path is None:
+			return
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self.path.write_text(json.dumps(self.results), encoding="utf-8")
+
+
+DEFAULT_SCAN_CACHE = ScanCache()
+
+
+def _batches(patches: Iterable[tuple[str, str]], max_bytes: int) -> Iterator[list[tuple[str, str]]]:
+	batch: list[tuple[str, str]] = []
+	size = 0
+	for key, patch in patches:
+		batch.append((key, patch))
+		size += len(patch)
+		if size >= max_bytes:
+			yield batch
+			batch, size = [], 0
+	if batch:
+		yield batch
+
+
+def scan_patches(
+	patch_keys: Iterable[str],
+	*,
+	store: PatchStore | None = None,
+	cache: ScanCache | None = None,
+	workers: int | None = None,
+	max_batch_bytes: int = MAX_BATCH_BYTES,
+) -> dict[str, dict[str, int]]:
+	"""Scans every patch not yet in ``cache`` and returns findings for all ``patch_keys``.
+
+	Patch text is resolved from ``store`` lazily, one batch of at most ``max_batch_bytes``
+	at a time; with ``workers > 1`` at most ``2 * workers`` batches are in flight, which
+	bounds memory in the parent and in each worker.
+	"""
+	store = store if store is not None else DEFAULT_PATCH_STORE
+	cache = cache if cache is not None else DEFAULT_SCAN_CACHE
+	keys = list(dict.fromkeys(key for key in patch_keys if key))
+	missing = [key for key in keys if key not in cache.results]
+	LOGGER.info("Content scan: %s patches, %s cached, %s to scan", len(keys), len(keys) - len(missing), len(missing))
+	record_cache("content_scan", hits=len(keys) - len(missing), misses=len(missing))
+
+	pending = ((key, store.get(key)) for key in missing)
+	if workers is None or workers <= 1:
+		for batch in _batches(pending, max_batch_bytes):
+			cache.results.update(_scan_batch(batch))
+	else:
+		with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as executor:
+			in_flight: list[Future] = []
+			for batch in _batches(pending, max_batch_bytes):
+				in_flight.append(executor.submit(_scan_batch, batch))
+				if len(in_flight) >= 2 * workers:
+					cache.results.update(in_flight.pop(0).result())
+			for future in in_flight:
+				cache.results.update(future.result())
+
+	return {key: cache.results[key] for key in keys}
+
+
+def _file_patch_key(item: dict[str, object], store: PatchStore) -> str:
+	key = str(item.get("patch_sha") or "")
+	if key or item.get("patch") is None:
+		return key
+	patch = str(item["patch"])
+	if not patch:
+		return ""
+	key = hashlib.sha256(patch.encode("utf-8")).hexdigest()
+	if key not in store:
+		store.put(patch)
+	return key
+
+
+def content_scan_columns(
+	pr_df: pd.DataFrame,
+	*,
+	workers: int | None = None,
+	cache: ScanCache | None = None,
+	store: PatchStore | None = None,
+) -> dict[str, np.ndarray]:
+	"""Content scan kernel; returns per-kind finding counts aligned with ``pr_df`` rows."""
+	store = store if store is not None else DEFAULT_PATCH_STORE
+	cache = cache if cache is not None else DEFAULT_SCAN_CACHE
+	files_per_pr = pr_df["files"].tolist() if "files" in pr_df.columns else [None] * len(pr_df)
+	keys_per_pr = [
+		[_file_patch_key(item, store) for item in files] if isinstance(files, list) else [] for files in files_per_pr
+	]
+
+	findings = scan_patches((key for keys in keys_per_pr for key in keys), store=store, cache=cache, workers=workers)
+	cache.save()
+
+	columns = {kind: np.zeros(len(pr_df), dtype=np.int64) for kind in FINDING_KINDS}
+	for row, keys in enumerate(keys_per_pr):
+		for key in set(keys):
+			if not key:
+				continue
+			for kind, count in findings[key].items():
+				columns[kind][row] += count
+	return {
+		"pr_number": pr_df["pr_number"].to_numpy(dtype=np.int64),
+		**{f"content_{kind}_hits": counts for kind, counts in columns.items()},
+	}
+
+
+register_agent(
+	AgentSpec(
+		name="content_scan",
+		inputs=("files",),
+		outputs=tuple(f"content_{kind}_hits" for kind in FINDING_KINDS),
+		compute=content_scan_columns,
+	)
+)
@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import logging
 
+import numpy as np
 import pandas as pd
 
+from .columns import records_frame
+from .engine import AgentSpec, register_agent
+from .path_rules import CompiledPathRules, PathRule
+from .rules import RISK_RULES, CompiledRuleSet, compile_rule_set, rule_option_inputs
+
 LOGGER = logging.getLogger(__name__)
 
 SENSITIVE_FILE_HINTS = (
@@ -15,85 +21,88 @@ SENSITIVE_FILE_HINTS = (
 	".github/workflows",
 )
 
+DEFAULT_SENSITIVE_PATH_RULES = CompiledPathRules(
+	PathRule(name=f"sensitive:{hint}", pattern=hint, kind="substring") for hint in SENSITIVE_FILE_HINTS
+)
+DEFAULT_RISK_RULES = compile_rule_set(RISK_RULES)
+
 
-def run_deception_agent(pr_records: list[dict[str, object]]) -> dict[int, dict[str, object]]:
+def run_deception_agent(
+	pr_records: list[dict[str, object]],
+	*,
+	path_rules: CompiledPathRules | None = None,
+	rules: CompiledRuleSet | None = None,
+) -> dict[int, dict[str, object]]:
+	"""Record-based risk scores (0-1) from the same rule set as ``calculate_risk``."""
 	LOGGER.info("Running deception agent on %s PRs", len(pr_records))
 	output: dict[int, dict[str, object]] = {}
-
-	for pr in pr_records:
-		number = int(pr["number"])
-		additions = int(pr.get("additions", 0))
-		deletions = int(pr.get("deletions", 0))
-		changed_files = int(pr.get("changed_files", 0))
-		files = pr.get("files", [])
-
-		risk_flags: list[str] = []
-		risk_score = 0.0
-
-		if additions + deletions > 4000:
-			risk_flags.append("very_large_change")
-			risk_score += 0.35
-
-		if changed_files > 70:
-			risk_flags.append("high_file_spread")
-			risk_score += 0.25
-
-		for file_item in files if isinstance(files, list) else []:
-			filename = str(file_item.get("filename", "")).lower()
-			if any(token in filename for token in SENSITIVE_FILE_HINTS):
-				risk_flags.append("sensitive_file_touched")
-				risk_score += 0.2
-				break
-
-		risk_score = min(1.0, risk_score)
-		output[number] = {
-			"risk_flags": sorted(set(risk_flags)),
-			"risk_score": round(risk_score, 3),
+	if not pr_records:
+		return output
+
+	columns = risk_columns(records_frame(pr_records), path_rules=path_rules, rules=rules)
+	for number, score, flags in zip(columns["pr_number"], columns["risk_score"], columns["risk_flags"]):
+		output[int(number)] = {
+			"risk_flags": sorted(flags.split(",")) if flags else [],
+			"risk_score": round(float(score) / 100, 3),
 		}
 
 	LOGGER.info("Deception agent finished")
 	return output
 
 
-def calculate_risk(pr_df: pd.DataFrame) -> pd.DataFrame:
+def calculate_risk(
+	pr_df: pd.DataFrame,
+	*,
+	path_rules: CompiledPathRules | None = None,
+	rules: CompiledRuleSet | None = None,
+) -> pd.DataFrame:
 	"""Calculates risk/deception score (0-100) from change surface and touched files."""
 	LOGGER.info("Calculating risk for %s PRs", len(pr_df))
 	if pr_df.empty:
 		return pd.DataFrame(columns=["pr_number", "risk_score", "risk_band"])
 
-	rows: list[dict[str, float | int | str]] = []
-	for _, pr in pr_df.iterrows():
-		risk_score = 0.0
-		additions = float(pr.get("additions", 0))
-		deletions = float(pr.get("deletions", 0))
-		changed_files = float(pr.get("changed_files", 0))
-		files = pr.get("files", [])
-
-		if additions + deletions > 4000:
-			risk_score += 35
-		if changed_files > 70:
-			risk_score += 30
-		if additions > deletions * 4 and additions > 1000:
-			risk_score += 15
-
-		if isinstance(files, list):
-			for item in files:
-				filename = str(item.get("filename", "")).lower()
-				if any(token in filename for token in SENSITIVE_FILE_HINTS):
-					risk_score += 20
-					break
-
-		risk_score = max(0.0, min(100.0, risk_score))
-		band = "high" if risk_score >= 50 else "medium" if risk_score >= 20 else "low"
-		rows.append(
-			{
-				"pr_number": int(pr["pr_number"]),
-				"risk_score": round(risk_score, 2),
-				"risk_band": band,
-			}
-		)
-
-	risk_df = pd.DataFrame(rows)
+	columns = risk_columns(pr_df, path_rules=path_rules, rules=rules)
+	risk_df = pd.DataFrame({name: columns[name] for name in ("pr_number", "risk_score", "risk_band")})
 	LOGGER.info("Risk report generated")
 	return risk_df
 
+
+def risk_columns(
+	pr_df: pd.DataFrame,
+	*,
+	path_rules: CompiledPathRules | None = None,
+	rules: CompiledRuleSet | None = None,
+) -> dict[str, np.ndarray]:
+	"""Vectorised risk kernel; returns output columns aligned with ``pr_df`` rows.
+
+	The sensitive-path contribution is the highest weight among the path rules matched
+	by any of the PR's files; matched rule names are reported in ``risk_path_rules``.
+	Fired risk rules are reported in ``risk_flags`` and per-rule contributions in
+	``risk_rule_<name>``.
+	"""
+	matcher = path_rules if path_rules is not None else DEFAULT_SENSITIVE_PATH_RULES
+	rule_set = rules if rules is not None else DEFAULT_RISK_RULES
+	files = pr_df["files"] if "files" in pr_df.columns else [None] * len(pr_df)
+	matched_rules = [matcher.match_files(item) for item in files]
+	path_weight = np.fromiter((matcher.max_weight(names) for names in matched_rules), dtype=np.float64, count=len(pr_df))
+
+	result = rule_set.evaluate(rule_set.extract_features(pr_df, {"sensitive_path_weight": path_weight}))
+	return {
+		"pr_number": pr_df["pr_number"].to_numpy(dtype=np.int64),
+		"risk_score": result["score"],
+		"risk_band": result["band"],
+		"risk_flags": result["reasons"],
+		"risk_path_rules": np.array([",".join(sorted(names)) for names in matched_rules], dtype=object),
+		**{f"risk_{name}": values for name, values in result.items() if name.startswith("rule_")},
+	}
+
+
+register_agent(
+	AgentSpec(
+		name="risk",
+		inputs=tuple(sorted(DEFAULT_RISK_RULES.input_columns() - {"sensitive_path_weight"} | {"files"})),
+		outputs=("risk_score", "risk_band", "risk_flags", "risk_path_rules"),
+		compute=risk_columns,
+		option_inputs=rule_option_inputs,
+	)
+)
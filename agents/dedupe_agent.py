@@ -1,68 +1,380 @@
 from __future__ import annotations
 
+import bisect
 import logging
+import math
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
+from typing import Iterable, Iterator, Mapping
 
 import pandas as pd
 
+from .engine import AgentSpec, process_pool_context, register_agent
+from .patch_fingerprint import find_patch_duplicates
+
 LOGGER = logging.getLogger(__name__)
 
+DUPLICATE_SIMILARITY_THRESHOLD = 0.92
+DEFAULT_PAIR_BLOCK_SIZE = 256
+
+_WORKER_TITLES: tuple[str, ...] = ()
+
+
+def _init_pair_worker(titles: tuple[str, ...]) -> None:
+	global _WORKER_TITLES
+	_WORKER_TITLES = titles
+
+
+def _score_block(
+	titles: tuple[str, ...] | list[str],
+	bounds: tuple[int, int, int, int],
+	threshold: float,
+) -> list[tuple[int, int, float]]:
+	row_start, row_stop, col_start, col_stop = bounds
+	matches: list[tuple[int, int, float]] = []
+	for i in range(row_start, row_stop):
+		left_title = titles[i]
+		for j in range(max(i + 1, col_start), col_stop):
+			similarity = SequenceMatcher(a=left_title, b=titles[j]).ratio()
+			if similarity >= threshold:
+				matches.append((i, j, similarity))
+	return matches
+
+
+def _score_block_in_worker(bounds: tuple[int, int, int, int], threshold: float) -> list[tuple[int, int, float]]:
+	return _score_block(_WORKER_TITLES, bounds, threshold)
+
+
+def _pair_blocks(count: int, block_size: int) -> Iterator[tuple[int, int, int, int]]:
+	"""Yields the upper-triangular tiles of the ``count x count`` pair space."""
+	for row_start in range(0, count, block_size):
+		row_stop = min(count, row_start + block_size)
+		for col_start in range(row_start, count, block_size):
+			yield row_start, row_stop, col_start, min(count, col_start + block_size)
+
+
+def similar_title_pairs(
+	titles: list[str],
+	*,
+	threshold: float = DUPLICATE_SIMILARITY_THRESHOLD,
+	workers: int | None = None,
+	block_size: int = DEFAULT_PAIR_BLOCK_SIZE,
+) -> list[tuple[int, int, float]]:
+	"""Returns ``(i, j, similarity)`` for every title pair ``i < j`` above ``threshold``.
+
+	This compares every pair; it is the reference ``indexed_title_pairs`` (which the
+	dedupe agent uses) must reproduce.
+
+	With ``workers > 1`` the pair space is split into tiles scored in a process pool;
+	titles are shipped once per worker. Matches are always returned in ``(i, j)`` order
+	so callers see exactly what the serial loop would produce.
+	"""
+	if workers is None or workers <= 1 or len(titles) < 2:
+		return _score_block(titles, (0, len(titles), 0, len(titles)), threshold)
+
+	blocks = list(_pair_blocks(len(titles), max(1, block_size)))
+	LOGGER.info(
+		"Scoring %s title pairs in %s blocks across %s workers",
+		len(titles) * (len(titles) - 1) // 2,
+		len(blocks),
+		workers,
+	)
+	matches: list[tuple[int, int, float]] = []
+	with ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=process_pool_context(),
+		initializer=_init_pair_worker,
+		initargs=(tuple(titles),),
+	) as executor:
+		futures = [executor.submit(_score_block_in_worker, block, threshold) for block in blocks]
+		for future in futures:
+			matches.extend(future.result())
+
+	matches.sort(key=lambda match: (match[0], match[1]))
+	return matches
+
+
+def _title_tokens(title: str) -> Iterator[tuple[str, int]]:
+	"""Characters as ``(char, occurrence)`` tokens, so multiset overlap is set overlap."""
+	for char, count in Counter(title).items():
+		for occurrence in range(count):
+			yield char, occurrence
+
+
+def _char_overlap(left: dict[str, int], right: dict[str, int]) -> int:
+	"""``sum((Counter(a) & Counter(b)).values())`` from precomputed counts, without a Counter."""
+	get = right.get
+	return sum([count if count < (other := get(char, 0)) else other for char, count in left.items()])
+
+
+class TitleCandidateIndex:
+	"""Prefix-filter index for finding the title pairs of ``similar_title_pairs`` quickly.
+
+	``SequenceMatcher.ratio()`` never exceeds the overlap of the two titles' character
+	multisets (``quick_ratio()``), so a pair can only reach ``threshold`` if the titles
+	share one of their rarest ``len - ceil(threshold * len / (2 - threshold)) + 1``
+	characters. Each distinct title probes the postings of those prefix characters and
+	only the candidates found are compared with ``ratio()`` (once per distinct pair of
+	titles): the result is exactly the brute-force pair set. Built once over all titles,
+	it can be shared by shards that each ask for the pairs of their own rows.
+
+	``known`` holds the ``title_matches()`` of an earlier index with the same threshold:
+	a title found there is only compared with the titles that are not, so a resident
+	process re-scores just the new or retitled PRs each cycle.
+	"""
+
+	def __init__(
+		self,
+		titles: list[str],
+		*,
+		threshold: float = DUPLICATE_SIMILARITY_THRESHOLD,
+		known: Mapping[str, Mapping[str, float]] | None = None,
+	) -> None:
+		self.threshold = threshold
+		self._known = known or {}
+		self._title_ids: list[int] = []
+		distinct: dict[str, int] = {}
+		self._rows: list[list[int]] = []
+		for row, title in enumerate(titles):
+			title_id = distinct.setdefault(title, len(distinct))
+			if title_id == len(self._rows):
+				self._rows.append([])
+			self._rows[title_id].append(row)
+			self._title_ids.append(title_id)
+		self._titles = list(distinct)
+		self._ids = distinct
+		self._counts = [dict(Counter(title)) for title in self._titles]
+
+		# Two passes over the titles, so only one title's tokens exist at a time.
+		frequency = Counter(token for title in self._titles for token in _title_tokens(title))
+		self._prefixes: list[list[tuple[str, int]]] = []
+		self._postings: dict[tuple[str, int], list[int]] = defaultdict(list)
+		for title_id, title in enumerate(self._titles):
+			title_tokens = sorted(_title_tokens(title), key=lambda token: (frequency[token], token))
+			required = math.ceil(threshold * len(title_tokens) / (2 - threshold) - 1e-9)
+			prefix = title_tokens[: max(0, len(title_tokens) - required + 1)]
+			self._prefixes.append(prefix)
+			for token in prefix:
+				self._postings[token].append(title_id)
+		self._matches: dict[int, list[tuple[int, float]]] = {}
+
+	def __len__(self) -> int:
+		return len(self._title_ids)
+
+	def _title_matches(self, title_id: int) -> list[tuple[int, float]]:
+		"""Distinct titles ``b`` with ``ratio(a=title, b) >= threshold`` (ratio is asymmetric)."""
+		matches = self._matches.get(title_id)
+		if matches is not None:
+			return matches
+		candidates = {title_id}
+		for token in self._prefixes[title_id]:
+			candidates.update(self._postings[token])
+		title = self._titles[title_id]
+		counts = self._counts[title_id]
+		matcher = SequenceMatcher(a=title)
+		matches = []
+		previous = self._known.get(title)
+		if previous is not None:
+			matches = [(self._ids[other], similarity) for other, similarity in previous.items() if other in self._ids]
+			candidates = {other for other in candidates if self._titles[other] not in self._known}
+		for other in sorted(candidates):
+			other_title = self._titles[other]
+			total = len(title) + len(other_title)
+			# real_quick_ratio() and quick_ratio(), upper bounds of ratio() as in
+			# difflib.get_close_matches, from lengths and cached counts: set_seq2 is costly.
+			if total and (
+				2 * min(len(title), len(other_title)) < self.threshold * total
+				or 2 * _char_overlap(counts, self._counts[other]) < self.threshold * total
+			):
+				continue
+			matcher.set_seq2(other_title)
+			similarity = matcher.ratio()
+			if similarity >= self.threshold:
+				matches.append((other, similarity))
+		matches.sort()
+		self._matches[title_id] = matches
+		return matches
+
+	def title_matches(self) -> dict[str, dict[str, float]]:
+		"""Every title's matches by title text, to seed the ``known`` of a later index."""
+		return {
+			self._titles[title_id]: {self._titles[other]: similarity for other, similarity in self._title_matches(title_id)}
+			for title_id in range(len(self._titles))
+		}
+
+	def pairs(self, rows: Iterable[int] | None = None) -> list[tuple[int, int, float]]:
+		"""``(i, j, similarity)`` for ``i`` in ``rows`` (default: all) and any ``j > i``."""
+		rows = range(len(self._title_ids)) if rows is None else sorted(rows)
+		pairs: list[tuple[int, int, float]] = []
+		for i in rows:
+			row_pairs: list[tuple[int, int, float]] = []
+			for other, similarity in self._title_matches(self._title_ids[i]):
+				other_rows = self._rows[other]
+				start = bisect.bisect_right(other_rows, i)
+				row_pairs.extend((i, j, similarity) for j in other_rows[start:])
+			row_pairs.sort()
+			pairs.extend(row_pairs)
+		return pairs
+
+
+_WORKER_INDEX: TitleCandidateIndex | None = None
+
+
+def _init_index_worker(index: TitleCandidateIndex) -> None:
+	global _WORKER_INDEX
+	_WORKER_INDEX = index
+
+
+def _index_pairs_in_worker(bounds: tuple[int, int]) -> list[tuple[int, int, float]]:
+	return _WORKER_INDEX.pairs(range(*bounds))
+
 
-def run_dedupe_agent(pr_records: list[dict[str, object]]) -> dict[int, dict[str, object]]:
+def indexed_title_pairs(
+	titles: list[str],
+	*,
+	threshold: float = DUPLICATE_SIMILARITY_THRESHOLD,
+	workers: int | None = None,
+	block_size: int = DEFAULT_PAIR_BLOCK_SIZE,
+) -> list[tuple[int, int, float]]:
+	"""``similar_title_pairs(titles)`` through a ``TitleCandidateIndex``.
+
+	With ``workers > 1`` blocks of ``block_size`` rows ask the index for their pairs in a
+	process pool; the index is shipped once per worker and blocks are merged in row order.
+	"""
+	index = TitleCandidateIndex(titles, threshold=threshold)
+	if workers is None or workers <= 1 or len(titles) < 2:
+		return index.pairs()
+	blocks = [(start, min(len(titles), start + block_size)) for start in range(0, len(titles), max(1, block_size))]
+	LOGGER.info("Matching %s titles in %s blocks across %s workers", len(titles), len(blocks), workers)
+	with ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=process_pool_context(),
+		initializer=_init_index_worker,
+		initargs=(index,),
+	) as executor:
+		return [pair for block in executor.map(_index_pairs_in_worker, blocks) for pair in block]
+
+
+def run_dedupe_agent(
+	pr_records: list[dict[str, object]],
+	*,
+	workers: int | None = None,
+) -> dict[int, dict[str, object]]:
 	LOGGER.info("Running dedupe agent on %s PRs", len(pr_records))
 	output: dict[int, dict[str, object]] = {
 		int(pr["number"]): {"potential_duplicates": [], "dedupe_score": 0.0}
 		for pr in pr_records
 	}
 
-	for i, left in enumerate(pr_records):
-		for right in pr_records[i + 1 :]:
-			left_number = int(left["number"])
-			right_number = int(right["number"])
-			title_a = str(left.get("title", "")).lower()
-			title_b = str(right.get("title", "")).lower()
-
-			similarity = SequenceMatcher(a=title_a, b=title_b).ratio()
-			if similarity >= 0.92:
-				output[left_number]["potential_duplicates"].append(right_number)
-				output[right_number]["potential_duplicates"].append(left_number)
-				output[left_number]["dedupe_score"] = max(output[left_number]["dedupe_score"], similarity)
-				output[right_number]["dedupe_score"] = max(output[right_number]["dedupe_score"], similarity)
+	numbers = [int(pr["number"]) for pr in pr_records]
+	titles = [str(pr.get("title", "")).lower() for pr in pr_records]
+	for i, j, similarity in indexed_title_pairs(titles, workers=workers):
+		left_number = numbers[i]
+		right_number = numbers[j]
+		output[left_number]["potential_duplicates"].append(right_number)
+		output[right_number]["potential_duplicates"].append(left_number)
+		output[left_number]["dedupe_score"] = max(output[left_number]["dedupe_score"], similarity)
+		output[right_number]["dedupe_score"] = max(output[right_number]["dedupe_score"], similarity)
 
 	LOGGER.info("Dedupe agent finished")
 	return output
 
 
-def cluster_prs(pr_df: pd.DataFrame) -> pd.DataFrame:
-	"""Clusters and deduplicates PRs using title similarity heuristics."""
+def cluster_prs(pr_df: pd.DataFrame, *, workers: int | None = None) -> pd.DataFrame:
+	"""Clusters and deduplicates PRs using title similarity and diff fingerprints."""
 	LOGGER.info("Clustering %s PRs", len(pr_df))
 	if pr_df.empty:
-		return pd.DataFrame(columns=["pr_number", "cluster", "dedupe_score", "duplicate_count"])
+		return pd.DataFrame(
+			columns=[
+				"pr_number",
+				"cluster",
+				"dedupe_score",
+				"duplicate_count",
+				"patch_fingerprint",
+				"patch_duplicate_count",
+				"patch_near_duplicate_count",
+			]
+		)
+
+	cluster_df = pd.DataFrame(cluster_columns(pr_df, workers=workers))
+	LOGGER.info("Cluster report generated")
+	return cluster_df
+
 
-	titles = pr_df["title"].fillna("").astype(str).str.lower().tolist()
+class TitlePairCache:
+	"""Title matches kept between the cycles of a resident process (see ``TitleCandidateIndex``)."""
+
+	def __init__(self, threshold: float = DUPLICATE_SIMILARITY_THRESHOLD) -> None:
+		self.threshold = threshold
+		self.matches: dict[str, dict[str, float]] = {}
+
+	def pairs(self, titles: list[str]) -> list[tuple[int, int, float]]:
+		"""``similar_title_pairs(titles)``, comparing only titles not seen in the last call."""
+		index = TitleCandidateIndex(titles, threshold=self.threshold, known=self.matches)
+		pairs = index.pairs()
+		# Replaced rather than merged: titles of closed or retitled PRs drop out.
+		self.matches = index.title_matches()
+		return pairs
+
+
+def dedupe_titles(pr_df: pd.DataFrame) -> list[str]:
+	return pr_df["title"].fillna("").astype(str).str.lower().tolist()
+
+
+def cluster_columns(
+	pr_df: pd.DataFrame,
+	*,
+	workers: int | None = None,
+	pairs: list[tuple[int, int, float]] | None = None,
+	file_sets: list[frozenset[str]] | None = None,
+	title_cache: TitlePairCache | None = None,
+) -> dict[str, list]:
+	"""Dedupe kernel; returns cluster and duplicate columns aligned with ``pr_df`` rows.
+
+	``pairs`` supplies precomputed ``similar_title_pairs`` output (in ``(i, j)`` order),
+	e.g. merged from the shards of a sharded run; ``file_sets`` supplies per-PR file
+	fingerprints in place of the ``files`` column (see ``find_patch_duplicates``).
+	``title_cache`` reuses the title matches of the previous call.
+	"""
+	titles = dedupe_titles(pr_df)
 	clusters = list(range(len(titles)))
 	dedupe_scores = [0.0 for _ in titles]
 	duplicate_counts = [0 for _ in titles]
 
-	for i, left_title in enumerate(titles):
-		for j in range(i + 1, len(titles)):
-			right_title = titles[j]
-			similarity = SequenceMatcher(a=left_title, b=right_title).ratio()
-			if similarity >= 0.92:
-				clusters[j] = clusters[i]
-				dedupe_scores[i] = max(dedupe_scores[i], similarity)
-				dedupe_scores[j] = max(dedupe_scores[j], similarity)
-				duplicate_counts[i] += 1
-				duplicate_counts[j] += 1
-
-	cluster_df = pd.DataFrame(
-		{
-			"pr_number": pr_df["pr_number"].astype(int).tolist(),
-			"cluster": clusters,
-			"dedupe_score": [round(score * 100, 2) for score in dedupe_scores],
-			"duplicate_count": duplicate_counts,
-		}
-	)
-	LOGGER.info("Cluster report generated")
-	return cluster_df
+	if pairs is None and title_cache is not None:
+		pairs = title_cache.pairs(titles)
+	elif pairs is None:
+		pairs = indexed_title_pairs(titles, workers=workers)
+	for i, j, similarity in pairs:
+		clusters[j] = clusters[i]
+		dedupe_scores[i] = max(dedupe_scores[i], similarity)
+		dedupe_scores[j] = max(dedupe_scores[j], similarity)
+		duplicate_counts[i] += 1
+		duplicate_counts[j] += 1
 
+	files = pr_df["files"].tolist() if "files" in pr_df.columns else [None] * len(titles)
+	return {
+		"pr_number": pr_df["pr_number"].astype(int).tolist(),
+		"cluster": clusters,
+		"dedupe_score": [round(score * 100, 2) for score in dedupe_scores],
+		"duplicate_count": duplicate_counts,
+		**find_patch_duplicates(files, file_sets=file_sets),
+	}
+
+
+register_agent(
+	AgentSpec(
+		name="dedupe",
+		inputs=("title", "files"),
+		outputs=(
+			"cluster",
+			"dedupe_score",
+			"duplicate_count",
+			"patch_fingerprint",
+			"patch_duplicate_count",
+			"patch_near_duplicate_count",
+		),
+		compute=cluster_columns,
+	)
+)
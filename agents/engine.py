@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+from frame_schema import apply_schema
+from metrics import METRICS
+
+LOGGER = logging.getLogger(__name__)
+
+ColumnKernel = Callable[..., dict[str, Any]]
+
+
+def process_pool_context() -> BaseContext:
+	"""Start method for the process pools agents and shards create.
+
+	Those pools are created from ``prion-stage``/``prion-agent`` threads, sometimes two at
+	once. Forking a multi-threaded process copies locks other threads hold (logging,
+	allocator) and can deadlock the child, so workers come from a ``forkserver`` (or
+	``spawn`` where it is unavailable) instead.
+	"""
+	methods = multiprocessing.get_all_start_methods()
+	return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+@dataclass(slots=True, frozen=True)
+class AgentSpec:
+	"""Declares an agent as a column kernel over the shared PR frame.
+
+	``compute`` receives the frame (plus any per-agent options) and returns a mapping of
+	column name to values aligned with the frame rows. ``outputs`` are the columns other
+	agents may depend on; any extra explanatory columns returned are written as well.
+	``option_inputs`` maps the agent's options to further input columns, such as the
+	columns a custom rule set reads.
+	"""
+
+	name: str
+	inputs: tuple[str, ...]
+	outputs: tuple[str, ...]
+	compute: ColumnKernel
+	options: dict[str, Any] = field(default_factory=dict)
+	option_inputs: Callable[[dict[str, Any]], Iterable[str]] | None = None
+
+
+AGENT_REGISTRY: dict[str, AgentSpec] = {}
+
+
+def register_agent(spec: AgentSpec) -> AgentSpec:
+	"""Adds ``spec`` to the registry; the pipeline picks it up without further changes."""
+	AGENT_REGISTRY[spec.name] = spec
+	return spec
+
+
+def _agent_kwargs(spec: AgentSpec, options: dict[str, dict[str, Any]] | None = None) -> dict[str, Any]:
+	return {**spec.options, **(options or {}).get(spec.name, {})}
+
+
+def with_option_inputs(specs: Iterable[AgentSpec], options: dict[str, dict[str, Any]] | None = None) -> list[AgentSpec]:
+	"""``specs`` with the ``option_inputs`` of their per-agent ``options`` added to ``inputs``."""
+	effective: list[AgentSpec] = []
+	for spec in specs:
+		extra = set(spec.option_inputs(_agent_kwargs(spec, options))) if spec.option_inputs is not None else set()
+		extra -= {*spec.inputs, *spec.outputs}
+		effective.append(replace(spec, inputs=spec.inputs + tuple(sorted(extra))) if extra else spec)
+	return effective
+
+
+def execution_levels(specs: Iterable[AgentSpec]) -> list[list[AgentSpec]]:
+	"""Groups agents into levels; agents in one level depend only on earlier levels."""
+	pending = {spec.name: spec for spec in specs}
+	producers = {column: spec.name for spec in pending.values() for column in spec.outputs}
+	levels: list[list[AgentSpec]] = []
+	done: set[str] = set()
+
+	while pending:
+		ready = [
+			spec
+			for spec in pending.values()
+			if all(producers.get(column) in (None, spec.name) or producers[column] in done for column in spec.inputs)
+		]
+		if not ready:
+			raise ValueError(f"Agent dependency cycle between: {sorted(pending)}")
+		for spec in ready:
+			done.add(spec.name)
+			del pending[spec.name]
+		levels.append(ready)
+	return levels
+
+
+def execution_order(specs: Iterable[AgentSpec]) -> list[AgentSpec]:
+	"""Orders agents so every agent runs after the agents producing its inputs."""
+	return [spec for level in execution_levels(specs) for spec in level]
+
+
+def _compute(spec: AgentSpec, frame: pd.DataFrame, kwargs: dict[str, Any]) -> dict[str, Any]:
+	LOGGER.info("Running agent '%s' on %s PRs", spec.name, len(frame))
+	with METRICS.timer("prion_agent_seconds", agent=spec.name):
+		columns = spec.compute(frame, **kwargs)
+	METRICS.inc("prion_rows_processed_total", len(frame), agent=spec.name)
+	missing = [column for column in spec.outputs if column not in columns]
+	if missing:
+		raise ValueError(f"Agent '{spec.name}' did not produce declared outputs: {missing}")
+	return columns
+
+
+def _write(frame: pd.DataFrame, columns: dict[str, Any]) -> None:
+	written = [column for column in columns if column != "pr_number"]
+	for column in written:
+		frame[column] = columns[column]
+	apply_schema(frame, written)
+
+
+def run_agents(
+	frame: pd.DataFrame,
+	*,
+	agents: Iterable[str] | None = None,
+	options: dict[str, dict[str, Any]] | None = None,
+	max_workers: int | None = None,
+) -> pd.DataFrame:
+	"""Runs registered agents over ``frame`` and writes their output columns in place.
+
+	Replaces the per-agent report frames and the ``merge`` chain on ``pr_number``: each
+	kernel reads the columns it declared and its outputs land next to them in the same frame.
+	With ``max_workers > 1`` the agents of one dependency level are computed concurrently
+	in threads; their columns are written once the whole level has finished, so kernels
+	never see the frame change underneath them. Levels follow the effective inputs (see
+	``with_option_inputs``), so the result does not depend on ``max_workers``.
+	"""
+	names = list(AGENT_REGISTRY) if agents is None else list(agents)
+	unknown = [name for name in names if name not in AGENT_REGISTRY]
+	if unknown:
+		raise ValueError(f"Unknown agents: {unknown}")
+
+	for level in execution_levels(with_option_inputs((AGENT_REGISTRY[name] for name in names), options)):
+		if frame.empty:
+			for spec in level:
+				LOGGER.info("Running agent '%s' on %s PRs", spec.name, len(frame))
+				for column in spec.outputs:
+					frame[column] = pd.Series(dtype=object)
+			continue
+
+		calls = [(spec, _agent_kwargs(spec, options)) for spec in level]
+		if not max_workers or max_workers <= 1 or len(level) == 1:
+			for spec, kwargs in calls:
+				_write(frame, _compute(spec, frame, kwargs))
+			continue
+
+		with ThreadPoolExecutor(max_workers=min(max_workers, len(level)), thread_name_prefix="prion-agent") as pool:
+			futures = [pool.submit(_compute, spec, frame, kwargs) for spec, kwargs in calls]
+			results = [future.result() for future in futures]
+		for columns in results:
+			_write(frame, columns)
+	return frame
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import defaultdict
+
+from memory.patch_store import resolve_patch
+
+LOGGER = logging.getLogger(__name__)
+
+NEAR_DUPLICATE_THRESHOLD = 0.8
+MAX_POSTING_LENGTH = 64
+
+_FILE_HEADERS = ("--- a/", "+++ b/", "--- /dev/null", "+++ /dev/null")
+
+
+def normalise_patch(patch: str) -> list[str]:
+	"""Keeps only added/removed lines of a unified diff, with all whitespace removed.
+
+	Context lines, ``@@`` hunk headers (and therefore hunk offsets) and file headers are
+	dropped, so re-indented or rebased copies of the same change normalise identically.
+	GitHub's per-file patches have no file headers, so only ``--- a/``/``+++ b/`` lines
+	before the first hunk count as headers; an added ``++i;`` is a change.
+	"""
+	lines: list[str] = []
+	in_hunk = False
+	for line in patch.splitlines():
+		if line.startswith("@@"):
+			in_hunk = True
+			continue
+		if not line or line[0] not in "+-" or (not in_hunk and line.startswith(_FILE_HEADERS)):
+			continue
+		content = "".join(line[1:].split())
+		if content:
+			lines.append(line[0] + content)
+	return lines
+
+
+def file_fingerprint(filename: str, patch: str) -> str:
+	"""Fingerprint of one file's normalised patch; empty when the patch has no changes."""
+	lines = normalise_patch(patch)
+	if not lines:
+		return ""
+	digest = hashlib.blake2b(digest_size=16)
+	digest.update(filename.encode("utf-8"))
+	for line in lines:
+		digest.update(b"\n")
+		digest.update(line.encode("utf-8"))
+	return digest.hexdigest()
+
+
+def pr_file_fingerprints(files: object) -> frozenset[str]:
+	if not isinstance(files, list):
+		return frozenset()
+	fingerprints = set()
+	for item in files:
+		fingerprint = file_fingerprint(str(item.get("filename", "")), resolve_patch(item))
+		if fingerprint:
+			fingerprints.add(fingerprint)
+	return frozenset(fingerprints)
+
+
+def pr_fingerprint(file_fingerprints: frozenset[str]) -> str:
+	if not file_fingerprints:
+		return ""
+	return hashlib.blake2b("\n".join(sorted(file_fingerprints)).encode("ascii"), digest_size=16).hexdigest()
+
+
+def find_patch_duplicates(
+	files_per_pr: list[object],
+	*,
+	near_threshold: float = NEAR_DUPLICATE_THRESHOLD,
+	max_posting_length: int = MAX_POSTING_LENGTH,
+	file_sets: list[frozenset[str]] | None = None,
+) -> dict[str, list]:
+	"""Groups PRs with identical or near-identical normalised diffs.
+
+	Exact duplicates come from a single hash join on the per-PR fingerprint. Near
+	duplicates come from an inverted index over per-file fingerprints: PRs sharing files
+	are compared by Jaccard similarity of their fingerprint sets. Posting lists longer
+	than ``max_posting_length`` (boilerplate changes shared by many PRs) do not seed
+	candidates, which keeps the second pass linear in the number of files.
+
+	``file_sets`` supplies precomputed ``pr_file_fingerprints`` per PR instead of
+	``files_per_pr``, e.g. when the patch text is no longer held in memory.
+	"""
+	if file_sets is None:
+		file_sets = [pr_file_fingerprints(files) for files in files_per_pr]
+	fingerprints = [pr_fingerprint(file_set) for file_set in file_sets]
+
+	exact_groups: dict[str, list[int]] = defaultdict(list)
+	for idx, fingerprint in enumerate(fingerprints):
+		if fingerprint:
+			exact_groups[fingerprint].append(idx)
+	exact_counts = [len(exact_groups[fp]) - 1 if fp else 0 for fp in fingerprints]
+
+	# Second pass runs on one representative per exact group.
+	representatives = [group[0] for group in exact_groups.values()]
+	postings: dict[str, list[int]] = defaultdict(list)
+	for idx in representatives:
+		for file_fp in file_sets[idx]:
+			postings[file_fp].append(idx)
+
+	near_neighbours: dict[int, set[int]] = defaultdict(set)
+	for idx in representatives:
+		shared: dict[int, int] = defaultdict(int)
+		for file_fp in file_sets[idx]:
+			posting = postings[file_fp]
+			if len(posting) > max_posting_length:
+				continue
+			for other in posting:
+				if other > idx:
+					shared[other] += 1
+		for other, overlap in shared.items():
+			union = len(file_sets[idx]) + len(file_sets[other]) - overlap
+			if overlap / union >= near_threshold:
+				near_neighbours[idx].add(other)
+				near_neighbours[other].add(idx)
+
+	near_counts = [0 for _ in fingerprints]
+	for representative, neighbours in near_neighbours.items():
+		group_size = sum(len(exact_groups[fingerprints[other]]) for other in neighbours)
+		for idx in exact_groups[fingerprints[representative]]:
+			near_counts[idx] = group_size
+
+	LOGGER.info(
+		"Patch fingerprinting: %s exact duplicate groups, %s PRs with near-identical diffs",
+		sum(1 for group in exact_groups.values() if len(group) > 1),
+		sum(1 for count in near_counts if count),
+	)
+	return {
+		"patch_fingerprint": fingerprints,
+		"patch_duplicate_count": exact_counts,
+		"patch_near_duplicate_count": near_counts,
+	}
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+LOGGER = logging.getLogger(__name__)
+
+_GLOB_CHARS = re.compile(r"[*?\[\]/]+")
+
+
+@dataclass(slots=True, frozen=True)
+class PathRule:
+	"""A sensitive-path policy entry.
+
+	``kind="substring"`` matches anywhere in the lowercased path (the historical
+	``SENSITIVE_FILE_HINTS`` behaviour). ``kind="glob"`` follows CODEOWNERS semantics:
+	a leading or inner ``/`` anchors to the repo root, a trailing ``/`` matches a whole
+	directory, ``*`` and ``?`` stay within one path segment and ``**`` spans segments.
+	"""
+
+	name: str
+	pattern: str
+	weight: float = 20.0
+	kind: str = "glob"
+
+
+def glob_to_regex(pattern: str) -> re.Pattern[str]:
+	anchored = pattern.startswith("/") or "/" in pattern.strip("/")
+	body = pattern.strip("/")
+	parts: list[str] = []
+	idx = 0
+	while idx < len(body):
+		if body.startswith("**/", idx):
+			parts.append("(?:.*/)?")
+			idx += 3
+		elif body.startswith("**", idx):
+			parts.append(".*")
+			idx += 2
+		elif body[idx] == "*":
+			parts.append("[^/]*")
+			idx += 1
+		elif body[idx] == "?":
+			parts.append("[^/]")
+			idx += 1
+		else:
+			parts.append(re.escape(body[idx]))
+			idx += 1
+	prefix = "^" if anchored else "^(?:.*/)?"
+	if pattern.endswith("/"):
+		suffix = "/.*$"
+	elif any(char in body.rsplit("/", 1)[-1] for char in "*?"):
+		# ``docs/*`` and ``*.js`` name files in one directory, not whatever lies below them.
+		suffix = "$"
+	else:
+		suffix = "(?:/.*)?$"
+	return re.compile(prefix + "".join(parts) + suffix)
+
+
+def _required_literal(rule: PathRule) -> str:
+	"""Longest literal fragment every match must contain; used to prefilter globs."""
+	if rule.kind == "substring":
+		return rule.pattern
+	fragments = [fragment for fragment in _GLOB_CHARS.split(rule.pattern) if fragment]
+	return max(fragments, key=len, default="")
+
+
+class _AhoCorasick:
+	"""Multi-literal matcher: one left-to-right scan reports every keyword in the text."""
+
+	def __init__(self, keywords: Iterable[str]) -> None:
+		self._goto: list[dict[str, int]] = [{}]
+		self._fail: list[int] = [0]
+		self._output: list[frozenset[str]] = [frozenset()]
+		outputs: list[set[str]] = [set()]
+
+		for keyword in keywords:
+			node = 0
+			for char in keyword:
+				nxt = self._goto[node].get(char)
+				if nxt is None:
+					nxt = len(self._goto)
+					self._goto[node][char] = nxt
+					self._goto.append({})
+					self._fail.append(0)
+					outputs.append(set())
+				node = nxt
+			outputs[node].add(keyword)
+
+		queue = deque(self._goto[0].values())
+		while queue:
+			node = queue.popleft()
+			for char, child in self._goto[node].items():
+				queue.append(child)
+				fallback = self._fail[node]
+				while fallback and char not in self._goto[fallback]:
+					fallback = self._fail[fallback]
+				self._fail[child] = self._goto[fallback].get(char, 0)
+				outputs[child] |= outputs[self._fail[child]]
+		self._output = [frozenset(found) for found in outputs]
+
+	def find(self, text: str) -> set[str]:
+		found: set[str] = set()
+		node = 0
+		goto, fail, output = self._goto, self._fail, self._output
+		for char in text:
+			while node and char not in goto[node]:
+				node = fail[node]
+			node = goto[node].get(char, 0)
+			if output[node]:
+				found |= output[node]
+		return found
+
+
+class CompiledPathRules:
+	"""Path rules compiled once into an Aho-Corasick automaton plus glob confirmers."""
+
+	def __init__(self, rules: Iterable[PathRule]) -> None:
+		self.rules = tuple(rules)
+		self.weights = {rule.name: rule.weight for rule in self.rules}
+		self._by_literal: dict[str, list[PathRule]] = {}
+		self._always_check: list[PathRule] = []
+		self._regex = {rule.name: glob_to_regex(rule.pattern.lower()) for rule in self.rules if rule.kind == "glob"}
+		for rule in self.rules:
+			literal = _required_literal(rule).lower()
+			if literal:
+				self._by_literal.setdefault(literal, []).append(rule)
+			else:
+				self._always_check.append(rule)
+		self._automaton = _AhoCorasick(self._by_literal)
+		self._cache: dict[str, frozenset[str]] = {}
+
+	def match(self, filename: str) -> frozenset[str]:
+		"""Returns the names of every rule matching ``filename``."""
+		cached = self._cache.get(filename)
+		if cached is not None:
+			return cached
+
+		path = filename.lower()
+		candidates = [rule for literal in self._automaton.find(path) for rule in self._by_literal[literal]]
+		matched = frozenset(
+			rule.name
+			for rule in candidates + self._always_check
+			if rule.kind == "substring" or self._regex[rule.name].match(path)
+		)
+		if len(self._cache) < 500_000:
+			self._cache[filename] = matched
+		return matched
+
+	def match_files(self, files: object) -> frozenset[str]:
+		if not isinstance(files, list):
+			return frozenset()
+		matched: set[str] = set()
+		for item in files:
+			matched |= self.match(str(item.get("filename", "")))
+		return frozenset(matched)
+
+	def max_weight(self, rule_names: Iterable[str]) -> float:
+		return max((self.weights[name] for name in rule_names), default=0.0)
+
+
+def load_path_rules(definitions: Iterable[dict[str, Any]]) -> list[PathRule]:
+	"""Builds rules from config dicts: ``{"name", "pattern", "weight"?, "kind"?}``."""
+	rules: list[PathRule] = []
+	for definition in definitions:
+		kind = str(definition.get("kind", "glob"))
+		if kind not in {"glob", "substring"}:
+			raise ValueError(f"Unsupported path rule kind: {kind}")
+		rules.append(
+			PathRule(
+				name=str(definition["name"]),
+				pattern=str(definition["pattern"]),
+				weight=float(definition.get("weight", 20.0)),
+				kind=kind,
+			)
+		)
+	return rules
+
+
+def compile_path_rules(definitions: Iterable[dict[str, Any]]) -> CompiledPathRules:
+	rules = load_path_rules(definitions)
+	LOGGER.info("Compiled %s sensitive path rules", len(rules))
+	return CompiledPathRules(rules)
@@ -2,9 +2,14 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 
+from .columns import clamp_scores, numeric_column, round_scores
+from .engine import AgentSpec, register_agent
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -16,36 +21,103 @@ class PriorityWeights:
     freshness_weight: float = 0.10
 
 
-def _clamp(value: float, lower: float = 0.0, upper: float = 100.0) -> float:
-    return max(lower, min(upper, value))
+@dataclass(slots=True)
+class FreshnessModel:
+    """Exponential time decay blended into the activity-based freshness signal.
+
+    ``idle`` is the time since ``updated_at`` and ``age`` the time since ``created_at``;
+    each decays to half its weight after the corresponding half-life. ``time_weight`` is
+    the share of the decayed score in the final signal.
+    """
+
+    idle_half_life_days: float = 14.0
+    age_half_life_days: float = 90.0
+    idle_weight: float = 0.7
+    age_weight: float = 0.3
+    time_weight: float = 0.5
 
 
-def _priority_bucket(score: float) -> str:
-    if score >= 80:
-        return "critical"
-    if score >= 60:
-        return "high"
-    if score >= 40:
-        return "medium"
-    return "low"
+def _days_since(df: pd.DataFrame, column: str, now: np.datetime64) -> np.ndarray:
+    """Days from ``df[column]`` to ``now``; NaN where the column is absent or unparsable."""
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    # One vectorised parse of the whole column; no per-row datetime objects.
+    parsed = pd.to_datetime(df[column], utc=True, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    elapsed = (now - parsed) / np.timedelta64(1, "D")
+    return np.maximum(elapsed, 0.0)
 
 
-def _freshness_signal(row: pd.Series) -> float:
-    comments = float(row.get("comments", 0)) + float(row.get("review_comments", 0))
-    changed_files = float(row.get("changed_files", 0))
-    recency_bonus = 20.0 if comments >= 4 else 10.0 if comments >= 1 else 0.0
-    complexity_penalty = 15.0 if changed_files > 70 else 0.0
-    return _clamp(50.0 + recency_bonus - complexity_penalty)
+def _activity_signal(df: pd.DataFrame) -> np.ndarray:
+    comments = numeric_column(df, "comments", 0) + numeric_column(df, "review_comments", 0)
+    changed_files = numeric_column(df, "changed_files", 0)
+    recency_bonus = np.select([comments >= 4, comments >= 1], [20.0, 10.0], default=0.0)
+    complexity_penalty = np.where(changed_files > 70, 15.0, 0.0)
+    return clamp_scores(50.0 + recency_bonus - complexity_penalty)
+
+
+def freshness_features(
+    df: pd.DataFrame,
+    *,
+    model: FreshnessModel | None = None,
+    now: datetime | None = None,
+) -> dict[str, np.ndarray]:
+    """Age/idle days, the discussion ``activity`` and the 0-100 freshness signal.
+
+    Rows without parsable timestamps keep the activity-only signal.
+    """
+    selected_model = model or FreshnessModel()
+    reference = pd.Timestamp(now or datetime.now(timezone.utc))
+    reference = reference.tz_localize("UTC") if reference.tzinfo is None else reference.tz_convert("UTC")
+    reference = reference.tz_localize(None).to_datetime64()
+    age_days = _days_since(df, "created_at", reference)
+    idle_days = _days_since(df, "updated_at", reference)
+    activity = _activity_signal(df)
+
+    idle_decay = np.exp2(-idle_days / selected_model.idle_half_life_days)
+    age_decay = np.exp2(-age_days / selected_model.age_half_life_days)
+    total_weight = selected_model.idle_weight + selected_model.age_weight
+    decayed = 100.0 * (selected_model.idle_weight * idle_decay + selected_model.age_weight * age_decay) / total_weight
+    blended = (1.0 - selected_model.time_weight) * activity + selected_model.time_weight * decayed
+    freshness = np.where(np.isnan(age_days) | np.isnan(idle_days), activity, blended)
+    return {
+        "pr_age_days": age_days,
+        "pr_idle_days": idle_days,
+        "activity": activity,
+        "freshness": clamp_scores(freshness),
+    }
+
+
+_REASON_NAMES = ("high_trust", "high_risk", "possible_duplicate", "active_discussion")
+# Reason strings for every combination of the four flags, indexed by their bitmask.
+_REASON_STRINGS = np.array(
+    [
+        ",".join(name for bit, name in enumerate(_REASON_NAMES) if mask & (1 << bit)) or "balanced_profile"
+        for mask in range(1 << len(_REASON_NAMES))
+    ],
+    dtype=object,
+)
+
+
+def _priority_bucket(scores: np.ndarray) -> np.ndarray:
+    return np.select(
+        [scores >= 80, scores >= 60, scores >= 40],
+        ["critical", "high", "medium"],
+        default="low",
+    ).astype(object)
 
 
 def calculate_priority(
     df: pd.DataFrame,
     *,
     weights: PriorityWeights | None = None,
+    freshness: FreshnessModel | None = None,
+    now: datetime | None = None,
+    include_signals: bool = False,
 ) -> pd.DataFrame:
     """Calculates explainable composite priority score for each PR.
 
-    Higher scores mean higher review priority.
+    Higher scores mean higher review priority. ``include_signals`` adds the
+    ``priority_signal_*`` columns needed for re-weighting.
     """
     LOGGER.info("Calculating advanced priority for %s PRs", len(df))
     if df.empty:
@@ -59,50 +131,14 @@ def calculate_priority(
             ]
         )
 
-    selected_weights = weights or PriorityWeights()
-    rows: list[dict[str, object]] = []
-
-    for _, row in df.iterrows():
-        pr_number = int(row["pr_number"])
-        trust_score = _clamp(float(row.get("trust_score", 50.0)))
-        risk_score = _clamp(float(row.get("risk_score", 0.0)))
-        dedupe_score = _clamp(float(row.get("dedupe_score", 0.0)))
-        freshness_score = _freshness_signal(row)
-
-        trust_component = selected_weights.trust_weight * trust_score
-        risk_component = selected_weights.risk_weight * (100.0 - risk_score)
-        dedupe_component = selected_weights.dedupe_weight * (100.0 - dedupe_score)
-        freshness_component = selected_weights.freshness_weight * freshness_score
-
-        composite = _clamp(
-            trust_component + risk_component + dedupe_component + freshness_component
-        )
-
-        reasons: list[str] = []
-        if trust_score >= 70:
-            reasons.append("high_trust")
-        if risk_score >= 50:
-            reasons.append("high_risk")
-        if dedupe_score >= 60:
-            reasons.append("possible_duplicate")
-        if freshness_score >= 60:
-            reasons.append("active_discussion")
-        if not reasons:
-            reasons.append("balanced_profile")
-
-        rows.append(
-            {
-                "pr_number": pr_number,
-                "priority_score": round(composite, 2),
-                "priority_bucket": _priority_bucket(composite),
-                "priority_reasons": ",".join(reasons),
-            }
-        )
-
-    priority_df = pd.DataFrame(rows).sort_values(
-        by=["priority_score", "pr_number"], ascending=[False, True]
+    columns = priority_columns(df, weights=weights, freshness=freshness, now=now)
+    # Ranks are a permutation of 1..n, so inverting them yields the sort order in O(n).
+    order = np.empty(len(df), dtype=np.int64)
+    order[columns["priority_rank"] - 1] = np.arange(len(df))
+    priority_df = pd.DataFrame(
+        {name: values[order] for name, values in columns.items()},
+        index=order,
     )
-    priority_df["priority_rank"] = range(1, len(priority_df) + 1)
     priority_df = priority_df[
         [
             "pr_number",
@@ -110,7 +146,97 @@ def calculate_priority(
             "priority_bucket",
             "priority_rank",
             "priority_reasons",
+            *([f"priority_signal_{name}" for name in PRIORITY_SIGNALS] if include_signals else []),
         ]
     ]
     LOGGER.info("Priority report generated")
     return priority_df
+
+
+PRIORITY_SIGNALS = ("trust", "risk", "dedupe", "freshness")
+
+
+def priority_signals(df: pd.DataFrame, *, freshness: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """Unweighted 0-100 inputs of the composite; ``risk``/``dedupe`` are inverted."""
+    return {
+        "trust": clamp_scores(numeric_column(df, "trust_score", 50.0)),
+        "risk": 100.0 - clamp_scores(numeric_column(df, "risk_score", 0.0)),
+        "dedupe": 100.0 - clamp_scores(numeric_column(df, "dedupe_score", 0.0)),
+        "freshness": freshness_features(df)["freshness"] if freshness is None else freshness,
+    }
+
+
+def composite_scores(signals: dict[str, np.ndarray], weights: PriorityWeights) -> np.ndarray:
+    """Weighted, clamped composite; broadcasts when weights are arrays (one per column)."""
+    return clamp_scores(
+        weights.trust_weight * signals["trust"]
+        + weights.risk_weight * signals["risk"]
+        + weights.dedupe_weight * signals["dedupe"]
+        + weights.freshness_weight * signals["freshness"]
+    )
+
+
+def priority_ranks(pr_numbers: np.ndarray, priority_score: np.ndarray) -> np.ndarray:
+    """1-based ranks by score (desc), ties broken by PR number."""
+    order = np.lexsort((pr_numbers, -priority_score))
+    ranks = np.empty(len(pr_numbers), dtype=np.int64)
+    ranks[order] = np.arange(1, len(pr_numbers) + 1)
+    return ranks
+
+
+def priority_columns(
+    df: pd.DataFrame,
+    *,
+    weights: PriorityWeights | None = None,
+    freshness: FreshnessModel | None = None,
+    now: datetime | None = None,
+) -> dict[str, np.ndarray]:
+    """Vectorised priority kernel; returns output columns aligned with ``df`` rows.
+
+    The unweighted signals are returned as ``priority_signal_<name>`` so other weightings
+    can be evaluated later without recomputing them (see ``agents.reweight``).
+    """
+    selected_weights = weights or PriorityWeights()
+    pr_numbers = df["pr_number"].to_numpy(dtype=np.int64)
+    time_features = freshness_features(df, model=freshness, now=now)
+    signals = priority_signals(df, freshness=time_features["freshness"])
+    composite = composite_scores(signals, selected_weights)
+
+    reason_mask = (
+        (signals["trust"] >= 70).astype(np.int64)
+        | ((signals["risk"] <= 50).astype(np.int64) << 1)
+        | ((signals["dedupe"] <= 40).astype(np.int64) << 2)
+        # Comments, not a recent ``updated_at``, make a discussion active.
+        | ((time_features["activity"] >= 60).astype(np.int64) << 3)
+    )
+
+    priority_score = round_scores(composite)
+    return {
+        "pr_number": pr_numbers,
+        "priority_score": priority_score,
+        "priority_bucket": _priority_bucket(composite),
+        "priority_rank": priority_ranks(pr_numbers, priority_score),
+        "priority_reasons": _REASON_STRINGS[reason_mask],
+        **{f"priority_signal_{name}": values for name, values in signals.items()},
+        "pr_age_days": time_features["pr_age_days"],
+        "pr_idle_days": time_features["pr_idle_days"],
+    }
+
+
+register_agent(
+    AgentSpec(
+        name="priority",
+        inputs=(
+            "trust_score",
+            "risk_score",
+            "dedupe_score",
+            "comments",
+            "review_comments",
+            "changed_files",
+            "created_at",
+            "updated_at",
+        ),
+        outputs=("priority_score", "priority_bucket", "priority_rank", "priority_reasons"),
+        compute=priority_columns,
+    )
+)
@@ -0,0 +1,96 @@
+"""What-if priority weightings over persisted ``priority_signal_*`` columns.
+
+Run with ``python -m agents.reweight reports/priority_components.csv --weights 0.45,0.35,0.1,0.1
+--weights 0.7,0.2,0.05,0.05``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .columns import round_scores
+from .prioritization_agent import (
+	PRIORITY_SIGNALS,
+	PriorityWeights,
+	_priority_bucket,
+	composite_scores,
+	priority_ranks,
+)
+
+
+def _signals(components: pd.DataFrame) -> dict[str, np.ndarray]:
+	missing = [name for name in PRIORITY_SIGNALS if f"priority_signal_{name}" not in components.columns]
+	if missing:
+		raise ValueError(f"Missing priority signal columns: {missing}")
+	return {name: components[f"priority_signal_{name}"].to_numpy(dtype=np.float64) for name in PRIORITY_SIGNALS}
+
+
+def reweight(components: pd.DataFrame, weights: PriorityWeights) -> pd.DataFrame:
+	"""Scores, buckets and ranks for ``weights``, identical to ``calculate_priority``'s."""
+	composite = composite_scores(_signals(components), weights)
+	pr_numbers = components["pr_number"].to_numpy(dtype=np.int64)
+	priority_score = round_scores(composite)
+	return pd.DataFrame(
+		{
+			"pr_number": pr_numbers,
+			"priority_score": priority_score,
+			"priority_bucket": _priority_bucket(composite),
+			"priority_rank": priority_ranks(pr_numbers, priority_score),
+		}
+	)
+
+
+def compare_weightings(components: pd.DataFrame, weight_sets: Sequence[PriorityWeights]) -> dict[str, np.ndarray]:
+	"""Evaluates many weightings in one pass.
+
+	Returns ``scores`` and ``ranks`` shaped ``(len(weight_sets), n_prs)`` and the pairwise
+	Spearman rank correlation matrix ``spearman``. Scores use ``np.round``, which may
+	differ from ``reweight`` in the last bit at exact ``.xx5`` ties.
+	"""
+	signals = {name: values[np.newaxis, :] for name, values in _signals(components).items()}
+	stacked = PriorityWeights(
+		**{
+			field: np.array([getattr(weights, field) for weights in weight_sets], dtype=np.float64)[:, np.newaxis]
+			for field in ("trust_weight", "risk_weight", "dedupe_weight", "freshness_weight")
+		}
+	)
+	scores = np.round(composite_scores(signals, stacked), 2)
+	pr_numbers = components["pr_number"].to_numpy(dtype=np.int64)
+	ranks = np.vstack([priority_ranks(pr_numbers, row) for row in scores]) if len(weight_sets) else scores
+	# Ranks are tie-free permutations, so Pearson over ranks is Spearman's rho.
+	if len(pr_numbers) > 1 and len(weight_sets) > 1:
+		spearman = np.corrcoef(ranks.astype(np.float64))
+	else:
+		spearman = np.ones((len(weight_sets), len(weight_sets)))
+	return {"pr_number": pr_numbers, "scores": scores, "ranks": ranks, "spearman": spearman}
+
+
+def parse_weights(value: str) -> PriorityWeights:
+	parts = [float(part) for part in value.split(",")]
+	if len(parts) != 4:
+		raise argparse.ArgumentTypeError("weights are trust,risk,dedupe,freshness")
+	return PriorityWeights(*parts)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("components", help="CSV with pr_number and priority_signal_* columns")
+	parser.add_argument("--weights", type=parse_weights, action="append", required=True)
+	parser.add_argument("--top", type=int, default=10)
+	args = parser.parse_args()
+
+	components = pd.read_csv(args.components)
+	result = compare_weightings(components, args.weights)
+	for idx, weights in enumerate(args.weights):
+		top = result["pr_number"][np.argsort(result["ranks"][idx])[: args.top]]
+		print(f"[{idx}] {weights}: top {args.top} = {', '.join(f'#{number}' for number in top)}")
+	print("Spearman rank correlation:")
+	print(pd.DataFrame(result["spearman"]).round(4).to_string())
+
+
+if __name__ == "__main__":
+	main()
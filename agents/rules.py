@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import ast
+import json
+import logging
+from dataclasses import dataclass, field
+from functools import reduce
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .columns import clamp_scores, numeric_column, round_scores, score_bands
+
+LOGGER = logging.getLogger(__name__)
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+_BINARY_OPERATORS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+_COMPARE_OPERATORS = {
+	ast.Gt: np.greater,
+	ast.GtE: np.greater_equal,
+	ast.Lt: np.less,
+	ast.LtE: np.less_equal,
+	ast.Eq: np.equal,
+	ast.NotEq: np.not_equal,
+}
+
+
+@dataclass(slots=True, frozen=True)
+class Expression:
+	"""A column expression such as ``"additions > deletions * 4 and additions > 1000"``."""
+
+	source: str
+	names: frozenset[str]
+	evaluate: Evaluator
+
+
+def _compile_node(node: ast.AST, names: set[str]) -> Evaluator:
+	if isinstance(node, ast.Expression):
+		return _compile_node(node.body, names)
+	if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool)):
+		value = node.value
+		return lambda env: value
+	if isinstance(node, ast.Name):
+		name = node.id
+		names.add(name)
+		return lambda env: env[name]
+	if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+		operator = _BINARY_OPERATORS[type(node.op)]
+		left, right = _compile_node(node.left, names), _compile_node(node.right, names)
+		return lambda env: operator(left(env), right(env))
+	if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.Not)):
+		operand = _compile_node(node.operand, names)
+		if isinstance(node.op, ast.USub):
+			return lambda env: np.negative(operand(env))
+		return lambda env: np.logical_not(operand(env))
+	if isinstance(node, ast.BoolOp):
+		combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+		operands = [_compile_node(value, names) for value in node.values]
+		return lambda env: reduce(combine, (operand(env) for operand in operands))
+	if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPERATORS for op in node.ops):
+		terms = [_compile_node(term, names) for term in [node.left, *node.comparators]]
+		operators = [_COMPARE_OPERATORS[type(op)] for op in node.ops]
+
+		def compare(env: Mapping[str, Any]) -> Any:
+			values = [term(env) for term in terms]
+			checks = (operator(values[idx], values[idx + 1]) for idx, operator in enumerate(operators))
+			return reduce(np.logical_and, checks)
+
+		return compare
+	raise ValueError(f"Unsupported syntax in rule expression: {ast.dump(node)}")
+
+
+def compile_expression(source: str | float | int) -> Expression:
+	if isinstance(source, (int, float)):
+		value = float(source)
+		return Expression(source=str(source), names=frozenset(), evaluate=lambda env: value)
+	names: set[str] = set()
+	evaluator = _compile_node(ast.parse(source, mode="eval"), names)
+	return Expression(source=source, names=frozenset(names), evaluate=evaluator)
+
+
+def _truthy(values: Any, rows: int) -> np.ndarray:
+	array = np.asarray(values)
+	if array.dtype.kind == "f":
+		array = np.nan_to_num(array) != 0
+	return np.broadcast_to(array.astype(bool), (rows,))
+
+
+@dataclass(slots=True, frozen=True)
+class ScoreRule:
+	name: str
+	when: Expression
+	score: Expression
+
+
+@dataclass(slots=True)
+class CompiledRuleSet:
+	"""Score rules compiled into vectorised column expressions.
+
+	``extract_features`` reads every referenced column from the PR frame once; ``evaluate``
+	only touches those cached arrays, so retuning ``params`` (thresholds, weights) is a
+	re-evaluation rather than a re-ingestion.
+	"""
+
+	name: str
+	base: float
+	bounds: tuple[float, float]
+	bands: tuple[float, float]
+	params: dict[str, float]
+	features: dict[str, Expression]
+	rules: list[ScoreRule]
+	defaults: dict[str, float] = field(default_factory=dict)
+
+	def input_columns(self) -> set[str]:
+		referenced: set[str] = set()
+		for expression in [*self.features.values(), *(part for rule in self.rules for part in (rule.when, rule.score))]:
+			referenced |= expression.names
+		return referenced - set(self.features) - set(self.params)
+
+	def extract_features(
+		self,
+		frame: pd.DataFrame,
+		extra: Mapping[str, np.ndarray] | None = None,
+	) -> dict[str, np.ndarray]:
+		env: dict[str, np.ndarray] = dict(extra or {})
+		for column in sorted(self.input_columns() - set(env)):
+			env[column] = numeric_column(frame, column, self.defaults.get(column, 0.0))
+		for name, expression in self.features.items():
+			env[name] = np.asarray(expression.evaluate({**self.params, **env}), dtype=np.float64)
+		return env
+
+	def evaluate(
+		self,
+		features: Mapping[str, np.ndarray],
+		params: Mapping[str, float] | None = None,
+	) -> dict[str, np.ndarray]:
+		env = {**self.params, **(params or {}), **features}
+		rows = len(next(iter(features.values()))) if features else 0
+		total = np.full(rows, self.base, dtype=np.float64)
+		contributions: dict[str, np.ndarray] = {}
+		fired = np.zeros((rows, len(self.rules)), dtype=bool)
+		for idx, rule in enumerate(self.rules):
+			hit = _truthy(rule.when.evaluate(env), rows)
+			contribution = np.where(hit, rule.score.evaluate(env), 0.0).astype(np.float64)
+			fired[:, idx] = hit & (contribution != 0)
+			contributions[rule.name] = contribution
+			total = total + contribution
+
+		score = round_scores(clamp_scores(total, *self.bounds))
+		# One reason string per distinct combination of fired rules, not per row.
+		combinations, inverse = np.unique(fired, axis=0, return_inverse=True)
+		labels = np.array(
+			[",".join(rule.name for rule, hit in zip(self.rules, combination) if hit) for combination in combinations],
+			dtype=object,
+		)
+		reasons = labels[inverse.reshape(-1)] if rows else np.array([], dtype=object)
+		return {
+			"score": score,
+			"band": score_bands(score, high=self.bands[0], medium=self.bands[1]),
+			"reasons": reasons,
+			**{f"rule_{name}": values for name, values in contributions.items()},
+		}
+
+
+# Computed by the trust/risk agents and passed to ``extract_features`` as ``extra``.
+EXTRA_RULE_INPUTS = frozenset({"hotfix_label", "sensitive_path_weight"})
+
+
+def known_rule_inputs(agent: str | None = None) -> frozenset[str]:
+	"""Names a rule of ``agent`` may read: ingested PR columns, ``EXTRA_RULE_INPUTS`` and
+	the outputs of agents that do not depend on ``agent``.
+
+	Reading such an output makes its agent run first (``AgentSpec.option_inputs``); the
+	outputs of ``agent`` itself and of its dependants would only ever read as 0. Without
+	``agent`` every agent output is accepted.
+	"""
+	from ingestion.github_fetch import PR_FRAME_COLUMNS
+
+	from .engine import AGENT_REGISTRY, execution_order
+
+	downstream = {agent} if agent in AGENT_REGISTRY else set()
+	if downstream:
+		for spec in execution_order(AGENT_REGISTRY.values()):
+			produced = {column for name in downstream for column in AGENT_REGISTRY[name].outputs}
+			if produced.intersection(spec.inputs):
+				downstream.add(spec.name)
+	outputs = {column for spec in AGENT_REGISTRY.values() if spec.name not in downstream for column in spec.outputs}
+	return frozenset(PR_FRAME_COLUMNS) | outputs | EXTRA_RULE_INPUTS
+
+
+def rule_option_inputs(options: Mapping[str, Any]) -> frozenset[str]:
+	"""Columns read by an agent's ``rules`` option; the ``AgentSpec.option_inputs`` of rule agents."""
+	rules = options.get("rules")
+	return frozenset(rules.input_columns() - EXTRA_RULE_INPUTS) if rules is not None else frozenset()
+
+
+def compile_rule_set(definition: Mapping[str, Any], known_inputs: Iterable[str] | None = None) -> CompiledRuleSet:
+	"""Compiles a rule definition mapping (Python dict, JSON or YAML document).
+
+	Keys: ``name``, ``base``, ``bounds``, ``bands`` (``{"high", "medium"}``), ``params``,
+	``features`` (name -> expression), ``defaults`` (column -> value when absent) and
+	``rules`` (list of ``{"name", "when", "score"}``; ``score`` may be an expression).
+	With ``known_inputs``, a name that is neither one of them nor a param or feature
+	raises ``ValueError`` instead of silently reading as 0.
+	"""
+	bands = definition.get("bands", {})
+	rule_set = CompiledRuleSet(
+		name=str(definition["name"]),
+		base=float(definition.get("base", 0.0)),
+		bounds=tuple(float(value) for value in definition.get("bounds", (0.0, 100.0))),
+		bands=(float(bands.get("high", 50.0)), float(bands.get("medium", 20.0))),
+		params={key: float(value) for key, value in definition.get("params", {}).items()},
+		features={name: compile_expression(source) for name, source in definition.get("features", {}).items()},
+		rules=[
+			ScoreRule(
+				name=str(rule["name"]),
+				when=compile_expression(rule.get("when", "1")),
+				score=compile_expression(rule["score"]),
+			)
+			for rule in definition.get("rules", [])
+		],
+		defaults={key: float(value) for key, value in definition.get("defaults", {}).items()},
+	)
+	if known_inputs is not None:
+		unknown = rule_set.input_columns() - set(known_inputs) - set(rule_set.defaults)
+		if unknown:
+			raise ValueError(f"Rule set '{rule_set.name}' references unknown or downstream columns: {sorted(unknown)}")
+	LOGGER.info("Compiled rule set '%s' with %s rules", rule_set.name, len(rule_set.rules))
+	return rule_set
+
+
+def load_rule_file(
+	path: str | Path,
+	known_inputs: Iterable[str] | None = None,
+	*,
+	agent: str | None = None,
+) -> CompiledRuleSet:
+	"""Loads a rule set from ``.json`` or, when PyYAML is installed, ``.yaml``/``.yml``.
+
+	Referenced columns are checked against ``known_inputs`` (default
+	``known_rule_inputs(agent)`` for the agent the rules are loaded for), so a typo or a
+	column computed after that agent fails the load instead of disabling the rule.
+	"""
+	target = Path(path)
+	text = target.read_text(encoding="utf-8")
+	known = known_rule_inputs(agent) if known_inputs is None else known_inputs
+	if target.suffix in {".yaml", ".yml"}:
+		try:
+			import yaml
+		except ImportError as exc:
+			raise ValueError("YAML rule files require PyYAML; use a .json rule file instead") from exc
+		return compile_rule_set(yaml.safe_load(text), known)
+	return compile_rule_set(json.loads(text), known)
+
+
+TRUST_RULES: dict[str, Any] = {
+	"name": "trust",
+	"base": 50,
+	"bands": {"high": 70, "medium": 45},
+	"params": {
+		"small_change_lines": 600,
+		"large_change_lines": 3000,
+		"active_discussion": 5,
+		"established_merged_prs": 5,
+		"trusted_reputation": 1.5,
+	},
+	"features": {"changes": "additions + deletions", "engagement": "comments + review_comments"},
+	"rules": [
+		{"name": "small_change", "when": "changes < small_change_lines", "score": 12},
+		{"name": "large_change", "when": "changes > large_change_lines", "score": -20},
+		{"name": "has_review_activity", "when": "engagement >= active_discussion", "score": 10},
+		{"name": "no_engagement", "when": "engagement == 0", "score": -8},
+		{"name": "draft_pr", "when": "draft", "score": -10},
+		{"name": "hotfix_requires_attention", "when": "hotfix_label", "score": -5},
+		{"name": "established_author", "when": "author_merged_prs >= established_merged_prs", "score": 10},
+		{"name": "first_time_contributor", "when": "author_history_known and author_merged_prs == 0", "score": -5},
+		{"name": "reverted_history", "when": "author_reverted_prs > 0", "score": -10},
+		{"name": "reputable_author", "when": "author_reputation >= trusted_reputation", "score": 8},
+	],
+}
+
+RISK_RULES: dict[str, Any] = {
+	"name": "risk",
+	"base": 0,
+	"bands": {"high": 50, "medium": 20},
+	"params": {"very_large_change_lines": 4000, "high_file_spread": 70, "addition_ratio": 4, "addition_heavy_lines": 1000},
+	"features": {"changes": "additions + deletions"},
+	"rules": [
+		{"name": "very_large_change", "when": "changes > very_large_change_lines", "score": 35},
+		{"name": "high_file_spread", "when": "changed_files > high_file_spread", "score": 30},
+		{
+			"name": "addition_heavy",
+			"when": "additions > deletions * addition_ratio and additions > addition_heavy_lines",
+			"score": 15,
+		},
+		{"name": "sensitive_file_touched", "when": "sensitive_path_weight > 0", "score": "sensitive_path_weight"},
+		{"name": "content_secret", "when": "content_secret_hits > 0", "score": 25},
+		{"name": "content_obfuscation", "when": "content_obfuscation_hits > 0", "score": 20},
+		{"name": "content_encoded_blob", "when": "content_encoded_blob_hits > 0", "score": 10},
+		{"name": "content_high_entropy", "when": "content_high_entropy_hits > 0", "score": 10},
+	],
+}
@@ -2,78 +2,89 @@ from __future__ import annotations
 
 import logging
 
+import numpy as np
 import pandas as pd
 
+from .columns import records_frame
+from .engine import AgentSpec, register_agent
+from .rules import TRUST_RULES, CompiledRuleSet, compile_rule_set, rule_option_inputs
+
 LOGGER = logging.getLogger(__name__)
 
+DEFAULT_TRUST_RULES = compile_rule_set(TRUST_RULES)
+
 
-def run_trust_agent(pr_records: list[dict[str, object]]) -> dict[int, dict[str, object]]:
+def run_trust_agent(
+	pr_records: list[dict[str, object]],
+	*,
+	rules: CompiledRuleSet | None = None,
+) -> dict[int, dict[str, object]]:
+	"""Record-based trust scores (0-1) from the same rule set as ``calculate_trust``."""
 	LOGGER.info("Running trust agent on %s PRs", len(pr_records))
 	output: dict[int, dict[str, object]] = {}
-
-	for pr in pr_records:
-		number = int(pr["number"])
-		score = 0.5
-		reasons: list[str] = []
-
-		draft = bool(pr.get("draft", False))
-		comments = int(pr.get("comments", 0)) + int(pr.get("review_comments", 0))
-		labels = [str(label).lower() for label in pr.get("labels", [])]
-
-		if draft:
-			score -= 0.1
-			reasons.append("draft_pr")
-
-		if comments >= 5:
-			score += 0.1
-			reasons.append("has_review_activity")
-
-		if "hotfix" in labels:
-			score -= 0.05
-			reasons.append("hotfix_requires_attention")
-
-		score = max(0.0, min(1.0, score))
-		output[number] = {
-			"trust_score": round(score, 3),
-			"trust_reasons": reasons,
+	if not pr_records:
+		return output
+
+	columns = trust_columns(records_frame(pr_records), rules=rules)
+	for number, score, reasons in zip(columns["pr_number"], columns["trust_score"], columns["trust_reasons"]):
+		output[int(number)] = {
+			"trust_score": round(float(score) / 100, 3),
+			"trust_reasons": reasons.split(",") if reasons else [],
 		}
 
 	LOGGER.info("Trust agent finished")
 	return output
 
 
-def calculate_trust(pr_df: pd.DataFrame) -> pd.DataFrame:
+def calculate_trust(pr_df: pd.DataFrame, *, rules: CompiledRuleSet | None = None) -> pd.DataFrame:
 	"""Calculates trust score (0-100) based on observable PR metadata."""
 	LOGGER.info("Calculating trust for %s PRs", len(pr_df))
 	if pr_df.empty:
 		return pd.DataFrame(columns=["pr_number", "trust_score", "trust_band"])
 
-	rows: list[dict[str, float | int | str]] = []
-	for _, pr in pr_df.iterrows():
-		score = 50.0
-		changes = float(pr.get("additions", 0)) + float(pr.get("deletions", 0))
-		engagement = float(pr.get("comments", 0)) + float(pr.get("review_comments", 0))
-
-		if changes < 600:
-			score += 12
-		if changes > 3000:
-			score -= 20
-		if engagement >= 5:
-			score += 10
-		if engagement == 0:
-			score -= 8
-
-		score = max(0.0, min(100.0, score))
-		band = "high" if score >= 70 else "medium" if score >= 45 else "low"
-		rows.append(
-			{
-				"pr_number": int(pr["pr_number"]),
-				"trust_score": round(score, 2),
-				"trust_band": band,
-			}
-		)
-
-	trust_df = pd.DataFrame(rows)
+	columns = trust_columns(pr_df, rules=rules)
+	trust_df = pd.DataFrame({name: columns[name] for name in ("pr_number", "trust_score", "trust_band")})
 	LOGGER.info("Trust report generated")
 	return trust_df
 
+
+def _hotfix_labels(pr_df: pd.DataFrame) -> np.ndarray:
+	if "labels" not in pr_df.columns:
+		return np.zeros(len(pr_df), dtype=bool)
+	return np.fromiter(
+		(
+			isinstance(labels, list) and any(str(label).lower() == "hotfix" for label in labels)
+			for labels in pr_df["labels"]
+		),
+		dtype=bool,
+		count=len(pr_df),
+	)
+
+
+def trust_columns(pr_df: pd.DataFrame, *, rules: CompiledRuleSet | None = None) -> dict[str, np.ndarray]:
+	"""Vectorised trust kernel; returns output columns aligned with ``pr_df`` rows.
+
+	Besides ``trust_score``/``trust_band`` it reports the fired rules in ``trust_reasons``
+	and each rule's contribution in ``trust_rule_<name>``.
+	"""
+	rule_set = rules if rules is not None else DEFAULT_TRUST_RULES
+	features = rule_set.extract_features(pr_df, {"hotfix_label": _hotfix_labels(pr_df)})
+	result = rule_set.evaluate(features)
+	return {
+		"pr_number": pr_df["pr_number"].to_numpy(dtype=np.int64),
+		"trust_score": result["score"],
+		"trust_band": result["band"],
+		"trust_reasons": result["reasons"],
+		**{f"trust_{name}": values for name, values in result.items() if name.startswith("rule_")},
+	}
+
+
+register_agent(
+	AgentSpec(
+		name="trust",
+		inputs=tuple(sorted(DEFAULT_TRUST_RULES.input_columns() - {"hotfix_label"} | {"labels"})),
+		outputs=("trust_score", "trust_band", "trust_reasons"),
+		compute=trust_columns,
+		option_inputs=rule_option_inputs,
+	)
+)
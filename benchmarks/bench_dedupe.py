@@ -0,0 +1,57 @@
+"""Throughput benchmark for parallel pairwise title similarity.
+
+Run with ``python -m benchmarks.bench_dedupe --prs 1000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+
+from agents.dedupe_agent import similar_title_pairs
+
+_WORDS = (
+    "fix", "add", "update", "remove", "refactor", "auth", "cache", "parser", "docs",
+    "tests", "config", "webhook", "labels", "memory", "leak", "timeout", "retry",
+    "support", "plugin", "session", "token", "ci", "workflow", "typo", "readme",
+)
+
+
+def synthetic_titles(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    titles: list[str] = []
+    for _ in range(count):
+        if titles and rng.random() < 0.05:
+            titles.append(rng.choice(titles))
+            continue
+        titles.append(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 9))))
+    return titles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prs", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--block-size", type=int, default=256)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.prs)
+    pair_count = args.prs * (args.prs - 1) // 2
+    worker_counts = sorted(
+        {1, args.max_workers, *[2**power for power in range(1, 8) if 2**power <= args.max_workers]}
+    )
+
+    baseline_seconds: float | None = None
+    print(f"{'workers':>8} {'seconds':>10} {'pairs/s':>14} {'speedup':>8}")
+    for workers in worker_counts:
+        started = time.perf_counter()
+        similar_title_pairs(titles, workers=workers, block_size=args.block_size)
+        elapsed = time.perf_counter() - started
+        baseline_seconds = baseline_seconds or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {pair_count / elapsed:>14,.0f} {baseline_seconds / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Sensitive path-rule matching throughput with hundreds of rules.
+
+Run with ``python -m benchmarks.bench_path_rules --rules 300 --files 100000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from agents.path_rules import compile_path_rules
+
+_SEGMENTS = ("src", "lib", "core", "auth", "api", "utils", "docs", "tests", "config", "plugins", "web", "db")
+_EXTENSIONS = (".py", ".ts", ".md", ".yml", ".json", ".lock", ".sql")
+
+
+def synthetic_rules(count: int, rng: random.Random) -> list[dict[str, object]]:
+    rules: list[dict[str, object]] = []
+    for idx in range(count):
+        segment = rng.choice(_SEGMENTS)
+        shape = idx % 4
+        if shape == 0:
+            pattern, kind = f"{segment}{idx}", "substring"
+        elif shape == 1:
+            pattern, kind = f"/{segment}/module{idx}/", "glob"
+        elif shape == 2:
+            pattern, kind = f"**/{segment}/*{idx}{rng.choice(_EXTENSIONS)}", "glob"
+        else:
+            pattern, kind = f"{segment}/**/owner{idx}/", "glob"
+        rules.append({"name": f"rule{idx}", "pattern": pattern, "kind": kind, "weight": rng.randint(5, 40)})
+    return rules
+
+
+def synthetic_paths(count: int, rng: random.Random, modules: int) -> list[str]:
+    paths: list[str] = []
+    for _ in range(count):
+        depth = rng.randint(1, 5)
+        segments = [rng.choice(_SEGMENTS) for _ in range(depth)]
+        segments.append(f"module{rng.randrange(modules)}")
+        paths.append("/".join(segments) + f"/file{rng.randrange(5000)}{rng.choice(_EXTENSIONS)}")
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(31)
+    started = time.perf_counter()
+    rules = compile_path_rules(synthetic_rules(args.rules, rng))
+    compile_seconds = time.perf_counter() - started
+
+    paths = synthetic_paths(args.files, rng, modules=args.rules)
+    started = time.perf_counter()
+    matched = sum(1 for path in paths if rules.match(path))
+    match_seconds = time.perf_counter() - started
+
+    print(f"compiled {args.rules} rules in {compile_seconds:.3f}s")
+    print(f"matched {args.files:,} paths in {match_seconds:.3f}s ({args.files / match_seconds:,.0f} paths/s, {matched:,} hits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""Stage-by-stage pipeline benchmark on synthetic PRs, with baselines and regression checks.
+
+Run with ``python -m benchmarks.bench_pipeline run --scales 1000,10000,100000 --output baseline.json``
+and later ``python -m benchmarks.bench_pipeline run --output current.json`` followed by
+``python -m benchmarks.bench_pipeline compare baseline.json current.json --threshold 0.15``.
+
+``--shard-workers 1,2,4`` also times ``sharding.score_sharded`` (the complete agent set,
+title dedupe through the shared candidate index included) with one shard per worker
+process, at every scale, to show how sharded scoring scales with local processes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from agents import ScanCache, run_agents
+from agents.deception_agent import calculate_risk
+from agents.dedupe_agent import cluster_prs
+from agents.prioritization_agent import calculate_priority
+from agents.trust_agent import calculate_trust
+from ingestion.github_fetch import records_to_frame
+from main_pipeline import PRIORITY_COLUMNS, PRIORITY_SIGNAL_COLUMNS, REPORT_COLUMNS, _report_stage
+from memory.embeddings import generate_embeddings
+from memory.patch_store import DEFAULT_PATCH_STORE
+from sharding import score_sharded
+
+_VERBS = ("Fix", "Add", "Update", "Remove", "Refactor", "Improve", "Support", "Document", "Bump", "Revert")
+_NOUNS = (
+    "auth token refresh", "webhook retries", "label sync", "cache eviction", "parser errors", "CI workflow",
+    "README badges", "session timeout", "plugin loader", "rate limit handling", "dependency pins",
+    "config validation", "memory leak in worker", "docs typos", "release notes", "login redirect",
+)
+_DIRECTORIES = ("src", "src/auth", "src/api", "lib", "tests", "docs", ".github/workflows", "config", "scripts")
+_EXTENSIONS = (".py", ".py", ".py", ".md", ".yml", ".json", ".txt")
+_LINES = (
+    "return value", "if token is None:", "raise ValueError(message)", "import os", "logger.info(msg)",
+    "for item in items:", "timeout = 30", "def handler(event):", "password = os.environ['DB_PASSWORD']",
+    "# TODO: clean up", "self.cache.clear()", "retries += 1", "assert result", "data = json.loads(body)",
+)
+_AUTHORS = tuple(f"dev{idx}" for idx in range(400)) + ("dependabot[bot]", "renovate[bot]")
+_EPOCH = np.datetime64("2026-01-01T00:00:00")
+
+
+def _patch(rng: random.Random) -> str:
+    start = rng.randint(1, 400)
+    lines = [f"@@ -{start},6 +{start},7 @@"]
+    for _ in range(rng.randint(3, 12)):
+        lines.append(rng.choice("+- ") + rng.choice(_LINES))
+    return "\n".join(lines)
+
+
+def _timestamp(rng: random.Random, max_days: int) -> str:
+    return f"{_EPOCH - np.timedelta64(rng.randrange(max_days * 86400), 's')}Z"
+
+
+def iter_synthetic_pull_requests(
+    count: int,
+    *,
+    duplicate_rate: float = 0.05,
+    seed: int = 43,
+    window: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yields PR records shaped like ``hydrate_pull_request`` output; patches go to the patch store.
+
+    ``duplicate_rate`` of the PRs re-submit an earlier PR: same files and patches and the
+    same title with a small suffix, so both title and diff dedupe have work to find.
+    With ``window`` only the last ``window`` PRs can be re-submitted, so a stream of any
+    length is generated in bounded memory (their patches are put into the store again).
+    """
+    rng = random.Random(seed)
+    recent: deque[tuple[dict[str, Any], list[str]]] = deque(maxlen=window)
+    for number in range(1, count + 1):
+        if recent and rng.random() < duplicate_rate:
+            original, patches = rng.choice(recent)
+            title = original["title"] + rng.choice(("", " (again)", " v2", "."))
+            files = [dict(item) for item in original["files"]]
+            for patch in patches:
+                DEFAULT_PATCH_STORE.put(patch)
+        else:
+            title = f"{rng.choice(_VERBS)} {rng.choice(_NOUNS)}"
+            if rng.random() < 0.5:
+                title += f" in {rng.choice(_DIRECTORIES)}"
+            files = []
+            patches = []
+            for _ in range(max(1, int(rng.paretovariate(1.5)) % 40)):
+                patch = _patch(rng)
+                patches.append(patch)
+                additions = patch.count("\n+")
+                deletions = patch.count("\n-")
+                files.append(
+                    {
+                        "filename": f"{rng.choice(_DIRECTORIES)}/module{rng.randrange(500)}{rng.choice(_EXTENSIONS)}",
+                        "status": "modified",
+                        "additions": additions,
+                        "deletions": deletions,
+                        "changes": additions + deletions,
+                        "patch_sha": DEFAULT_PATCH_STORE.put(patch),
+                        "blob_url": "",
+                        "raw_url": "",
+                    }
+                )
+        record = {
+            "number": number,
+            "title": title,
+            "state": "open",
+            "draft": rng.random() < 0.1,
+            "user_login": rng.choice(_AUTHORS),
+            "created_at": _timestamp(rng, 720),
+            "updated_at": _timestamp(rng, 60),
+            "merged_at": None,
+            "html_url": f"https://github.com/acme/app/pull/{number}",
+            "body": " ".join(rng.choice(_LINES) for _ in range(rng.randint(0, 40))),
+            "labels": rng.sample(["bug", "docs", "hotfix", "dependencies", "enhancement"], rng.randint(0, 2)),
+            "additions": sum(item["additions"] for item in files) * rng.randint(1, 20),
+            "deletions": sum(item["deletions"] for item in files) * rng.randint(1, 5),
+            "changed_files": len(files),
+            "commits": rng.randint(1, 15),
+            "comments": rng.randint(0, 8),
+            "review_comments": rng.randint(0, 5),
+            "files": files,
+            "reviews": [],
+        }
+        recent.append((record, patches))
+        yield record
+
+
+def synthetic_pull_requests(count: int, *, duplicate_rate: float = 0.05, seed: int = 43) -> list[dict[str, Any]]:
+    """``iter_synthetic_pull_requests`` as a list; any earlier PR may be re-submitted."""
+    return list(iter_synthetic_pull_requests(count, duplicate_rate=duplicate_rate, seed=seed))
+
+
+def _measure(func: Callable[[], Any], *, repeat: int, memory: bool) -> dict[str, float | None]:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    peak_bytes = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_bytes": peak_bytes}
+
+
+def benchmark_scale(
+    count: int,
+    *,
+    duplicate_rate: float,
+    repeat: int,
+    memory: bool,
+    report_dir: str,
+    shard_workers: tuple[int, ...] = (),
+) -> dict[str, dict[str, Any]]:
+    frame = records_to_frame(synthetic_pull_requests(count, duplicate_rate=duplicate_rate))
+    results: dict[str, dict[str, Any]] = {}
+
+    def record(stage: str, func: Callable[[], Any], *, traced: bool = True) -> None:
+        measured = _measure(func, repeat=repeat, memory=memory and traced)
+        measured["rows_per_second"] = round(count / measured["seconds"], 1) if measured["seconds"] else None
+        results[stage] = measured
+        peak = measured["peak_bytes"]
+        peak_text = f"{peak / 2**20:>10.1f}" if peak is not None else f"{'-':>10}"
+        print(f"{count:>8} {stage:>20} {measured['seconds']:>10.3f} {measured['rows_per_second'] or 0:>14,.0f} {peak_text}")
+
+    record("generate_embeddings", lambda: generate_embeddings(frame))
+    record("cluster_prs", lambda: cluster_prs(frame))
+    trust = calculate_trust(frame)
+    risk = calculate_risk(frame)
+    record("calculate_trust", lambda: calculate_trust(frame))
+    record("calculate_risk", lambda: calculate_risk(frame))
+    scored = frame.assign(
+        trust_score=trust["trust_score"].to_numpy(),
+        risk_score=risk["risk_score"].to_numpy(),
+        dedupe_score=0.0,
+    )
+    record("calculate_priority", lambda: calculate_priority(scored))
+
+    # ``run_agents`` replaced the per-agent report frames and their merge chain.
+    # A fresh scan cache per call, so every measurement scans the patches cold.
+    record("run_agents", lambda: run_agents(frame.copy(), options={"content_scan": {"cache": ScanCache()}}))
+
+    for workers in shard_workers:
+        # tracemalloc cannot see the worker processes, so no memory pass here.
+        record(
+            f"score_sharded_w{workers}",
+            lambda: score_sharded(frame.copy(), shards=workers, workers=workers, options={"content_scan": {"cache": ScanCache()}}),
+            traced=False,
+        )
+
+    full = run_agents(frame.copy())
+    df = full[[column for column in REPORT_COLUMNS if column in full.columns]]
+    priority_report = df[PRIORITY_COLUMNS].sort_values(by="priority_rank")
+    priority_signals = full.reindex(columns=PRIORITY_SIGNAL_COLUMNS)
+    settings = SimpleNamespace(report_dir=report_dir)
+    record("report_writers", lambda: _report_stage(settings, df, priority_report, priority_signals))
+    return results
+
+
+def _environment() -> dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    scales = [int(value) for value in args.scales.split(",") if value]
+    logging.disable(logging.INFO)
+    print(f"{'prs':>8} {'stage':>20} {'seconds':>10} {'rows/s':>14} {'peak MiB':>10}")
+    results: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="prion-bench-") as report_dir:
+        for count in scales:
+            results[str(count)] = benchmark_scale(
+                count,
+                duplicate_rate=args.duplicate_rate,
+                repeat=args.repeat,
+                memory=not args.no_memory,
+                report_dir=report_dir,
+                shard_workers=tuple(int(value) for value in args.shard_workers.split(",") if value),
+            )
+    payload = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": _environment(),
+        "parameters": {
+            "duplicate_rate": args.duplicate_rate,
+            "repeat": args.repeat,
+            "shard_workers": args.shard_workers,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"results written to {args.output}")
+    return 0
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any], *, threshold: float) -> list[dict[str, Any]]:
+    """Rows per (scale, stage) measured in both runs; ``regression`` marks throughput
+    drops or peak-memory growth beyond ``threshold`` (a fraction, e.g. 0.15).
+
+    ``throughput_ratio`` is ``None`` when either run was too fast to time (its
+    ``rows_per_second`` is ``None``); such a stage is never a throughput regression."""
+    rows: list[dict[str, Any]] = []
+    for scale, stages in current.get("results", {}).items():
+        for stage, measured in stages.items():
+            reference = baseline.get("results", {}).get(scale, {}).get(stage)
+            if not reference or "skipped" in measured or "skipped" in reference:
+                continue
+            throughput = None
+            if measured.get("rows_per_second") and reference.get("rows_per_second"):
+                throughput = measured["rows_per_second"] / reference["rows_per_second"]
+            memory = None
+            if measured.get("peak_bytes") and reference.get("peak_bytes"):
+                memory = measured["peak_bytes"] / reference["peak_bytes"]
+            regressions = []
+            if throughput is not None and throughput < 1 - threshold:
+                regressions.append("throughput")
+            if memory is not None and memory > 1 + threshold:
+                regressions.append("memory")
+            rows.append(
+                {
+                    "scale": int(scale),
+                    "stage": stage,
+                    "throughput_ratio": round(throughput, 3) if throughput is not None else None,
+                    "memory_ratio": round(memory, 3) if memory is not None else None,
+                    "regression": regressions,
+                }
+            )
+    return rows
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    rows = compare_results(baseline, current, threshold=args.threshold)
+    print(f"{'prs':>8} {'stage':>20} {'throughput':>11} {'memory':>8}  status")
+    for row in rows:
+        throughput = f"{row['throughput_ratio']:.2f}x" if row["throughput_ratio"] is not None else "-"
+        memory = f"{row['memory_ratio']:.2f}x" if row["memory_ratio"] is not None else "-"
+        status = "REGRESSION (" + ", ".join(row["regression"]) + ")" if row["regression"] else "ok"
+        if row["throughput_ratio"] is None:
+            status += " (too fast to time)"
+        print(f"{row['scale']:>8} {row['stage']:>20} {throughput:>11} {memory:>8}  {status}")
+    regressions = sum(bool(row["regression"]) for row in rows)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark every stage at the given scales")
+    run_parser.add_argument("--scales", default="1000,10000,100000")
+    run_parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    run_parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage (best is kept)")
+    run_parser.add_argument("--shard-workers", default="", help="e.g. 1,2,4: also time sharded scoring per worker count")
+    run_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    run_parser.add_argument("--output", help="write results JSON (e.g. a baseline) here")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
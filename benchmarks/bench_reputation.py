@@ -0,0 +1,50 @@
+"""Reputation propagation over a synthetic review graph, cold and warm-started.
+
+Run with ``python -m benchmarks.bench_reputation --reviews 100000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from memory.reputation import ReputationGraph
+
+_STATES = ("APPROVED", "APPROVED", "COMMENTED", "CHANGES_REQUESTED")
+
+
+def synthetic_graph(reviews: int, rng: random.Random, *, users: int = 5_000, prs: int = 40_000) -> ReputationGraph:
+    graph = ReputationGraph()
+    for number in range(prs):
+        graph.add_pull_request(number, f"user{int(rng.paretovariate(1.2)) % users}")
+    for _ in range(reviews):
+        graph.add_review(rng.randrange(prs), f"user{rng.randrange(users)}", rng.choice(_STATES))
+    return graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--new-reviews", type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = random.Random(35)
+    graph = synthetic_graph(args.reviews, rng)
+    started = time.perf_counter()
+    graph.compute()
+    cold_seconds = time.perf_counter() - started
+    cold_iterations = graph.iterations
+
+    for _ in range(args.new_reviews):
+        graph.add_review(rng.randrange(40_000), f"user{rng.randrange(5_000)}", "APPROVED")
+    started = time.perf_counter()
+    graph.compute()
+    warm_seconds = time.perf_counter() - started
+
+    print(f"cold: {args.reviews:,} reviews in {cold_seconds:.3f}s ({cold_iterations} iterations)")
+    print(f"warm: +{args.new_reviews:,} reviews in {warm_seconds:.3f}s ({graph.iterations} iterations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Per-stage throughput of the vectorised trust, risk and priority scorers.
+
+Also times re-weighting the persisted priority signals with a batch of 20 weightings.
+
+Run with ``python -m benchmarks.bench_scoring --rows 100000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from agents.deception_agent import calculate_risk
+from agents.prioritization_agent import PriorityWeights, calculate_priority
+from agents.reweight import compare_weightings
+from agents.trust_agent import calculate_trust
+
+_FILENAMES = ("src/app.py", "src/auth/login.py", ".github/workflows/ci.yml", "docs/index.md", "tests/test_app.py")
+
+
+def synthetic_frame(rows: int, seed: int = 29) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "pr_number": np.arange(1, rows + 1),
+            "additions": rng.integers(0, 6000, rows),
+            "deletions": rng.integers(0, 2000, rows),
+            "changed_files": rng.integers(0, 120, rows),
+            "comments": rng.integers(0, 8, rows),
+            "review_comments": rng.integers(0, 4, rows),
+            "files": [
+                [{"filename": _FILENAMES[idx]} for idx in rng.integers(0, len(_FILENAMES), rng.integers(1, 6))]
+                for _ in range(rows)
+            ],
+        }
+    )
+
+
+def _timestamps(rows: int, *, max_days: int, seed: int = 38) -> list[str]:
+    rng = np.random.default_rng(seed + max_days)
+    moments = np.datetime64("2026-01-01T00:00:00") - rng.integers(0, max_days * 86400, rows).astype("timedelta64[s]")
+    return [f"{moment}Z" for moment in moments]
+
+
+def _timed(stage: str, func, frame: pd.DataFrame) -> pd.DataFrame:
+    started = time.perf_counter()
+    result = func(frame)
+    elapsed = time.perf_counter() - started
+    print(f"{stage:>10} {elapsed:>10.3f} {len(frame) / elapsed:>14,.0f}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"{'stage':>10} {'seconds':>10} {'rows/s':>14}")
+
+    trust = _timed("trust", calculate_trust, df)
+    risk = _timed("risk", calculate_risk, df)
+
+    scored = df.assign(
+        trust_score=trust["trust_score"].to_numpy(),
+        risk_score=risk["risk_score"].to_numpy(),
+        dedupe_score=0.0,
+        created_at=_timestamps(args.rows, max_days=720),
+        updated_at=_timestamps(args.rows, max_days=60),
+    )
+    priority = _timed("priority", lambda frame: calculate_priority(frame, include_signals=True), scored)
+
+    rng = np.random.default_rng(37)
+    weight_sets = [PriorityWeights(*row) for row in rng.dirichlet(np.ones(4), 20)]
+    _timed("reweight", lambda frame: compare_weightings(frame, weight_sets), priority)
+
+
+if __name__ == "__main__":
+    main()
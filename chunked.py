@@ -0,0 +1,302 @@
+"""Bounded-memory pipeline for very large backlogs (``CHUNK_SIZE``).
+
+``run_chunked_pipeline`` replaces the in-memory stage DAG with streaming passes, so no
+step holds every PR together with its diffs:
+
+1. ingest: hydrated PRs are grouped into chunks of ``CHUNK_SIZE``. Each chunk updates
+   the author history and reputation graph and is spilled to disk; its patches leave the
+   in-memory patch store for a content-addressed directory (``PATCH_STORE_DIR`` if set).
+2. score: each spilled chunk runs the row-local agents (trust, risk, embeddings, content
+   scan, ...). Its report columns are spilled again; only the compact inputs of the
+   global agents (titles, per-PR diff fingerprints, scores, counts and timestamps) stay
+   in memory.
+3. global: title/diff clustering and priority ranking run once over the compact
+   features (title pairs come from ``TitleCandidateIndex``, not a pairwise scan).
+4. report: every chunk is joined with its global columns, appended to
+   ``daily_report.csv`` and labeled; the remaining reports only need compact columns
+   plus the few top rows collected on the way.
+
+The reports match those of the in-memory pipeline. Stage checkpoints are not used.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import tempfile
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from agents import ScanCache, run_agents
+from agents.columns import top_k_indices
+from agents.dedupe_agent import TitleCandidateIndex, dedupe_titles
+from agents.engine import AGENT_REGISTRY, with_option_inputs
+from agents.patch_fingerprint import pr_file_fingerprints
+from frame_schema import apply_schema, record_frame_memory
+from ingestion.github_fetch import GitHubPullRequestIngestor, records_to_frame
+from main_pipeline import (
+    PRIORITY_COLUMNS,
+    PRIORITY_SIGNAL_COLUMNS,
+    REPORT_COLUMNS,
+    _deliver_stage,
+    _write_markdown_report,
+    agent_options,
+    github_config,
+    pr_files_cache,
+)
+from memory.author_store import AuthorHistoryStore
+from memory.patch_store import DEFAULT_PATCH_STORE, PatchStore
+from memory.priority_queue import PersistentPriorityQueue
+from memory.reputation import ReputationGraph
+from metrics import METRICS
+from outputs.github_labeler import label_prs
+from outputs.webhook_exporter import export_webhook_payloads
+from runtime_config import RuntimeSettings
+from sharding import local_agents
+
+LOGGER = logging.getLogger("prion.chunked")
+
+T = TypeVar("T")
+
+TOP_PRS = 30
+TOP_WEBHOOK_PRS = 20
+
+
+def iter_chunks(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def feature_columns(agents: Iterable[str], options: dict[str, dict[str, Any]] | None = None) -> list[str]:
+    """Columns the global ``agents`` read from earlier stages; ``files`` becomes diff fingerprints."""
+    specs = with_option_inputs((AGENT_REGISTRY[name] for name in agents), options)
+    produced = {column for spec in specs for column in spec.outputs}
+    columns = ["pr_number"]
+    for spec in specs:
+        columns.extend(
+            column for column in spec.inputs if column != "files" and column not in produced and column not in columns
+        )
+    return columns
+
+
+def _patch_keys(frame: pd.DataFrame) -> list[str]:
+    return [
+        str(item.get("patch_sha") or "")
+        for files in frame["files"]
+        if isinstance(files, list)
+        for item in files
+        if isinstance(item, dict)
+    ]
+
+
+def _dump(path: Path, value: object) -> None:
+    path.write_bytes(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _load(path: Path) -> Any:
+    value = pickle.loads(path.read_bytes())
+    path.unlink()
+    return value
+
+
+@contextmanager
+def _pass(name: str, rows: int = 0) -> Iterator[dict[str, int]]:
+    """Records a pass like a DAG stage (``prion_stage_seconds`` and rows processed)."""
+    progress = {"rows": rows}
+    started = time.perf_counter()
+    status = "failed"
+    try:
+        yield progress
+        status = "ok"
+    finally:
+        seconds = time.perf_counter() - started
+        METRICS.set_gauge("prion_stage_seconds", seconds, stage=name)
+        METRICS.set_state("prion_stage_status", "status", status, stage=name)
+        if progress["rows"]:
+            METRICS.inc("prion_rows_processed_total", progress["rows"], stage=name)
+        LOGGER.info("Pass '%s' finished in %.2fs (%s)", name, seconds, status)
+
+
+def _merge_label_results(total: dict[str, Any], result: dict[str, Any]) -> None:
+    for key, value in result.items():
+        total[key] = value if isinstance(value, bool) else total.get(key, 0) + value
+
+
+def run_chunked_pipeline(
+    settings: RuntimeSettings,
+    records: Iterable[dict[str, Any]] | None = None,
+) -> dict[str, object]:
+    """Runs fetch, score, queue, label, report and deliver in ``settings.chunk_size`` chunks.
+
+    ``records`` replaces the GitHub ingestion (any iterable of hydrated PR records).
+    """
+    chunk_size = int(settings.chunk_size or 0)
+    if chunk_size <= 0:
+        raise ValueError("run_chunked_pipeline needs a positive CHUNK_SIZE")
+    files_cache = None
+    if records is None:
+        files_cache = pr_files_cache(settings)
+        records = GitHubPullRequestIngestor(github_config(settings), files_cache=files_cache).iter_pull_requests(
+            state="open",
+            max_prs=settings.max_prs,
+            include_reviews=bool(settings.reputation_graph_path),
+        )
+
+    author_store = AuthorHistoryStore(settings.author_history_path) if settings.author_history_path else None
+    if author_store is not None and not len(author_store):
+        author_store.backfill(GitHubPullRequestIngestor(github_config(settings)))
+    elif author_store is not None:
+        author_store.catch_up(GitHubPullRequestIngestor(github_config(settings)))
+    reputation_graph = ReputationGraph(settings.reputation_graph_path) if settings.reputation_graph_path else None
+
+    with tempfile.TemporaryDirectory(prefix="prion-chunks-") as spill_dir:
+        spill = Path(spill_dir)
+        patch_dir = Path(settings.patch_store_dir) if settings.patch_store_dir else spill / "patches"
+        chunks = 0
+        with _pass("ingest_chunks") as progress:
+            for chunk in iter_chunks(records, chunk_size):
+                frame = records_to_frame(chunk)
+                del chunk
+                if author_store is not None:
+                    author_store.update_from_frame(frame)
+                if reputation_graph is not None:
+                    reputation_graph.update_from_frame(frame)
+                # Shared by every chunk: a duplicate diff may be referenced after it left memory.
+                DEFAULT_PATCH_STORE.take(_patch_keys(frame)).save(patch_dir, measure=False)
+                _dump(spill / f"input-{chunks:05d}.pkl", frame)
+                chunks += 1
+                progress["rows"] += len(frame)
+            if files_cache is not None:
+                files_cache.save()
+            if author_store is not None:
+                author_store.save()
+            if reputation_graph is not None:
+                reputation_graph.save()
+        rows = progress["rows"]
+        LOGGER.info("Spilled %s PRs in %s chunks of up to %s", rows, chunks, chunk_size)
+
+        options = agent_options(settings, author_store, reputation_graph)
+        local = local_agents(options=options)
+        cross = [name for name in AGENT_REGISTRY if name not in local]
+        features = feature_columns(cross, options)
+        parts: list[pd.DataFrame] = []
+        file_sets: list[frozenset[str]] = []
+        with _pass("score_chunks", rows):
+            for chunk_id in range(chunks):
+                frame = _load(spill / f"input-{chunk_id:05d}.pkl")
+                DEFAULT_PATCH_STORE.update(PatchStore.load(patch_dir, _patch_keys(frame)))
+                if not settings.content_scan_cache_path:
+                    # Not persisted, so only worth keeping for the chunk at hand.
+                    options["content_scan"]["cache"] = ScanCache()
+                scored = run_agents(frame, agents=local, options=options, max_workers=settings.pipeline_workers)
+                file_sets.extend(pr_file_fingerprints(files) for files in scored["files"])
+                parts.append(scored[features])
+                _dump(spill / f"scored-{chunk_id:05d}.pkl", scored[[column for column in REPORT_COLUMNS if column in scored.columns]])
+                DEFAULT_PATCH_STORE.take(_patch_keys(frame))
+                del frame, scored
+
+        with _pass("global", rows):
+            # Categories inferred per chunk differ, so the concatenated columns are recast.
+            compact = apply_schema(pd.concat(parts, ignore_index=True)) if parts else pd.DataFrame(columns=features)
+            del parts
+            record_frame_memory("compact", compact)
+            cross_options = {name: dict(values) for name, values in options.items()}
+            cross_options["dedupe"] = {
+                **cross_options.get("dedupe", {}),
+                "pairs": TitleCandidateIndex(dedupe_titles(compact)).pairs(),
+                "file_sets": file_sets,
+            }
+            compact = run_agents(compact, agents=cross, options=cross_options)
+            del file_sets, cross_options
+
+        if settings.priority_queue_path:
+            queue = PersistentPriorityQueue(settings.priority_queue_path)
+            queue_summary = queue.update_from_frame(compact, prune=settings.max_prs is None)
+            queue.save()
+        else:
+            queue_summary = None
+
+        with _pass("report_chunks", rows):
+            values = _write_chunked_reports(settings, spill, chunks, compact)
+        values["queue_summary"] = queue_summary
+
+    values.update(_deliver_stage(settings, values["webhook_paths"]))
+    return values
+
+
+def _write_chunked_reports(
+    settings: RuntimeSettings,
+    spill: Path,
+    chunks: int,
+    compact: pd.DataFrame,
+) -> dict[str, Any]:
+    reports_dir = Path(settings.report_dir)
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    report_paths = {
+        "daily_csv": reports_dir / "daily_report.csv",
+        "top_csv": reports_dir / "top_prs.csv",
+        "md_report": reports_dir / "daily_report.md",
+        "priority_csv": reports_dir / "priority_report.csv",
+        "components_csv": reports_dir / "priority_components.csv",
+    }
+
+    def ranked(k: int, ascending: list[bool]) -> np.ndarray:
+        if compact.empty:
+            return np.empty(0, dtype=np.int64)
+        keys = [compact[column].to_numpy() for column in ("priority_score", "risk_score")]
+        return top_k_indices(keys, k, ascending=ascending)
+
+    top_positions = ranked(TOP_PRS, [False, True])
+    webhook_positions = ranked(TOP_WEBHOOK_PRS, [False, False])
+    wanted = np.union1d(top_positions, webhook_positions)
+
+    global_columns = [column for column in compact.columns if column in REPORT_COLUMNS]
+    labeling_result: dict[str, Any] = {}
+    collected: list[pd.DataFrame] = []
+    offset = 0
+    for chunk_id in range(chunks):
+        part = _load(spill / f"scored-{chunk_id:05d}.pkl")
+        stop = offset + len(part)
+        for column in global_columns:
+            if column not in part.columns:
+                part[column] = compact[column].to_numpy()[offset:stop]
+        report = part[[column for column in REPORT_COLUMNS if column in part.columns]]
+        report.to_csv(report_paths["daily_csv"], mode="w" if chunk_id == 0 else "a", header=chunk_id == 0, index=False)
+        _merge_label_results(
+            labeling_result,
+            label_prs(
+                report,
+                github_token=settings.github_token,
+                repo_owner=settings.repo_owner,
+                repo_name=settings.repo_name,
+                shadow_mode=settings.shadow_mode,
+                allow_shadow_writes=settings.write_labels_in_shadow_mode,
+            ),
+        )
+        selected = wanted[(wanted >= offset) & (wanted < stop)]
+        if len(selected):
+            collected.append(report.iloc[selected - offset].set_axis(selected))
+        offset = stop
+    if not chunks:
+        pd.DataFrame(columns=REPORT_COLUMNS).to_csv(report_paths["daily_csv"], index=False)
+    LOGGER.info("Labeling summary: %s", labeling_result)
+
+    top_rows = pd.concat(collected) if collected else pd.DataFrame(columns=REPORT_COLUMNS)
+    top_prs = top_rows.loc[top_positions]
+    top_prs.to_csv(report_paths["top_csv"], index=False)
+    compact[PRIORITY_COLUMNS].sort_values(by="priority_rank").to_csv(report_paths["priority_csv"], index=False)
+    compact.reindex(columns=PRIORITY_SIGNAL_COLUMNS).to_csv(report_paths["components_csv"], index=False)
+    _write_markdown_report(compact, top_prs, report_paths["md_report"])
+    webhook_paths = export_webhook_payloads(
+        compact,
+        settings.report_dir,
+        top=top_rows.loc[webhook_positions].to_dict(orient="records"),
+    )
+    return {"report_paths": report_paths, "webhook_paths": webhook_paths, "labeling_result": labeling_result}
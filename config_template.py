@@ -11,7 +11,42 @@ COMMENT_MODE = False       # True = visible comments and labels
 # Runtime controls
 MAX_PRS = None             # Optional int limit, e.g. 500 for dry runs
 REPORTS_DIR = "reports"
+PATCH_STORE_DIR = None     # Optional dir for the content-addressed patch store, e.g. "reports/patches"
 LOG_LEVEL = "INFO"
+DEDUPE_WORKERS = None      # Optional int, e.g. 8 to score title pairs in a process pool
+CONTENT_SCAN_WORKERS = None     # Optional int, process pool size for the diff content scanner
+CONTENT_SCAN_CACHE_PATH = None  # Optional JSON file caching scan results per patch hash
+AUTHOR_HISTORY_PATH = None      # Optional JSON author history store; backfilled on first run
+REPUTATION_GRAPH_PATH = None    # Optional JSON reviewer/author graph; enables review ingestion
+PRIORITY_QUEUE_PATH = None      # Optional JSON review queue kept across runs
+CHECKPOINT_DIR = None           # Optional stage checkpoints; enables --resume/--from-stage/--only-stage
+PIPELINE_WORKERS = 4            # Max pipeline stages / independent agents running concurrently
+GITHUB_PAGE_WORKERS = 4         # Max concurrent page requests when a GitHub listing has a `last` link (1 = sequential)
+PR_FILES_CACHE_PATH = None      # Optional JSON files cache keyed by PR head SHA; needs PATCH_STORE_DIR
+CHUNK_SIZE = None               # Optional int, e.g. 2000: stream PRs through the pipeline in bounded memory
+SCORE_SHARDS = None             # Optional int, e.g. 8 to score PR partitions in worker processes
+SHARD_STRATEGY = "hash"         # SCORE_SHARDS partitioning by pr_number: "hash" or "range"
+SHARD_WORK_DIR = None           # Optional shared dir; `python main.py shard-worker` on other machines joins in
+DAEMON_INTERVAL_SECONDS = 900   # --daemon: seconds between incremental pipeline cycles
+DAEMON_HOST = "127.0.0.1"       # --daemon: status endpoint bind address
+DAEMON_PORT = 8787              # --daemon: status endpoint port (None disables it)
+RUN_MANIFEST_PATH = None        # Run timings/HTTP/cache metrics; None -> <REPORT_DIR>/run_manifest.json, False disables
+PROMETHEUS_TEXTFILE_PATH = None # Optional .prom file for the node_exporter textfile collector
+FRESHNESS_MODEL = None          # Optional overrides, e.g. {"idle_half_life_days": 7, "time_weight": 0.6}
+
+# Sensitive path policy (optional). None keeps the built-in substring hints.
+# Globs follow CODEOWNERS semantics; weight is the risk added when a PR touches a match.
+# SENSITIVE_PATH_RULES = [
+#     {"name": "ci", "pattern": "/.github/workflows/", "weight": 25},
+#     {"name": "auth", "pattern": "**/auth/**", "weight": 20},
+#     {"name": "secrets", "pattern": "secret", "kind": "substring", "weight": 30},
+# ]
+SENSITIVE_PATH_RULES = None
+
+# Scoring rule overrides (optional). JSON or YAML files in the format of
+# agents.rules.TRUST_RULES / RISK_RULES; None keeps the built-in rule sets.
+TRUST_RULES_FILE = None
+RISK_RULES_FILE = None
 
 # Safety controls
 # In SHADOW_MODE this should remain False to avoid visible writes to GitHub.
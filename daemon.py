@@ -0,0 +1,246 @@
+"""Resident PRion process: incremental pipeline cycles with warm state and a status endpoint.
+
+Run with ``python main_pipeline.py --daemon`` (settings: ``DAEMON_INTERVAL_SECONDS``,
+``DAEMON_HOST``, ``DAEMON_PORT``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pandas as pd
+
+from ingestion.github_fetch import GitHubPullRequestIngestor, records_to_frame
+from main_pipeline import PipelineCaches, build_pipeline_stages, export_metrics, github_config, pipeline_code_version, pr_files_cache
+from metrics import record_cache
+from pipeline_dag import CheckpointStore, run_stages
+from runtime_config import RuntimeSettings
+
+LOGGER = logging.getLogger("prion.daemon")
+
+
+class IncrementalPullRequests:
+    """Open PRs kept in memory; each refresh hydrates only PRs whose ``updated_at`` moved.
+
+    One paginated ``/pulls`` listing per cycle finds new, updated and closed PRs; the
+    ingestor (and its pooled HTTP session) is reused across cycles. Its files cache is
+    keyed by head SHA, so a PR that only gained comments or labels costs one detail call.
+    Patches no open PR references any more leave the patch store, and with ``caches``
+    their scan results and the embeddings of closed PRs are dropped too, so a resident
+    process does not grow with every PR it has ever seen.
+    """
+
+    def __init__(
+        self,
+        ingestor: GitHubPullRequestIngestor,
+        *,
+        max_prs: int | None = None,
+        include_reviews: bool = False,
+        caches: PipelineCaches | None = None,
+    ):
+        self.ingestor = ingestor
+        self.max_prs = max_prs
+        self.include_reviews = include_reviews
+        self.caches = caches
+        self._records: dict[int, dict[str, Any]] = {}
+        self.last_refresh: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def refresh(self) -> pd.DataFrame:
+        summaries = self.ingestor.fetch_pull_summaries(state="open", sort="updated", direction="desc")
+        if self.max_prs is not None:
+            summaries = summaries[: self.max_prs]
+        numbers = [int(summary["number"]) for summary in summaries]
+
+        hydrated = 0
+        dropped: set[str] = set()
+        for summary, number in zip(summaries, numbers):
+            cached = self._records.get(number)
+            if cached is None or cached["updated_at"] != (summary.get("updated_at") or ""):
+                if cached is not None:
+                    dropped |= _patch_keys(cached)
+                self._records[number] = self.ingestor.hydrate_pull_request(
+                    number, include_files=True, include_reviews=self.include_reviews
+                )
+                hydrated += 1
+        open_numbers = set(numbers)
+        closed = [number for number in self._records if number not in open_numbers]
+        for number in closed:
+            dropped |= _patch_keys(self._records.pop(number))
+        self.ingestor.files_cache.discard(closed)
+        self.ingestor.files_cache.save()
+        evicted = self._evict(dropped, closed)
+
+        self.last_refresh = {"open": len(numbers), "hydrated": hydrated, "removed": len(closed), "evicted_patches": evicted}
+        record_cache("pull_request_records", hits=len(numbers) - hydrated, misses=hydrated)
+        LOGGER.info("Incremental refresh: %s", self.last_refresh)
+        return records_to_frame([self._records[number] for number in numbers])
+
+    def _evict(self, dropped: set[str], closed: list[int]) -> int:
+        """Drops patches (and their scan results) of replaced or closed PRs that no open PR shares."""
+        if dropped:
+            dropped -= set().union(*(_patch_keys(record) for record in self._records.values()))
+        self.ingestor.patch_store.take(dropped)
+        if self.caches is not None:
+            if self.caches.scan_cache is not None:
+                for key in dropped:
+                    self.caches.scan_cache.results.pop(key, None)
+            if self.caches.embeddings is not None:
+                self.caches.embeddings.discard(closed)
+        return len(dropped)
+
+
+def _patch_keys(record: dict[str, Any]) -> set[str]:
+    return {str(item["patch_sha"]) for item in record.get("files") or [] if item.get("patch_sha")}
+
+
+class PipelineDaemon:
+    """Runs pipeline cycles every ``interval_seconds`` on one scheduler thread.
+
+    Cycles never overlap: ticks and ``trigger()`` calls that arrive while a cycle is
+    running coalesce into a single follow-up cycle instead of queueing up.
+    """
+
+    def __init__(self, settings: RuntimeSettings, *, interval_seconds: float | None = None) -> None:
+        self.settings = settings
+        self.interval_seconds = float(interval_seconds if interval_seconds is not None else settings.daemon_interval_seconds)
+        self.caches = PipelineCaches()
+        self.pull_requests = IncrementalPullRequests(
+            GitHubPullRequestIngestor(github_config(settings), files_cache=pr_files_cache(settings)),
+            max_prs=settings.max_prs,
+            include_reviews=bool(settings.reputation_graph_path),
+            caches=self.caches,
+        )
+        self.checkpoints = CheckpointStore(settings.checkpoint_dir) if settings.checkpoint_dir else None
+        self.values: dict[str, Any] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._server: ThreadingHTTPServer | None = None
+        self._status: dict[str, Any] = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "cycles": 0,
+            "failures": 0,
+            "coalesced_triggers": 0,
+            "running": False,
+            "last_cycle": None,
+            "last_error": None,
+        }
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            status = dict(self._status)
+        status["open_prs"] = len(self.pull_requests)
+        status["interval_seconds"] = self.interval_seconds
+        return status
+
+    def trigger(self) -> None:
+        """Requests a cycle as soon as possible; coalesces with any pending request."""
+        with self._lock:
+            if self._wake.is_set() or self._status["running"]:
+                self._status["coalesced_triggers"] += 1
+        self._wake.set()
+
+    def run_cycle(self) -> dict[str, Any]:
+        started = time.perf_counter()
+        with self._lock:
+            self._status["running"] = True
+        summary: dict[str, Any] = {"started_at": datetime.now(timezone.utc).isoformat()}
+        try:
+            self.values = run_stages(
+                build_pipeline_stages(self.settings, fetch=self.pull_requests.refresh, caches=self.caches),
+                max_workers=self.settings.pipeline_workers,
+                checkpoints=self.checkpoints,
+                code_version=pipeline_code_version(self.settings) if self.checkpoints is not None else "",
+            )
+            summary.update(status="ok", **self.pull_requests.last_refresh)
+        except Exception as exc:  # noqa: BLE001 - a failed cycle must not stop the daemon
+            LOGGER.exception("Daemon cycle failed: %s", exc)
+            summary.update(status="failed", error=str(exc))
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        with self._lock:
+            self._status["running"] = False
+            self._status["cycles"] += 1
+            self._status["last_cycle"] = summary
+            if summary["status"] == "failed":
+                self._status["failures"] += 1
+                self._status["last_error"] = summary["error"]
+            cycles = self._status["cycles"]
+        # Metrics accumulate over the daemon's lifetime, as Prometheus counters expect.
+        export_metrics(self.settings, status=summary["status"], mode="daemon", cycle=cycles)
+        return summary
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.run_cycle()
+            # A cycle longer than the interval starts the next one right away, but only once.
+            self._wake.wait(self.interval_seconds)
+
+    def start(self, *, serve: bool = True) -> None:
+        self._thread = threading.Thread(target=self._loop, name="prion-daemon", daemon=True)
+        self._thread.start()
+        if serve and self.settings.daemon_port is not None:
+            self._server = ThreadingHTTPServer((self.settings.daemon_host, self.settings.daemon_port), _handler(self))
+            threading.Thread(target=self._server.serve_forever, name="prion-daemon-http", daemon=True).start()
+            LOGGER.info("Daemon status endpoint on http://%s:%s/status", *self._server.server_address[:2])
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            while self._thread is not None and self._thread.is_alive():
+                self._thread.join(timeout=1.0)
+        except KeyboardInterrupt:
+            LOGGER.info("Stopping daemon")
+        finally:
+            self.stop()
+
+
+def _handler(daemon: PipelineDaemon) -> type[BaseHTTPRequestHandler]:
+    class StatusHandler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload: dict[str, Any]) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            if self.path == "/healthz":
+                alive = daemon._thread is not None and daemon._thread.is_alive()
+                self._send(200 if alive else 503, {"status": "ok" if alive else "down"})
+            elif self.path == "/status":
+                self._send(200, daemon.status())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server API
+            if self.path == "/trigger":
+                daemon.trigger()
+                self._send(202, {"status": "scheduled"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - signature from base class
+            LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    return StatusHandler
@@ -0,0 +1,242 @@
+"""Typed schema of the shared PR frame.
+
+Low-cardinality strings (PR state, author, bands, reason lists) are categoricals, counts
+are ``int32`` and per-rule score contributions ``float32``. Free text uses ``STRING_DTYPE``,
+which is Arrow-backed when pyarrow is installed. Scores, signals and ages stay ``float64``
+because reports print them and they decide ranking ties.
+
+``records_to_frame`` builds frames in this schema and ``run_agents`` casts every output
+column it writes, so each stage hands the next one a compact frame. Nested columns
+(``files``, ``labels``, ``reviews``) can move into long side tables keyed by
+``pr_number`` with ``split_side_tables``; ``join_side_tables`` rebuilds the lists for the
+agents that read them.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+from dataclasses import fields
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _string_dtype() -> Any:
+    """NaN-semantics strings, Arrow-backed with pyarrow; ``None`` (keep object) on pandas < 2.3."""
+    storage = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "python"
+    try:
+        return pd.StringDtype(storage, na_value=np.nan)
+    except TypeError:  # pragma: no cover - pandas < 2.3
+        return None
+
+
+STRING_DTYPE = _string_dtype()
+
+BAND_DTYPE = pd.CategoricalDtype(["low", "medium", "high"], ordered=True)
+BUCKET_DTYPE = pd.CategoricalDtype(["low", "medium", "high", "critical"], ordered=True)
+
+PR_FRAME_SCHEMA: dict[str, Any] = {
+    # ingestion
+    "pr_number": "int32",
+    "title": STRING_DTYPE,
+    "state": "category",
+    "draft": "bool",
+    "author": "category",
+    "url": STRING_DTYPE,
+    "additions": "int32",
+    "deletions": "int32",
+    "changed_files": "int32",
+    "comments": "int32",
+    "review_comments": "int32",
+    "body": STRING_DTYPE,
+    # agents
+    "author_history_known": "int32",
+    "author_merged_prs": "int32",
+    "author_closed_prs": "int32",
+    "author_open_prs": "int32",
+    "author_reverted_prs": "int32",
+    "embedding_dim": "int32",
+    "content_secret_hits": "int32",
+    "content_encoded_blob_hits": "int32",
+    "content_high_entropy_hits": "int32",
+    "content_obfuscation_hits": "int32",
+    "cluster": "int32",
+    "duplicate_count": "int32",
+    "patch_fingerprint": STRING_DTYPE,
+    "patch_duplicate_count": "int32",
+    "patch_near_duplicate_count": "int32",
+    "risk_band": BAND_DTYPE,
+    "risk_flags": "category",
+    "risk_path_rules": "category",
+    "trust_band": BAND_DTYPE,
+    "trust_reasons": "category",
+    "priority_bucket": BUCKET_DTYPE,
+    "priority_rank": "int32",
+    "priority_reasons": "category",
+}
+# Explanatory per-rule contributions; their names come from the (configurable) rule sets.
+FLOAT32_PREFIXES = ("risk_rule_", "trust_rule_")
+
+_INT32 = np.iinfo(np.int32)
+
+
+def column_dtype(column: str) -> Any:
+    """Schema dtype of ``column``, or ``None`` when the column keeps its inferred dtype."""
+    if column in PR_FRAME_SCHEMA:
+        return PR_FRAME_SCHEMA[column]  # None for strings when pandas cannot store them compactly
+    if column.startswith(FLOAT32_PREFIXES):
+        return "float32"
+    return None
+
+
+def _cast(series: pd.Series, dtype: Any) -> pd.Series | None:
+    """``series`` as ``dtype``, or ``None`` when it already is or the cast would lose data."""
+    if series.dtype == dtype:
+        return None
+    if dtype in ("int32", "float32", "bool"):
+        if not pd.api.types.is_numeric_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+            return None
+        if dtype == "int32":
+            values = series.to_numpy()
+            if not pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                return None
+            if len(values) and (values.min() < _INT32.min or values.max() > _INT32.max):
+                return None
+        elif dtype == "float32" and not pd.api.types.is_float_dtype(series.dtype):
+            return None
+        return series.astype(dtype)
+    # Strings: categories and Arrow strings only replace text columns without lists or dicts.
+    if not (pd.api.types.is_string_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype)):
+        return None
+    if series.dtype == object and not series.map(lambda value: value is None or isinstance(value, str), na_action="ignore").all():
+        return None
+    if isinstance(dtype, pd.CategoricalDtype) and dtype.categories is not None:
+        if not series.dropna().isin(dtype.categories).all():
+            return series.astype("category")
+    return series.astype(dtype)
+
+
+def apply_schema(frame: pd.DataFrame, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """Casts the schema columns of ``frame`` (or just ``columns``) in place and returns it.
+
+    Casts that would lose data (missing values in counts, out-of-range numbers, objects in
+    text columns) are skipped, so frames built by hand keep working.
+    """
+    for column in list(frame.columns) if columns is None else columns:
+        dtype = column_dtype(column)
+        if dtype is None or column not in frame.columns:
+            continue
+        cast = _cast(frame[column], dtype)
+        if cast is not None:
+            frame[column] = cast
+    return frame
+
+
+def _side_table_fields() -> dict[str, tuple[str, ...]]:
+    from ingestion.github_fetch import PullRequestFile, PullRequestReview
+
+    return {
+        "files": tuple(item.name for item in fields(PullRequestFile)),
+        "labels": ("label",),
+        "reviews": tuple(item.name for item in fields(PullRequestReview)),
+    }
+
+
+SIDE_TABLE_SCHEMA: dict[str, dict[str, Any]] = {
+    "files": {
+        "filename": STRING_DTYPE,
+        "status": "category",
+        "additions": "int32",
+        "deletions": "int32",
+        "changes": "int32",
+        "patch_sha": STRING_DTYPE,
+        "blob_url": STRING_DTYPE,
+        "raw_url": STRING_DTYPE,
+    },
+    "labels": {"label": "category"},
+    "reviews": {"reviewer": "category", "state": "category", "submitted_at": STRING_DTYPE},
+}
+
+
+def split_side_tables(frame: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    """Moves the nested columns of ``frame`` into long tables with a ``pr_number`` column.
+
+    ``files`` and ``reviews`` become one row per file/review with one column per field,
+    ``labels`` one row per label. The returned frame no longer has the nested columns.
+    """
+    tables: dict[str, pd.DataFrame] = {}
+    for name, table_fields in _side_table_fields().items():
+        if name not in frame.columns:
+            continue
+        numbers: list[int] = []
+        rows: list[tuple[Any, ...]] = []
+        for number, items in zip(frame["pr_number"].tolist(), frame[name]):
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                numbers.append(number)
+                rows.append((item,) if name == "labels" else tuple(item.get(field) for field in table_fields))
+        table = pd.DataFrame(rows, columns=list(table_fields)) if rows else pd.DataFrame(columns=list(table_fields))
+        table.insert(0, "pr_number", np.asarray(numbers, dtype=np.int32))
+        for column, dtype in SIDE_TABLE_SCHEMA[name].items():
+            cast = _cast(table[column], dtype) if dtype is not None else None
+            if cast is not None:
+                table[column] = cast
+        tables[name] = table
+    return frame.drop(columns=list(tables)), tables
+
+
+def join_side_tables(
+    frame: pd.DataFrame,
+    tables: dict[str, pd.DataFrame],
+    names: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """A copy of ``frame`` with the nested columns of ``tables`` (or just ``names``) rebuilt."""
+    joined = frame.copy()
+    for name in tables if names is None else names:
+        table = tables[name]
+        if name == "labels":
+            items = table["label"].tolist()
+        else:
+            columns = [column for column in table.columns if column != "pr_number"]
+            items = [
+                dict(zip(columns, values))
+                for values in zip(*(table[column].tolist() for column in columns))
+            ]
+        per_pr: dict[int, list[Any]] = {}
+        for number, item in zip(table["pr_number"].tolist(), items):
+            per_pr.setdefault(number, []).append(item)
+        joined[name] = [per_pr.get(number, []) for number in joined["pr_number"].tolist()]
+    return joined
+
+
+def frame_bytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def record_frame_memory(name: str, frame: pd.DataFrame, tables: dict[str, pd.DataFrame] | None = None) -> dict[str, int]:
+    """Reports the deep memory of ``frame`` (and its side tables) as ``prion_frame_bytes``.
+
+    The largest columns are logged, so a run shows where its memory goes.
+    """
+    report = {name: frame_bytes(frame)}
+    for table_name, table in (tables or {}).items():
+        report[f"{name}.{table_name}"] = frame_bytes(table)
+    for key, value in report.items():
+        METRICS.set_gauge("prion_frame_bytes", value, frame=key)
+    if len(frame.columns):
+        usage = frame.memory_usage(index=False, deep=True).sort_values(ascending=False)
+        LOGGER.info(
+            "Frame '%s': %s rows, %s bytes (largest columns: %s)",
+            name,
+            len(frame),
+            sum(report.values()),
+            ", ".join(f"{column}={int(value)}" for column, value in usage.head(5).items()),
+        )
+    return report
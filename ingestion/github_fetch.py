@@ -2,15 +2,62 @@ from __future__ import annotations
 
 import logging
 import time
-from dataclasses import asdict, dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import pandas as pd
 import requests
 
+from frame_schema import apply_schema
+from memory.files_cache import PullRequestFilesCache
+from memory.patch_store import DEFAULT_PATCH_STORE, PatchStore, build_combined_diff
+from metrics import instrument_session, record_cache
+
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def _page_number(url: str | None) -> int | None:
+	"""The ``page`` query parameter of a GitHub pagination link, if it has one."""
+	if not url:
+		return None
+	value = dict(parse_qsl(urlsplit(url).query)).get("page", "")
+	return int(value) if value.isdigit() else None
+
+
+def _with_page(url: str, page: int) -> str:
+	parts = urlsplit(url)
+	query = [(key, value) for key, value in parse_qsl(parts.query) if key != "page"]
+	return urlunsplit(parts._replace(query=urlencode([*query, ("page", str(page))])))
+
+
+def _ordered_results(fetch: Callable[[str], T], urls: list[str], workers: int) -> Iterator[T]:
+	"""``fetch(url)`` for every url, ``workers`` at a time, yielded in ``urls`` order.
+
+	At most ``2 * workers`` results are in flight or waiting, so a slow consumer bounds
+	memory; closing the generator cancels the requests that have not started.
+	"""
+	pending: deque[Future[T]] = deque()
+	remaining = iter(urls)
+	with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prion-page") as pool:
+		try:
+			for url in islice(remaining, 2 * workers):
+				pending.append(pool.submit(fetch, url))
+			while pending:
+				result = pending.popleft().result()
+				for url in islice(remaining, 1):
+					pending.append(pool.submit(fetch, url))
+				yield result
+		finally:
+			for future in pending:
+				future.cancel()
+
 
 @dataclass(slots=True)
 class GitHubRepoConfig:
@@ -20,8 +67,12 @@ class GitHubRepoConfig:
 	api_base_url: str = "https://api.github.com"
 	timeout_seconds: int = 30
 	max_retries: int = 4
+	# Concurrent page requests once a listing's ``last`` link is known; 1 keeps it sequential.
+	page_workers: int = 4
 
 
+# Field layout of hydrated records. ``hydrate_pull_request`` builds plain dicts with these
+# fields directly from the parsed JSON instead of instantiating the dataclasses.
 @dataclass(slots=True)
 class PullRequestFile:
 	filename: str
@@ -29,11 +80,18 @@ class PullRequestFile:
 	additions: int
 	deletions: int
 	changes: int
-	patch: str
+	patch_sha: str
 	blob_url: str
 	raw_url: str
 
 
+@dataclass(slots=True)
+class PullRequestReview:
+	reviewer: str
+	state: str
+	submitted_at: str
+
+
 @dataclass(slots=True)
 class PullRequestRecord:
 	number: int
@@ -54,12 +112,20 @@ class PullRequestRecord:
 	comments: int
 	review_comments: int
 	files: list[PullRequestFile]
-	combined_diff: str
+	reviews: list[PullRequestReview] = field(default_factory=list)
 
 
 class GitHubPullRequestIngestor:
-	def __init__(self, config: GitHubRepoConfig) -> None:
+	def __init__(
+		self,
+		config: GitHubRepoConfig,
+		patch_store: PatchStore | None = None,
+		files_cache: PullRequestFilesCache | None = None,
+	) -> None:
 		self.config = config
+		self.patch_store = patch_store if patch_store is not None else DEFAULT_PATCH_STORE
+		# Re-hydrating a PR whose head did not move (comments, labels) skips the files listing.
+		self.files_cache = files_cache if files_cache is not None else PullRequestFilesCache()
 		self.session = requests.Session()
 		self.session.headers.update(
 			{
@@ -68,6 +134,11 @@ class GitHubPullRequestIngestor:
 				"X-GitHub-Api-Version": "2022-11-28",
 			}
 		)
+		# Pages of one listing share the pooled connections; keep one per page worker.
+		adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, config.page_workers))
+		self.session.mount("https://", adapter)
+		self.session.mount("http://", adapter)
+		instrument_session(self.session, service="github")
 
 	def _request(
 		self,
@@ -111,63 +182,93 @@ class GitHubPullRequestIngestor:
 			response.raise_for_status()
 			return response
 
-	def _paginate(
+	def _get_page(self, url: str, params: dict[str, Any] | None = None) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+		response = self._request("GET", url, params)
+		page_payload = response.json()
+		if not isinstance(page_payload, list):
+			raise ValueError("GitHub pagination expected list payload")
+		LOGGER.debug("Fetched page with %s records from %s", len(page_payload), url)
+		return page_payload, response.links
+
+	def _iter_pages(
 		self,
 		url: str,
 		params: dict[str, Any] | None = None,
-	) -> list[dict[str, Any]]:
-		items: list[dict[str, Any]] = []
-		current_url = url
-		current_params = params
-
-		while current_url:
-			response = self._request("GET", current_url, current_params)
-			page_payload = response.json()
-			if not isinstance(page_payload, list):
-				raise ValueError("GitHub pagination expected list payload")
-
-			items.extend(page_payload)
-			links = response.links
-			next_link = links.get("next", {}).get("url")
-			current_url = next_link
-			current_params = None
+	) -> Iterator[list[dict[str, Any]]]:
+		"""Yields the pages of a listing in order.
+
+		When the first response has a ``last`` link with a ``page`` number, the remaining
+		pages are requested up front, ``page_workers`` at a time. Otherwise (cursor-based
+		listings, or ``page_workers=1``) the ``next`` links are followed one by one.
+		"""
+		page, links = self._get_page(url, params)
+		yield page
+		last_page = _page_number(links.get("last", {}).get("url"))
+		if self.config.page_workers > 1 and last_page is not None and last_page > 2:
+			last_url = links["last"]["url"]
+			yield from _ordered_results(
+				lambda page_url: self._get_page(page_url)[0],
+				[_with_page(last_url, number) for number in range(2, last_page + 1)],
+				self.config.page_workers,
+			)
+			return
 
-			LOGGER.debug("Fetched page with %s records from %s", len(page_payload), url)
+		next_url = links.get("next", {}).get("url")
+		while next_url:
+			page, links = self._get_page(next_url)
+			yield page
+			next_url = links.get("next", {}).get("url")
 
-		return items
+	def _paginate(
+		self,
+		url: str,
+		params: dict[str, Any] | None = None,
+	) -> list[dict[str, Any]]:
+		return [item for page in self._iter_pages(url, params) for item in page]
 
-	def _fetch_pr_files(self, pr_number: int) -> list[PullRequestFile]:
+	def _fetch_pr_files(self, pr_number: int) -> list[dict[str, Any]]:
+		"""File entries with the fields of ``PullRequestFile``; the patch text goes to the store."""
 		files_url = (
 			f"{self.config.api_base_url}/repos/{self.config.owner}/{self.config.repo}/pulls/{pr_number}/files"
 		)
-		raw_files = self._paginate(files_url, params={"per_page": 100})
-
-		files: list[PullRequestFile] = []
-		for file_data in raw_files:
-			files.append(
-				PullRequestFile(
-					filename=file_data.get("filename", ""),
-					status=file_data.get("status", ""),
-					additions=int(file_data.get("additions", 0)),
-					deletions=int(file_data.get("deletions", 0)),
-					changes=int(file_data.get("changes", 0)),
-					patch=file_data.get("patch") or "",
-					blob_url=file_data.get("blob_url") or "",
-					raw_url=file_data.get("raw_url") or "",
-				)
-			)
-		return files
+		put = self.patch_store.put
+		return [
+			{
+				"filename": file_data.get("filename", ""),
+				"status": file_data.get("status", ""),
+				"additions": int(file_data.get("additions", 0)),
+				"deletions": int(file_data.get("deletions", 0)),
+				"changes": int(file_data.get("changes", 0)),
+				"patch_sha": put(file_data.pop("patch", None) or ""),
+				"blob_url": file_data.get("blob_url") or "",
+				"raw_url": file_data.get("raw_url") or "",
+			}
+			for file_data in self._paginate(files_url, params={"per_page": 100})
+		]
 
-	def fetch_pull_requests(
+	def _fetch_pr_reviews(self, pr_number: int) -> list[dict[str, Any]]:
+		"""Review entries with the fields of ``PullRequestReview``."""
+		reviews_url = (
+			f"{self.config.api_base_url}/repos/{self.config.owner}/{self.config.repo}/pulls/{pr_number}/reviews"
+		)
+		return [
+			{
+				"reviewer": (review.get("user") or {}).get("login") or "",
+				"state": review.get("state") or "",
+				"submitted_at": review.get("submitted_at") or "",
+			}
+			for review in self._paginate(reviews_url, params={"per_page": 100})
+		]
+
+	def iter_pull_summaries(
 		self,
 		*,
 		state: str = "all",
-		sort: str = "updated",
-		direction: str = "desc",
+		sort: str = "created",
+		direction: str = "asc",
 		since: datetime | None = None,
-		max_prs: int | None = None,
-		include_files: bool = True,
-	) -> list[dict[str, Any]]:
+	) -> Iterator[dict[str, Any]]:
+		"""Yields PR summaries page by page (one request per 100 PRs, no per-PR hydration)."""
 		pulls_url = f"{self.config.api_base_url}/repos/{self.config.owner}/{self.config.repo}/pulls"
 		params: dict[str, Any] = {
 			"state": state,
@@ -177,7 +278,79 @@ class GitHubPullRequestIngestor:
 		}
 		if since is not None:
 			params["since"] = since.astimezone(timezone.utc).isoformat()
+		for page in self._iter_pages(pulls_url, params=params):
+			yield from page
+
+	def fetch_pull_summaries(
+		self,
+		*,
+		state: str = "all",
+		sort: str = "created",
+		direction: str = "asc",
+		since: datetime | None = None,
+	) -> list[dict[str, Any]]:
+		"""Lists PR summaries (one request per 100 PRs, no per-PR hydration)."""
+		return list(self.iter_pull_summaries(state=state, sort=sort, direction=direction, since=since))
 
+	def hydrate_pull_request(
+		self,
+		pr_number: int,
+		*,
+		include_files: bool = True,
+		include_reviews: bool = False,
+	) -> dict[str, Any]:
+		"""Fetches detail (and optionally files and reviews) of one PR as a record dict.
+
+		The record has the fields of ``PullRequestRecord`` and is built straight from the
+		parsed JSON: no dataclass instances and no ``asdict`` deep copy per record.
+		"""
+		detail_url = f"{self.config.api_base_url}/repos/{self.config.owner}/{self.config.repo}/pulls/{pr_number}"
+		detail = self._request("GET", detail_url).json()
+		files: list[dict[str, Any]] = []
+		if include_files:
+			head_sha = (detail.get("head") or {}).get("sha") or ""
+			cached = self.files_cache.get(pr_number, head_sha, self.patch_store)
+			record_cache("pr_files", hits=int(cached is not None), misses=int(cached is None))
+			if cached is not None:
+				files = cached
+			else:
+				files = self._fetch_pr_files(pr_number)
+				self.files_cache.put(pr_number, head_sha, files)
+
+		return {
+			"number": pr_number,
+			"title": detail.get("title") or "",
+			"state": detail.get("state") or "",
+			"draft": bool(detail.get("draft", False)),
+			"user_login": (detail.get("user") or {}).get("login") or "",
+			"created_at": detail.get("created_at") or "",
+			"updated_at": detail.get("updated_at") or "",
+			"merged_at": detail.get("merged_at"),
+			"html_url": detail.get("html_url") or "",
+			"body": detail.get("body") or "",
+			"labels": [label.get("name", "") for label in detail.get("labels", [])],
+			"additions": int(detail.get("additions", 0)),
+			"deletions": int(detail.get("deletions", 0)),
+			"changed_files": int(detail.get("changed_files", 0)),
+			"commits": int(detail.get("commits", 0)),
+			"comments": int(detail.get("comments", 0)),
+			"review_comments": int(detail.get("review_comments", 0)),
+			"files": files,
+			"reviews": self._fetch_pr_reviews(pr_number) if include_reviews else [],
+		}
+
+	def iter_pull_requests(
+		self,
+		*,
+		state: str = "all",
+		sort: str = "updated",
+		direction: str = "desc",
+		since: datetime | None = None,
+		max_prs: int | None = None,
+		include_files: bool = True,
+		include_reviews: bool = False,
+	) -> Iterator[dict[str, Any]]:
+		"""Yields hydrated PR records one at a time, so callers can process them in chunks."""
 		LOGGER.info(
 			"Starting PR ingestion for %s/%s (state=%s, max_prs=%s)",
 			self.config.owner,
@@ -186,47 +359,41 @@ class GitHubPullRequestIngestor:
 			max_prs,
 		)
 
-		pull_summaries = self._paginate(pulls_url, params=params)
-		LOGGER.info("Fetched %s PR summaries from GitHub", len(pull_summaries))
-
-		results: list[dict[str, Any]] = []
-		for idx, pr in enumerate(pull_summaries, start=1):
-			pr_number = int(pr["number"])
-			if max_prs is not None and len(results) >= max_prs:
-				break
-
-			LOGGER.info("Hydrating PR #%s (%s/%s)", pr_number, idx, len(pull_summaries))
-			detail_url = f"{self.config.api_base_url}/repos/{self.config.owner}/{self.config.repo}/pulls/{pr_number}"
-			detail = self._request("GET", detail_url).json()
-
-			files = self._fetch_pr_files(pr_number) if include_files else []
-			combined_diff = "\n\n".join(file.patch for file in files if file.patch)
-
-			record = PullRequestRecord(
-				number=pr_number,
-				title=detail.get("title") or "",
-				state=detail.get("state") or "",
-				draft=bool(detail.get("draft", False)),
-				user_login=(detail.get("user") or {}).get("login") or "",
-				created_at=detail.get("created_at") or "",
-				updated_at=detail.get("updated_at") or "",
-				merged_at=detail.get("merged_at"),
-				html_url=detail.get("html_url") or "",
-				body=detail.get("body") or "",
-				labels=[label.get("name", "") for label in detail.get("labels", [])],
-				additions=int(detail.get("additions", 0)),
-				deletions=int(detail.get("deletions", 0)),
-				changed_files=int(detail.get("changed_files", 0)),
-				commits=int(detail.get("commits", 0)),
-				comments=int(detail.get("comments", 0)),
-				review_comments=int(detail.get("review_comments", 0)),
-				files=files,
-				combined_diff=combined_diff,
-			)
-			results.append(asdict(record))
+		# Only the numbers are kept, and with ``max_prs`` no page beyond the limit is needed.
+		summaries = self.iter_pull_summaries(state=state, sort=sort, direction=direction, since=since)
+		numbers = [int(pr["number"]) for pr in islice(summaries, max_prs)]
+		summaries.close()
+		LOGGER.info("Fetched %s PR summaries from GitHub", len(numbers))
 
-		LOGGER.info("Completed PR ingestion. Total hydrated PRs: %s", len(results))
-		return results
+		for idx, pr_number in enumerate(numbers, start=1):
+			LOGGER.info("Hydrating PR #%s (%s/%s)", pr_number, idx, len(numbers))
+			yield self.hydrate_pull_request(pr_number, include_files=include_files, include_reviews=include_reviews)
+
+		LOGGER.info("Completed PR ingestion. Total hydrated PRs: %s", len(numbers))
+		LOGGER.info("Patch store usage: %s", self.patch_store.stats())
+
+	def fetch_pull_requests(
+		self,
+		*,
+		state: str = "all",
+		sort: str = "updated",
+		direction: str = "desc",
+		since: datetime | None = None,
+		max_prs: int | None = None,
+		include_files: bool = True,
+		include_reviews: bool = False,
+	) -> list[dict[str, Any]]:
+		return list(
+			self.iter_pull_requests(
+				state=state,
+				sort=sort,
+				direction=direction,
+				since=since,
+				max_prs=max_prs,
+				include_files=include_files,
+				include_reviews=include_reviews,
+			)
+		)
 
 
 def transform_for_storage(pr_records: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -248,7 +415,7 @@ def transform_for_storage(pr_records: list[dict[str, Any]]) -> list[dict[str, An
 				},
 				"content": {
 					"body": pr["body"],
-					"diff": pr["combined_diff"],
+					"diff": build_combined_diff(pr["files"]),
 					"files": pr["files"],
 				},
 			}
@@ -256,6 +423,87 @@ def transform_for_storage(pr_records: list[dict[str, Any]]) -> list[dict[str, An
 	return transformed
 
 
+PR_FRAME_COLUMNS = [
+	"pr_number",
+	"title",
+	"state",
+	"draft",
+	"author",
+	"created_at",
+	"updated_at",
+	"url",
+	"labels",
+	"additions",
+	"deletions",
+	"changed_files",
+	"comments",
+	"review_comments",
+	"body",
+	"files",
+	"reviews",
+]
+
+
+# Frame column -> record field; ``labels`` and ``reviews`` may be missing from a record.
+RECORD_FIELDS = {column: column for column in PR_FRAME_COLUMNS} | {
+	"pr_number": "number",
+	"author": "user_login",
+	"url": "html_url",
+}
+_OPTIONAL_LIST_COLUMNS = frozenset({"labels", "reviews"})
+
+
+def record_to_row(item: dict[str, Any]) -> dict[str, Any]:
+	"""Maps a hydrated PR record to a row of the normalized PR frame."""
+	return {
+		column: item.get(field, []) if column in _OPTIONAL_LIST_COLUMNS else item[field]
+		for column, field in RECORD_FIELDS.items()
+	}
+
+
+class PullRequestColumns:
+	"""Column buffers of the PR frame: records are appended field by field.
+
+	No per-row dict is built and nested lists are referenced, not copied. Each column
+	becomes its own array, whereas a frame built from row dicts keeps a 2-D object block
+	alive, so recasting or dropping a column would not release its values.
+	"""
+
+	def __init__(self) -> None:
+		self.columns: dict[str, list[Any]] = {column: [] for column in PR_FRAME_COLUMNS}
+		self._appenders = [
+			(self.columns[column].append, field, column in _OPTIONAL_LIST_COLUMNS)
+			for column, field in RECORD_FIELDS.items()
+		]
+
+	def __len__(self) -> int:
+		return len(self.columns["pr_number"])
+
+	def append(self, item: dict[str, Any]) -> None:
+		for append, field, optional in self._appenders:
+			append(item.get(field, []) if optional else item[field])
+
+	def extend(self, items: Iterable[dict[str, Any]]) -> PullRequestColumns:
+		for item in items:
+			self.append(item)
+		return self
+
+	def to_frame(self) -> pd.DataFrame:
+		"""The buffered rows as a frame in the ``frame_schema`` dtypes; the buffers are released."""
+		if not len(self):
+			return pd.DataFrame(columns=PR_FRAME_COLUMNS)
+		frame = apply_schema(pd.DataFrame(self.columns))
+		for values in self.columns.values():
+			values.clear()
+		return frame
+
+
+def records_to_frame(pr_records: Iterable[dict[str, Any]]) -> pd.DataFrame:
+	df = PullRequestColumns().extend(pr_records).to_frame()
+	LOGGER.info("fetch_all_prs generated dataframe with %s rows", len(df))
+	return df
+
+
 def fetch_all_prs(
 	token: str,
 	owner: str,
@@ -263,65 +511,22 @@ def fetch_all_prs(
 	*,
 	state: str = "open",
 	max_prs: int | None = None,
+	include_reviews: bool = False,
+	page_workers: int = 4,
+	files_cache: PullRequestFilesCache | None = None,
 ) -> pd.DataFrame:
 	"""Fetches pull requests from GitHub and returns a normalized DataFrame."""
 	if not token or not owner or not repo:
 		raise ValueError("token, owner and repo are required")
 
-	config = GitHubRepoConfig(token=token, owner=owner, repo=repo)
-	ingestor = GitHubPullRequestIngestor(config)
-	pr_records = ingestor.fetch_pull_requests(
+	config = GitHubRepoConfig(token=token, owner=owner, repo=repo, page_workers=page_workers)
+	ingestor = GitHubPullRequestIngestor(config, files_cache=files_cache)
+	# Streamed into column buffers; the hydrated records are never held as a list.
+	pr_records = ingestor.iter_pull_requests(
 		state=state,
 		max_prs=max_prs,
 		include_files=True,
+		include_reviews=include_reviews,
 	)
 
-	if not pr_records:
-		return pd.DataFrame(
-			columns=[
-				"pr_number",
-				"title",
-				"state",
-				"author",
-				"created_at",
-				"updated_at",
-				"url",
-				"labels",
-				"additions",
-				"deletions",
-				"changed_files",
-				"comments",
-				"review_comments",
-				"body",
-				"combined_diff",
-				"files",
-			]
-		)
-
-	rows: list[dict[str, Any]] = []
-	for item in pr_records:
-		rows.append(
-			{
-				"pr_number": item["number"],
-				"title": item["title"],
-				"state": item["state"],
-				"author": item["user_login"],
-				"created_at": item["created_at"],
-				"updated_at": item["updated_at"],
-				"url": item["html_url"],
-				"labels": item.get("labels", []),
-				"additions": item["additions"],
-				"deletions": item["deletions"],
-				"changed_files": item["changed_files"],
-				"comments": item["comments"],
-				"review_comments": item["review_comments"],
-				"body": item["body"],
-				"combined_diff": item["combined_diff"],
-				"files": item["files"],
-			}
-		)
-
-	df = pd.DataFrame(rows)
-	LOGGER.info("fetch_all_prs generated dataframe with %s rows", len(df))
-	return df
-
+	return records_to_frame(pr_records)
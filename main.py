@@ -1,5 +1,144 @@
-from main_pipeline import main
+"""PRion command line.
+
+``python main.py`` runs the full daily pipeline. The subcommands run one part of it
+against the stored stage snapshots (``CHECKPOINT_DIR`` or ``--snapshot-dir``)::
+
+    python main.py ingest     # fetch open PRs, update author history and reputation
+    python main.py score      # score the latest ingest and update the review queue
+    python main.py label      # apply labels from the latest scores
+    python main.py report     # write CSV/Markdown reports and webhook payloads
+    python main.py deliver    # send the latest webhook payloads
+    python main.py status     # check the config and list snapshots (no heavy imports)
+    python main.py shard-worker --work-dir DIR   # help score the shards of a SHARD_WORK_DIR plan
+
+Heavy modules (pandas, agents, outputs) are imported only by the subcommands that need
+them, so ``status`` and ``--help`` start quickly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Subcommand -> pipeline stages it executes; their upstream inputs come from snapshots.
+SNAPSHOT_COMMANDS: dict[str, tuple[str, ...]] = {
+    "ingest": ("fetch", "author_history", "reputation"),
+    "score": ("score", "queue"),
+    "label": ("label",),
+    "report": ("report",),
+    "deliver": ("deliver",),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="prion", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="run the full pipeline (default)")
+    group = run.add_mutually_exclusive_group()
+    group.add_argument("--from-stage", help="re-run this stage and everything downstream from cached upstream results")
+    group.add_argument("--only-stage", help="re-run only this stage against cached upstream results")
+    group.add_argument("--resume", action="store_true", help="reuse the latest fetch and skip unchanged stages")
+
+    for name, stages in SNAPSHOT_COMMANDS.items():
+        command = commands.add_parser(name, help=f"run the {', '.join(stages)} stage(s) against stored snapshots")
+        command.add_argument("--snapshot-dir", help="snapshot directory (defaults to CHECKPOINT_DIR)")
+
+    commands.add_parser("daemon", help="stay resident and run incremental cycles")
+    shard_worker = commands.add_parser("shard-worker", help="claim and score shards of a published sharded-scoring plan")
+    shard_worker.add_argument("--work-dir", required=True, help="shared work directory (the coordinator's SHARD_WORK_DIR)")
+    status = commands.add_parser("status", help="validate the config and show snapshots and the last run")
+    status.add_argument("--snapshot-dir", help="snapshot directory (defaults to CHECKPOINT_DIR)")
+    status.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    return parser
+
+
+def _status(args: argparse.Namespace) -> int:
+    from runtime_config import load_settings
+
+    report: dict[str, object] = {}
+    try:
+        settings = load_settings()
+    except ValueError as exc:
+        report["config"] = {"valid": False, "error": str(exc)}
+        settings = None
+    else:
+        report["config"] = {
+            "valid": True,
+            "repository": f"{settings.repo_owner}/{settings.repo_name}",
+            "shadow_mode": settings.shadow_mode,
+            "comment_mode": settings.comment_mode,
+        }
+
+    snapshot_dir = args.snapshot_dir or (settings.checkpoint_dir if settings is not None else None)
+    snapshots: dict[str, str | None] = {}
+    if snapshot_dir:
+        from pipeline_dag import CheckpointStore
+
+        store = CheckpointStore(snapshot_dir)
+        snapshots = {stage: (store.latest(stage) or {}).get("saved_at") for stage in store.stages()}
+    report["snapshot_dir"] = snapshot_dir
+    report["snapshots"] = snapshots
+
+    manifest_path = settings.run_manifest_path if settings is not None else None
+    if manifest_path and Path(manifest_path).exists():
+        manifest = json.loads(Path(manifest_path).read_text(encoding="utf-8"))
+        report["last_run"] = {key: manifest.get(key) for key in ("status", "finished_at", "duration_seconds", "peak_rss_bytes")}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        config = report["config"]
+        print(f"config:     {'ok (' + config['repository'] + ')' if config['valid'] else 'INVALID: ' + config['error']}")
+        print(f"snapshots:  {snapshot_dir or 'disabled (set CHECKPOINT_DIR)'}")
+        for stage, saved_at in snapshots.items():
+            print(f"  {stage:<16} {saved_at}")
+        if "last_run" in report:
+            last_run = report["last_run"]
+            print(f"last run:   {last_run['status']} at {last_run['finished_at']} ({last_run['duration_seconds']}s)")
+    return 0 if report["config"]["valid"] else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    command = args.command or "run"
+    if command == "status":
+        return _status(args)
+    if command == "shard-worker":
+        from sharding import work_shards
+
+        print(f"scored shards: {work_shards(args.work_dir)}")
+        return 0
+
+    import main_pipeline
+
+    if command == "run":
+        main_pipeline.main(
+            [
+                *(["--from-stage", args.from_stage] if getattr(args, "from_stage", None) else []),
+                *(["--only-stage", args.only_stage] if getattr(args, "only_stage", None) else []),
+                *(["--resume"] if getattr(args, "resume", False) else []),
+            ]
+        )
+        return 0
+    if command == "daemon":
+        main_pipeline.main(["--daemon"])
+        return 0
+
+    settings = main_pipeline.load_runtime()
+    snapshot_dir = args.snapshot_dir or settings.checkpoint_dir
+    if not snapshot_dir:
+        parser.error(f"'{command}' needs stored snapshots: set CHECKPOINT_DIR or pass --snapshot-dir")
+    if snapshot_dir != settings.checkpoint_dir:
+        from dataclasses import replace
+
+        settings = replace(settings, checkpoint_dir=snapshot_dir)
+    main_pipeline.run_pipeline(settings, only_stage=SNAPSHOT_COMMANDS[command])
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,35 +1,92 @@
 from __future__ import annotations
 
+import argparse
 import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterable
 
 import pandas as pd
 
-from agents.deception_agent import calculate_risk
-from agents.dedupe_agent import cluster_prs
-from agents.prioritization_agent import calculate_priority
-from agents.trust_agent import calculate_trust
-from ingestion.github_fetch import fetch_all_prs
-from memory.embeddings import generate_embeddings
+from agents import ScanCache, run_agents
+from agents.columns import top_k_rows
+from agents.dedupe_agent import TitlePairCache
+from agents.path_rules import compile_path_rules
+from agents.prioritization_agent import PRIORITY_SIGNALS, FreshnessModel
+from agents.rules import load_rule_file
+from frame_schema import join_side_tables, record_frame_memory, split_side_tables
+from ingestion.github_fetch import GitHubPullRequestIngestor, GitHubRepoConfig, fetch_all_prs
+from memory.author_store import AuthorHistoryStore
+from memory.embeddings import EmbeddingCache  # also registers the embeddings agent
+from memory.files_cache import PullRequestFilesCache
+from memory.patch_store import DEFAULT_PATCH_STORE, PatchStore
+from memory.priority_queue import PersistentPriorityQueue
+from memory.reputation import ReputationGraph
+from metrics import METRICS, write_prometheus_textfile, write_run_manifest
 from outputs.github_labeler import label_prs
-from outputs.webhook_delivery import deliver_webhook_payloads
+from outputs.webhook_delivery import deliver_webhook_payloads, require_delivered
 from outputs.webhook_exporter import export_webhook_payloads
+from pipeline_dag import CheckpointStore, Stage, run_stages, source_digest
 from prion_instructions import PRION_INSTRUCTIONS
 from runtime_config import RuntimeSettings, load_settings
+from sharding import score_sharded
 
-
-logging.basicConfig(
-	level=logging.INFO,
-	format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-)
 LOGGER = logging.getLogger("prion.pipeline")
 
+REPORT_COLUMNS = [
+	"pr_number",
+	"cluster",
+	"dedupe_score",
+	"duplicate_count",
+	"patch_fingerprint",
+	"patch_duplicate_count",
+	"patch_near_duplicate_count",
+	"trust_score",
+	"trust_band",
+	"trust_reasons",
+	"author_merged_prs",
+	"author_reverted_prs",
+	"author_reputation",
+	"risk_score",
+	"risk_band",
+	"risk_flags",
+	"risk_path_rules",
+	"content_secret_hits",
+	"content_encoded_blob_hits",
+	"content_high_entropy_hits",
+	"content_obfuscation_hits",
+	"title",
+	"author",
+	"url",
+	"comments",
+	"review_comments",
+	"changed_files",
+	"pr_age_days",
+	"pr_idle_days",
+	"embedding_norm",
+	"embedding_dim",
+	"priority_score",
+	"priority_bucket",
+	"priority_rank",
+	"priority_reasons",
+]
+PRIORITY_COLUMNS = ["pr_number", "priority_score", "priority_bucket", "priority_rank", "priority_reasons"]
+PRIORITY_SIGNAL_COLUMNS = ["pr_number", *(f"priority_signal_{name}" for name in PRIORITY_SIGNALS)]
+
 
 def _write_markdown_report(df: pd.DataFrame, top_prs: pd.DataFrame, output_path: Path) -> None:
 	clusters = int(df["cluster"].nunique()) if "cluster" in df.columns and not df.empty else 0
 	flagged_risk = int((df["risk_score"] >= 20).sum()) if "risk_score" in df.columns else 0
 	flagged_attention = int((df["risk_score"] >= 30).sum()) if "risk_score" in df.columns else 0
 	critical = int((df["priority_bucket"] == "critical").sum()) if "priority_bucket" in df.columns else 0
+	duplicate_diffs = (
+		int(((df["patch_duplicate_count"] > 0) | (df["patch_near_duplicate_count"] > 0)).sum())
+		if "patch_duplicate_count" in df.columns
+		else 0
+	)
 
 	with output_path.open("w", encoding="utf-8") as handle:
 		handle.write("# PRion DAILY REPORT\n\n")
@@ -39,121 +96,448 @@ def _write_markdown_report(df: pd.DataFrame, top_prs: pd.DataFrame, output_path:
 		handle.write(f"Critical priority PRs: {critical}\n")
 		handle.write(f"Top PRs by cluster & trust: {len(top_prs)}\n")
 		handle.write(f"PRs flagged as potential-risk: {flagged_risk}\n")
-		handle.write(f"PRs flagged as requires-attention: {flagged_attention}\n\n")
+		handle.write(f"PRs flagged as requires-attention: {flagged_attention}\n")
+		handle.write(f"PRs with duplicate or near-identical diffs: {duplicate_diffs}\n\n")
 		handle.write("CSV files available in `reports/` folder.\n")
 		handle.write("Webhook payloads available for Slack/Discord/Notion in `reports/`.\n")
 
 
-def _configure_logging(log_level: str) -> None:
-	root = logging.getLogger()
-	root.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+def configure_logging(log_level: str = "INFO") -> None:
+	"""Configures root logging; called by entry points, never at import time."""
+	logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+	logging.getLogger().setLevel(getattr(logging, log_level.upper(), logging.INFO))
 
 
-def _load_runtime() -> RuntimeSettings:
+def load_runtime() -> RuntimeSettings:
 	settings = load_settings()
-	_configure_logging(settings.log_level)
+	configure_logging(settings.log_level)
 	return settings
 
 
-def main() -> None:
-	settings = _load_runtime()
-	LOGGER.info("=== PRion PIPELINE START ===")
-	LOGGER.info(
-		"Operating mode: SHADOW_MODE=%s COMMENT_MODE=%s SHADOW_WRITES=%s",
-		settings.shadow_mode,
-		settings.comment_mode,
-		settings.write_labels_in_shadow_mode,
+def github_config(settings: RuntimeSettings) -> GitHubRepoConfig:
+	return GitHubRepoConfig(
+		token=settings.github_token,
+		owner=settings.repo_owner,
+		repo=settings.repo_name,
+		page_workers=settings.github_page_workers,
 	)
-	LOGGER.info("Instructions loaded: %s", PRION_INSTRUCTIONS["objective"])
 
-	try:
-		LOGGER.info("1/8 Fetching all open PRs")
+
+def pr_files_cache(settings: RuntimeSettings) -> PullRequestFilesCache:
+	return PullRequestFilesCache(settings.pr_files_cache_path, patch_dir=settings.patch_store_dir)
+
+
+@dataclass(slots=True)
+class PipelineCaches:
+	"""State kept between runs of a resident process (see ``daemon.py``)."""
+
+	author_store: AuthorHistoryStore | None = None
+	reputation_graph: ReputationGraph | None = None
+	scan_cache: ScanCache | None = None
+	embeddings: EmbeddingCache | None = None
+	title_pairs: TitlePairCache | None = None
+
+
+def _load_author_history(
+	settings: RuntimeSettings,
+	pr_df: pd.DataFrame,
+	caches: PipelineCaches | None = None,
+) -> AuthorHistoryStore | None:
+	if not settings.author_history_path:
+		return None
+	store = caches.author_store if caches is not None and caches.author_store is not None else None
+	if store is None:
+		store = AuthorHistoryStore(settings.author_history_path)
+		if caches is not None:
+			caches.author_store = store
+	if not len(store):
+		store.backfill(GitHubPullRequestIngestor(github_config(settings)))
+	else:
+		store.catch_up(GitHubPullRequestIngestor(github_config(settings)))
+	store.update_from_frame(pr_df)
+	store.save()
+	return store
+
+
+def _load_reputation_graph(
+	settings: RuntimeSettings,
+	pr_df: pd.DataFrame,
+	caches: PipelineCaches | None = None,
+) -> ReputationGraph | None:
+	if not settings.reputation_graph_path:
+		return None
+	graph = caches.reputation_graph if caches is not None and caches.reputation_graph is not None else None
+	if graph is None:
+		graph = ReputationGraph(settings.reputation_graph_path)
+		if caches is not None:
+			caches.reputation_graph = graph
+	graph.update_from_frame(pr_df)
+	graph.save()
+	return graph
+
+
+def _fetch_stage(settings: RuntimeSettings, fetch: Callable[[], pd.DataFrame] | None = None) -> dict[str, object]:
+	LOGGER.info("Fetching all open PRs")
+	files_cache = None
+	if fetch is not None:
+		pr_df = fetch()
+	else:
+		files_cache = pr_files_cache(settings)
 		pr_df = fetch_all_prs(
 			settings.github_token,
 			settings.repo_owner,
 			settings.repo_name,
 			state="open",
 			max_prs=settings.max_prs,
+			include_reviews=bool(settings.reputation_graph_path),
+			page_workers=settings.github_page_workers,
+			files_cache=files_cache,
 		)
+	if settings.patch_store_dir:
+		DEFAULT_PATCH_STORE.save(settings.patch_store_dir)
+	if files_cache is not None:
+		if settings.max_prs is None:
+			# A full listing: PRs missing from it were closed, as in ``_queue_stage``.
+			files_cache.discard(files_cache.pr_numbers() - set(pr_df["pr_number"].astype(int)))
+		files_cache.save()
+	# Nested lists wait in compact side tables until a stage needs them.
+	pr_df, pr_tables = split_side_tables(pr_df)
+	record_frame_memory("pr_df", pr_df, pr_tables)
+	# The records only hold ``patch_sha`` references, so the blobs travel with the frame.
+	return {"pr_df": pr_df, "pr_tables": pr_tables, "patch_store": DEFAULT_PATCH_STORE}
 
-		LOGGER.info("2/8 Generating embeddings")
-		embeddings_df = generate_embeddings(pr_df)
 
-		LOGGER.info("3/8 Clustering PRs")
-		cluster_report = cluster_prs(pr_df)
+def _author_history_stage(
+	settings: RuntimeSettings,
+	pr_df: pd.DataFrame,
+	caches: PipelineCaches | None = None,
+) -> dict[str, object]:
+	return {"author_store": _load_author_history(settings, pr_df, caches)}
 
-		LOGGER.info("4/8 Calculating trust scores")
-		trust_report = calculate_trust(pr_df)
 
-		LOGGER.info("5/8 Calculating risk/deception scores")
-		risk_report = calculate_risk(pr_df)
+def _reputation_stage(
+	settings: RuntimeSettings,
+	pr_df: pd.DataFrame,
+	pr_tables: dict[str, pd.DataFrame],
+	caches: PipelineCaches | None = None,
+) -> dict[str, object]:
+	if settings.reputation_graph_path and "reviews" in pr_tables:
+		pr_df = join_side_tables(pr_df, pr_tables, ["reviews"])
+	return {"reputation_graph": _load_reputation_graph(settings, pr_df, caches)}
 
-		LOGGER.info("6/9 Merging all reports")
-		df = cluster_report.merge(trust_report, on="pr_number", how="left")
-		df = df.merge(risk_report, on="pr_number", how="left")
-		df = df.merge(
-			pr_df[["pr_number", "title", "author", "url", "comments", "review_comments", "changed_files"]],
-			on="pr_number",
-			how="left",
-		)
-		df = df.merge(embeddings_df, on="pr_number", how="left")
-
-		LOGGER.info("7/9 Calculating composite priority")
-		priority_report = calculate_priority(df)
-		df = df.merge(priority_report, on="pr_number", how="left")
-
-		LOGGER.info("8/9 Applying stealth labels")
-		labeling_result = label_prs(
-			df,
-			github_token=settings.github_token,
-			repo_owner=settings.repo_owner,
-			repo_name=settings.repo_name,
-			shadow_mode=settings.shadow_mode,
-			allow_shadow_writes=settings.write_labels_in_shadow_mode,
-		)
-		LOGGER.info("Labeling summary: %s", labeling_result)
-
-		LOGGER.info("9/9 Generating daily reports and webhook payloads")
-		reports_dir = Path(settings.report_dir)
-		reports_dir.mkdir(parents=True, exist_ok=True)
-
-		daily_csv = reports_dir / "daily_report.csv"
-		top_csv = reports_dir / "top_prs.csv"
-		md_report = reports_dir / "daily_report.md"
-		priority_csv = reports_dir / "priority_report.csv"
-
-		df.to_csv(daily_csv, index=False)
-		top_prs = df.sort_values(by=["priority_score", "risk_score"], ascending=[False, True]).head(30)
-		top_prs.to_csv(top_csv, index=False)
-		priority_report.to_csv(priority_csv, index=False)
-		_write_markdown_report(df, top_prs, md_report)
-		webhook_paths = export_webhook_payloads(df, settings.report_dir)
-		webhook_delivery_status = deliver_webhook_payloads(
-			webhook_paths,
-			{
-				"slack": settings.slack_webhook_url,
-				"discord": settings.discord_webhook_url,
-				"notion": settings.notion_webhook_url,
-			},
-			enabled=settings.enable_webhook_delivery,
-			shadow_mode=settings.shadow_mode,
-			allow_in_shadow_mode=settings.allow_webhook_delivery_in_shadow_mode,
-		)
 
-		LOGGER.info(
-			"Reports generated: %s | %s | %s | %s | webhooks=%s | delivery=%s",
-			daily_csv,
-			top_csv,
-			md_report,
-			priority_csv,
-			{provider: str(path) for provider, path in webhook_paths.items()},
-			webhook_delivery_status,
+def agent_options(
+	settings: RuntimeSettings,
+	author_store: AuthorHistoryStore | None,
+	reputation_graph: ReputationGraph | None,
+	caches: PipelineCaches | None = None,
+) -> dict[str, dict[str, object]]:
+	"""Per-agent ``run_agents`` options configured by ``settings``."""
+	scan_cache = caches.scan_cache if caches is not None and caches.scan_cache is not None else None
+	if scan_cache is None:
+		scan_cache = ScanCache(settings.content_scan_cache_path)
+		if caches is not None:
+			caches.scan_cache = scan_cache
+	options: dict[str, dict[str, object]] = {
+		"dedupe": {"workers": settings.dedupe_workers},
+		"author_history": {"store": author_store},
+		"reputation": {"graph": reputation_graph},
+		"content_scan": {
+			"workers": settings.content_scan_workers,
+			"cache": scan_cache,
+		},
+	}
+	if caches is not None:
+		# Warm per-PR state: only new or edited PRs are embedded and title-compared again.
+		if caches.embeddings is None:
+			caches.embeddings = EmbeddingCache()
+		if caches.title_pairs is None:
+			caches.title_pairs = TitlePairCache()
+		options["embeddings"] = {"cache": caches.embeddings}
+		options["dedupe"]["title_cache"] = caches.title_pairs
+	options["risk"] = {}
+	if settings.sensitive_path_rules is not None:
+		options["risk"]["path_rules"] = compile_path_rules(settings.sensitive_path_rules)
+	if settings.risk_rules_file:
+		options["risk"]["rules"] = load_rule_file(settings.risk_rules_file, agent="risk")
+	if settings.freshness_model is not None:
+		options["priority"] = {"freshness": FreshnessModel(**settings.freshness_model)}
+	if settings.trust_rules_file:
+		options["trust"] = {"rules": load_rule_file(settings.trust_rules_file, agent="trust")}
+	return options
+
+
+def _score_stage(
+	settings: RuntimeSettings,
+	pr_df: pd.DataFrame,
+	pr_tables: dict[str, pd.DataFrame],
+	patch_store: PatchStore,
+	author_store: AuthorHistoryStore | None,
+	reputation_graph: ReputationGraph | None,
+	caches: PipelineCaches | None = None,
+) -> dict[str, object]:
+	LOGGER.info("Running agents (embeddings, dedupe, content scan, trust, risk, priority)")
+	DEFAULT_PATCH_STORE.update(patch_store)
+	options = agent_options(settings, author_store, reputation_graph, caches)
+	frame = join_side_tables(pr_df, pr_tables)
+	if settings.score_shards is not None and settings.score_shards > 1:
+		scored = score_sharded(
+			frame,
+			shards=settings.score_shards,
+			workers=min(settings.score_shards, os.cpu_count() or 1),
+			strategy=settings.shard_strategy,
+			options=options,
+			patch_store=patch_store,
+			work_dir=settings.shard_work_dir,
 		)
+	else:
+		scored = run_agents(frame, options=options, max_workers=settings.pipeline_workers)
+	df = scored[[column for column in REPORT_COLUMNS if column in scored.columns]]
+	record_frame_memory("df", df)
+	return {
+		"df": df,
+		"priority_report": df[PRIORITY_COLUMNS].sort_values(by="priority_rank"),
+		"priority_signals": scored.reindex(columns=PRIORITY_SIGNAL_COLUMNS),
+	}
+
+
+def _queue_stage(settings: RuntimeSettings, df: pd.DataFrame) -> dict[str, object]:
+	if not settings.priority_queue_path:
+		return {"queue_summary": None}
+	queue = PersistentPriorityQueue(settings.priority_queue_path)
+	# Only a full ingestion of open PRs tells us which queued PRs were closed.
+	summary = queue.update_from_frame(df, prune=settings.max_prs is None)
+	queue.save()
+	return {"queue_summary": summary}
+
+
+def _label_stage(settings: RuntimeSettings, df: pd.DataFrame) -> dict[str, object]:
+	LOGGER.info("Applying stealth labels")
+	labeling_result = label_prs(
+		df,
+		github_token=settings.github_token,
+		repo_owner=settings.repo_owner,
+		repo_name=settings.repo_name,
+		shadow_mode=settings.shadow_mode,
+		allow_shadow_writes=settings.write_labels_in_shadow_mode,
+	)
+	LOGGER.info("Labeling summary: %s", labeling_result)
+	return {"labeling_result": labeling_result}
+
+
+def _report_stage(
+	settings: RuntimeSettings,
+	df: pd.DataFrame,
+	priority_report: pd.DataFrame,
+	priority_signals: pd.DataFrame,
+) -> dict[str, object]:
+	LOGGER.info("Generating daily reports and webhook payloads")
+	reports_dir = Path(settings.report_dir)
+	reports_dir.mkdir(parents=True, exist_ok=True)
+
+	report_paths = {
+		"daily_csv": reports_dir / "daily_report.csv",
+		"top_csv": reports_dir / "top_prs.csv",
+		"md_report": reports_dir / "daily_report.md",
+		"priority_csv": reports_dir / "priority_report.csv",
+		"components_csv": reports_dir / "priority_components.csv",
+	}
+
+	df.to_csv(report_paths["daily_csv"], index=False)
+	top_prs = top_k_rows(df, ["priority_score", "risk_score"], 30, ascending=[False, True])
+	top_prs.to_csv(report_paths["top_csv"], index=False)
+	priority_report.to_csv(report_paths["priority_csv"], index=False)
+	priority_signals.to_csv(report_paths["components_csv"], index=False)
+	_write_markdown_report(df, top_prs, report_paths["md_report"])
+	webhook_paths = export_webhook_payloads(df, settings.report_dir)
+	return {"report_paths": report_paths, "webhook_paths": webhook_paths}
+
+
+def _deliver_stage(settings: RuntimeSettings, webhook_paths: dict[str, Path]) -> dict[str, object]:
+	webhook_delivery_status = deliver_webhook_payloads(
+		webhook_paths,
+		{
+			"slack": settings.slack_webhook_url,
+			"discord": settings.discord_webhook_url,
+			"notion": settings.notion_webhook_url,
+		},
+		enabled=settings.enable_webhook_delivery,
+		shadow_mode=settings.shadow_mode,
+		allow_in_shadow_mode=settings.allow_webhook_delivery_in_shadow_mode,
+	)
+	# A failed delivery fails the stage: it is not checkpointed and the next run retries it.
+	return {"webhook_delivery_status": require_delivered(webhook_delivery_status)}
+
+
+def _score_day() -> str:
+	return datetime.now(timezone.utc).date().isoformat()
+
+
+def build_pipeline_stages(
+	settings: RuntimeSettings,
+	*,
+	fetch: Callable[[], pd.DataFrame] | None = None,
+	caches: PipelineCaches | None = None,
+) -> list[Stage]:
+	"""The daily run as a DAG; stages without a path between them may run concurrently.
+
+	``fetch`` replaces the full GitHub fetch (e.g. with an incremental one) and ``caches``
+	keeps stores and scan results in memory across runs.
+	"""
+	return [
+		Stage("fetch", partial(_fetch_stage, settings, fetch=fetch), (), ("pr_df", "pr_tables", "patch_store"), cacheable=False),
+		Stage("author_history", partial(_author_history_stage, settings, caches=caches), ("pr_df",), ("author_store",)),
+		Stage(
+			"reputation",
+			partial(_reputation_stage, settings, caches=caches),
+			("pr_df", "pr_tables"),
+			("reputation_graph",),
+		),
+		Stage(
+			"score",
+			partial(_score_stage, settings, caches=caches),
+			("pr_df", "pr_tables", "patch_store", "author_store", "reputation_graph"),
+			("df", "priority_report", "priority_signals"),
+			# Freshness decays with wall-clock time, so cached scores are reused for one day only.
+			key_extra=_score_day,
+		),
+		Stage("queue", partial(_queue_stage, settings), ("df",), ("queue_summary",)),
+		Stage("label", partial(_label_stage, settings), ("df",), ("labeling_result",), cacheable=False, side_effects=True),
+		Stage(
+			"report",
+			partial(_report_stage, settings),
+			("df", "priority_report", "priority_signals"),
+			("report_paths", "webhook_paths"),
+		),
+		Stage(
+			"deliver",
+			partial(_deliver_stage, settings),
+			("webhook_paths",),
+			("webhook_delivery_status",),
+			cacheable=False,
+			side_effects=True,
+		),
+	]
+
+
+def pipeline_code_version(settings: RuntimeSettings) -> str:
+	"""Checkpoint version: pipeline sources, settings and the contents of rule files."""
+	root = Path(__file__).resolve().parent
+	extra = [repr(settings)]
+	for rule_file in (settings.trust_rules_file, settings.risk_rules_file):
+		if rule_file and Path(rule_file).exists():
+			extra.append(Path(rule_file).read_text(encoding="utf-8"))
+	sources = [
+		"agents",
+		"memory",
+		"ingestion",
+		"outputs",
+		"main_pipeline.py",
+		"pipeline_dag.py",
+		"runtime_config.py",
+		"sharding.py",
+		"chunked.py",
+		"frame_schema.py",
+	]
+	return source_digest([root / source for source in sources], extra)
+
+
+def export_metrics(settings: RuntimeSettings, **extra: object) -> None:
+	"""Writes the run manifest and Prometheus textfile configured in ``settings``."""
+	try:
+		if settings.run_manifest_path:
+			write_run_manifest(settings.run_manifest_path, repository=f"{settings.repo_owner}/{settings.repo_name}", **extra)
+		if settings.prometheus_textfile_path:
+			write_prometheus_textfile(settings.prometheus_textfile_path)
+	except OSError as exc:
+		LOGGER.warning("Could not write run metrics: %s", exc)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Run the PRion daily pipeline.")
+	group = parser.add_mutually_exclusive_group()
+	group.add_argument("--from-stage", help="re-run this stage and everything downstream from cached upstream results")
+	group.add_argument("--only-stage", help="re-run only this stage against cached upstream results")
+	group.add_argument(
+		"--resume",
+		action="store_true",
+		help="reuse the latest fetch and skip stages whose inputs are unchanged",
+	)
+	group.add_argument(
+		"--daemon",
+		action="store_true",
+		help="stay resident and run incremental cycles every DAEMON_INTERVAL_SECONDS",
+	)
+	return parser.parse_args(argv)
+
+
+def run_pipeline(
+	settings: RuntimeSettings,
+	*,
+	from_stage: str | None = None,
+	only_stage: str | Iterable[str] | None = None,
+	resume: bool = False,
+) -> dict[str, object]:
+	"""Runs the stage DAG (or part of it, see ``plan_stages``) and exports run metrics.
+
+	With ``CHUNK_SIZE`` the bounded-memory chunked pipeline (``chunked.py``) runs instead.
+	"""
+	LOGGER.info("=== PRion PIPELINE START ===")
+	LOGGER.info(
+		"Operating mode: SHADOW_MODE=%s COMMENT_MODE=%s SHADOW_WRITES=%s",
+		settings.shadow_mode,
+		settings.comment_mode,
+		settings.write_labels_in_shadow_mode,
+	)
+	LOGGER.info("Instructions loaded: %s", PRION_INSTRUCTIONS["objective"])
+
+	if settings.chunk_size is not None and (from_stage or only_stage or resume):
+		raise ValueError("--from-stage/--only-stage/--resume need stage checkpoints; unset CHUNK_SIZE")
+
+	METRICS.reset()
+	status = "failed"
+	try:
+		if settings.chunk_size is not None:
+			from chunked import run_chunked_pipeline
+
+			values = run_chunked_pipeline(settings)
+		else:
+			values = run_stages(
+				build_pipeline_stages(settings),
+				max_workers=settings.pipeline_workers,
+				checkpoints=CheckpointStore(settings.checkpoint_dir) if settings.checkpoint_dir else None,
+				code_version=pipeline_code_version(settings) if settings.checkpoint_dir else "",
+				from_stage=from_stage,
+				only_stage=only_stage,
+				resume=resume,
+			)
+		if "report_paths" in values:
+			LOGGER.info(
+				"Reports generated: %s | webhooks=%s | delivery=%s",
+				" | ".join(str(path) for path in values["report_paths"].values()),
+				{provider: str(path) for provider, path in values["webhook_paths"].items()},
+				values.get("webhook_delivery_status"),
+			)
 		LOGGER.info("=== PIPELINE COMPLETE ===")
+		status = "ok"
+		return values
 	except Exception as exc:
 		LOGGER.exception("Pipeline failed: %s", exc)
 		raise
+	finally:
+		export_metrics(settings, status=status, code_version=pipeline_code_version(settings))
+
+
+def main(argv: list[str] | None = None) -> None:
+	args = _parse_args(argv)
+	settings = load_runtime()
+	if args.daemon:
+		from daemon import PipelineDaemon
+
+		PipelineDaemon(settings).serve_forever()
+		return
+	run_pipeline(settings, from_stage=args.from_stage, only_stage=args.only_stage, resume=args.resume)
 
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	main()
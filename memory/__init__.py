@@ -1,3 +1,22 @@
-from .embeddings import EmbeddingDocument, build_embedding_documents, generate_embeddings
+from .author_store import AuthorHistoryStore, AuthorStats
+from .embeddings import EmbeddingCache, EmbeddingDocument, build_embedding_documents, generate_embeddings
+from .files_cache import PullRequestFilesCache
+from .patch_store import DEFAULT_PATCH_STORE, PatchStore, build_combined_diff, resolve_patch
+from .priority_queue import PersistentPriorityQueue
+from .reputation import ReputationGraph
 
-__all__ = ["EmbeddingDocument", "build_embedding_documents", "generate_embeddings"]
+__all__ = [
+    "AuthorHistoryStore",
+    "AuthorStats",
+    "EmbeddingCache",
+    "EmbeddingDocument",
+    "build_embedding_documents",
+    "generate_embeddings",
+    "PullRequestFilesCache",
+    "DEFAULT_PATCH_STORE",
+    "PatchStore",
+    "build_combined_diff",
+    "resolve_patch",
+    "PersistentPriorityQueue",
+    "ReputationGraph",
+]
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from agents.engine import AgentSpec, register_agent
+
+LOGGER = logging.getLogger(__name__)
+
+_REVERT_TITLE = re.compile(r'^revert\s+"(?P<title>.+)"\s*$', re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class AuthorStats:
+	login: str
+	merged: int = 0
+	closed: int = 0
+	open: int = 0
+	reverted: int = 0
+	first_contribution_at: str = ""
+
+
+def _outcome(state: str, merged_at: object) -> str:
+	if merged_at:
+		return "merged"
+	return "open" if state == "open" else "closed"
+
+
+class AuthorHistoryStore:
+	"""Per-author PR track record keyed by ``user_login``.
+
+	Holds one ``(login, outcome, created_at, title)`` entry per PR so repeated ingestions
+	update counts idempotently, plus aggregated ``AuthorStats`` for O(1) lookups while
+	scoring. A revert PR titled ``Revert "<title>"`` counts against the author of the PR
+	with that title. ``updated_through`` is the latest ``updated_at`` of the listings
+	applied so far, where ``catch_up`` resumes.
+	"""
+
+	def __init__(self, path: str | Path | None = None) -> None:
+		self.path = Path(path) if path else None
+		self._prs: dict[int, tuple[str, str, str, str]] = {}
+		self._stats: dict[str, AuthorStats] = {}
+		self._titles: dict[str, int] = {}
+		self._reverted: set[int] = set()
+		self._pending_reverts: set[str] = set()
+		self.updated_through = ""
+		if self.path is not None and self.path.exists():
+			payload = json.loads(self.path.read_text(encoding="utf-8"))
+			for number, entry in payload.get("prs", {}).items():
+				self._record(int(number), *entry)
+			for number in payload.get("reverted", []):
+				self._mark_reverted(int(number))
+			self._pending_reverts = set(payload.get("pending_reverts", []))
+			self.updated_through = payload.get("updated_through", "")
+
+	def __len__(self) -> int:
+		return len(self._stats)
+
+	def get(self, login: str) -> AuthorStats | None:
+		return self._stats.get(login)
+
+	def _mark_reverted(self, number: int) -> None:
+		entry = self._prs.get(number)
+		if entry is None or number in self._reverted:
+			return
+		self._reverted.add(number)
+		self._stats[entry[0]].reverted += 1
+
+	def _record(self, number: int, login: str, outcome: str, created_at: str, title: str) -> None:
+		previous = self._prs.get(number)
+		if previous is not None:
+			previous_stats = self._stats[previous[0]]
+			setattr(previous_stats, previous[1], getattr(previous_stats, previous[1]) - 1)
+
+		self._prs[number] = (login, outcome, created_at, title)
+		stats = self._stats.setdefault(login, AuthorStats(login=login))
+		setattr(stats, outcome, getattr(stats, outcome) + 1)
+		if created_at and (not stats.first_contribution_at or created_at < stats.first_contribution_at):
+			stats.first_contribution_at = created_at
+
+		key = title.strip().lower()
+		self._titles.setdefault(key, number)
+		if key in self._pending_reverts:
+			self._pending_reverts.discard(key)
+			self._mark_reverted(self._titles[key])
+
+		revert = _REVERT_TITLE.match(title.strip())
+		if revert and outcome == "merged":
+			reverted_key = revert.group("title").strip().lower()
+			if reverted_key in self._titles:
+				self._mark_reverted(self._titles[reverted_key])
+			else:
+				self._pending_reverts.add(reverted_key)
+
+	def record_pull_request(
+		self,
+		*,
+		number: int,
+		login: str,
+		state: str,
+		merged_at: object,
+		created_at: str,
+		title: str,
+	) -> None:
+		if login:
+			self._record(int(number), login, _outcome(state, merged_at), created_at or "", title or "")
+
+	def update_from_summaries(self, summaries: Iterable[dict[str, Any]]) -> int:
+		"""Updates from raw GitHub ``/pulls`` list items (no per-PR API calls needed)."""
+		count = 0
+		for pr in summaries:
+			self.updated_through = max(self.updated_through, pr.get("updated_at") or "")
+			self.record_pull_request(
+				number=int(pr["number"]),
+				login=(pr.get("user") or {}).get("login") or "",
+				state=pr.get("state") or "",
+				merged_at=pr.get("merged_at"),
+				created_at=pr.get("created_at") or "",
+				title=pr.get("title") or "",
+			)
+			count += 1
+		return count
+
+	def update_from_frame(self, pr_df: pd.DataFrame) -> int:
+		"""Updates from a PR frame as produced by ``fetch_all_prs``."""
+		merged = pr_df["merged_at"] if "merged_at" in pr_df.columns else [None] * len(pr_df)
+		for row, merged_at in zip(pr_df.itertuples(index=False), merged):
+			self.record_pull_request(
+				number=int(row.pr_number),
+				login=str(getattr(row, "author", "") or ""),
+				state=str(getattr(row, "state", "") or ""),
+				merged_at=merged_at if isinstance(merged_at, str) else None,
+				created_at=str(getattr(row, "created_at", "") or ""),
+				title=str(getattr(row, "title", "") or ""),
+			)
+		return len(pr_df)
+
+	def backfill(self, ingestor: Any) -> int:
+		"""Bulk-loads every PR of the repository from the paginated ``/pulls`` listing.
+
+		Pages are consumed as they arrive, so the full listing is never held in memory.
+		"""
+		count = self.update_from_summaries(ingestor.iter_pull_summaries(state="all"))
+		LOGGER.info("Author history backfill: %s PRs across %s authors", count, len(self._stats))
+		return count
+
+	def catch_up(self, ingestor: Any) -> int:
+		"""Records PRs merged or closed since ``updated_through``.
+
+		Open PRs leave the open-PR listing when they close, so their outcome comes from the
+		``state=closed`` listing, newest update first, read only up to the watermark: a few
+		listing pages per run and no per-PR requests.
+		"""
+		watermark = self.updated_through
+		summaries = ingestor.iter_pull_summaries(state="closed", sort="updated", direction="desc")
+		recent = []
+		for pr in summaries:
+			if watermark and (pr.get("updated_at") or "") < watermark:
+				break
+			recent.append(pr)
+		summaries.close()
+		count = self.update_from_summaries(recent)
+		LOGGER.info("Author history catch-up: %s PRs closed or updated since %s", count, watermark or "the start")
+		return count
+
+	def save(self) -> None:
+		if self.path is None:
+			return
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		payload = {
+			"prs": {str(number): list(entry) for number, entry in self._prs.items()},
+			"reverted": sorted(self._reverted),
+			"pending_reverts": sorted(self._pending_reverts),
+			"updated_through": self.updated_through,
+		}
+		self.path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def author_columns(
+	pr_df: pd.DataFrame,
+	*,
+	store: AuthorHistoryStore | None = None,
+	now: datetime | None = None,
+) -> dict[str, np.ndarray]:
+	"""Author history kernel: looks up each PR author once in ``store``.
+
+	Without a store every author is reported as unknown (``author_history_known == 0``),
+	which leaves the author-based trust rules inactive.
+	"""
+	rows = len(pr_df)
+	columns = {
+		"author_history_known": np.zeros(rows, dtype=np.int64),
+		"author_merged_prs": np.zeros(rows, dtype=np.int64),
+		"author_closed_prs": np.zeros(rows, dtype=np.int64),
+		"author_open_prs": np.zeros(rows, dtype=np.int64),
+		"author_reverted_prs": np.zeros(rows, dtype=np.int64),
+		"author_tenure_days": np.zeros(rows, dtype=np.float64),
+	}
+	if store is None or "author" not in pr_df.columns or not rows:
+		return {"pr_number": pr_df["pr_number"].to_numpy(dtype=np.int64), **columns}
+
+	# One lookup per distinct author, then broadcast back to the PR rows.
+	codes, logins = pd.factorize(pr_df["author"].fillna("").astype(str))
+	reference = now or datetime.now(timezone.utc)
+	per_author = {name: np.zeros(len(logins), dtype=values.dtype) for name, values in columns.items()}
+	for idx, login in enumerate(logins):
+		stats = store.get(login)
+		if stats is None:
+			continue
+		per_author["author_history_known"][idx] = 1
+		per_author["author_merged_prs"][idx] = stats.merged
+		per_author["author_closed_prs"][idx] = stats.closed
+		per_author["author_open_prs"][idx] = stats.open
+		per_author["author_reverted_prs"][idx] = stats.reverted
+		if stats.first_contribution_at:
+			first = datetime.fromisoformat(stats.first_contribution_at.replace("Z", "+00:00"))
+			per_author["author_tenure_days"][idx] = (reference - first).total_seconds() / 86400
+	columns = {name: values[codes] for name, values in per_author.items()}
+	return {"pr_number": pr_df["pr_number"].to_numpy(dtype=np.int64), **columns}
+
+
+register_agent(
+	AgentSpec(
+		name="author_history",
+		inputs=("author",),
+		outputs=(
+			"author_history_known",
+			"author_merged_prs",
+			"author_closed_prs",
+			"author_open_prs",
+			"author_reverted_prs",
+			"author_tenure_days",
+		),
+		compute=author_columns,
+	)
+)
@@ -3,10 +3,15 @@ from __future__ import annotations
 import hashlib
 import logging
 from dataclasses import dataclass
+from typing import Iterable
 
 import numpy as np
 import pandas as pd
 
+from agents.engine import AgentSpec, register_agent
+
+from .patch_store import build_combined_diff
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -58,20 +63,77 @@ def generate_embeddings(pr_df: pd.DataFrame) -> pd.DataFrame:
 	if pr_df.empty:
 		return pd.DataFrame(columns=["pr_number", "embedding_norm", "embedding_dim"])
 
-	rows: list[dict[str, float | int]] = []
-	for _, row in pr_df.iterrows():
-		text = f"{row.get('title', '')}\n{row.get('body', '')}\n{row.get('combined_diff', '')}"
-		vector = np.array(_deterministic_vector(str(text), dimensions=64), dtype=float)
-		norm = float(np.linalg.norm(vector))
-		rows.append(
-			{
-				"pr_number": int(row["pr_number"]),
-				"embedding_norm": round(norm, 6),
-				"embedding_dim": int(vector.size),
-			}
-		)
-
-	embeddings_df = pd.DataFrame(rows)
+	embeddings_df = pd.DataFrame(embedding_columns(pr_df))
 	LOGGER.info("Embeddings ready: %s rows", len(embeddings_df))
 	return embeddings_df
 
+
+class EmbeddingCache:
+	"""Embedding norms of a resident process, keyed by ``pr_number`` and a content hash.
+
+	The hash covers the title, body and the ``patch_sha`` of each file, so an unchanged
+	PR is recognised without building its combined diff.
+	"""
+
+	def __init__(self) -> None:
+		self._entries: dict[int, tuple[str, float]] = {}
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, pr_number: int, key: str) -> float | None:
+		entry = self._entries.get(pr_number)
+		return entry[1] if entry is not None and entry[0] == key else None
+
+	def put(self, pr_number: int, key: str, norm: float) -> None:
+		self._entries[pr_number] = (key, norm)
+
+	def discard(self, pr_numbers: Iterable[int]) -> None:
+		for number in pr_numbers:
+			self._entries.pop(number, None)
+
+
+def _content_key(title: object, body: object, files: object) -> str:
+	digest = hashlib.sha256(f"{title}\n{body}".encode("utf-8"))
+	for item in files if isinstance(files, list) else []:
+		digest.update(f"\n{item.get('filename', '')}:{item.get('patch_sha') or item.get('patch') or ''}".encode("utf-8"))
+	return digest.hexdigest()
+
+
+def embedding_columns(pr_df: pd.DataFrame, cache: EmbeddingCache | None = None) -> dict[str, list]:
+	"""Embedding kernel; returns embedding feature columns aligned with ``pr_df`` rows.
+
+	With ``cache``, only rows whose title, body or patches changed are embedded again.
+	"""
+	has_diff = "combined_diff" in pr_df.columns
+	norms: list[float] = []
+	for row in pr_df.itertuples(index=False):
+		title, body, files = getattr(row, "title", ""), getattr(row, "body", ""), getattr(row, "files", None)
+		key = ""
+		if cache is not None and not has_diff:
+			key = _content_key(title, body, files)
+			cached = cache.get(int(row.pr_number), key)
+			if cached is not None:
+				norms.append(cached)
+				continue
+		diff = row.combined_diff if has_diff else build_combined_diff(files)
+		text = f"{title}\n{body}\n{diff}"
+		vector = np.array(_deterministic_vector(str(text), dimensions=64), dtype=float)
+		norms.append(round(float(np.linalg.norm(vector)), 6))
+		if key:
+			cache.put(int(row.pr_number), key, norms[-1])
+	return {
+		"pr_number": pr_df["pr_number"].astype(int).tolist(),
+		"embedding_norm": norms,
+		"embedding_dim": [64] * len(norms),
+	}
+
+
+register_agent(
+	AgentSpec(
+		name="embeddings",
+		inputs=("title", "body", "files"),
+		outputs=("embedding_norm", "embedding_dim"),
+		compute=embedding_columns,
+	)
+)
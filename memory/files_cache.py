@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable
+
+from memory.patch_store import PatchStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PullRequestFilesCache:
+	"""File entries of each PR keyed by ``(pr_number, head_sha)``, optionally persisted as JSON.
+
+	A PR's files and patches only change with its head commit, while ``updated_at`` also
+	moves on comments and labels. Entries hold ``patch_sha`` references, so a persisted
+	cache needs the patch blobs too: ``patch_dir`` (the ``PATCH_STORE_DIR``) is where
+	missing blobs are reloaded from.
+	"""
+
+	def __init__(self, path: str | Path | None = None, *, patch_dir: str | Path | None = None) -> None:
+		self.path = Path(path) if path else None
+		self.patch_dir = Path(patch_dir) if patch_dir else None
+		self._entries: dict[int, tuple[str, list[dict[str, Any]]]] = {}
+		if self.path is not None and self.path.exists():
+			payload = json.loads(self.path.read_text(encoding="utf-8"))
+			self._entries = {int(number): (head_sha, files) for number, (head_sha, files) in payload.items()}
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, pr_number: int, head_sha: str, store: PatchStore) -> list[dict[str, Any]] | None:
+		"""Cached files of ``pr_number`` at ``head_sha``, or ``None``.
+
+		An entry whose patches are neither in ``store`` nor under ``patch_dir`` is a miss.
+		"""
+		entry = self._entries.get(pr_number)
+		if not head_sha or entry is None or entry[0] != head_sha:
+			return None
+		files = entry[1]
+		missing = [item["patch_sha"] for item in files if item["patch_sha"] and item["patch_sha"] not in store]
+		if missing and self.patch_dir is not None:
+			store.update(PatchStore.load(self.patch_dir, missing))
+			missing = [key for key in missing if key not in store]
+		if missing:
+			LOGGER.debug("Files cache entry for PR #%s lost %s patches", pr_number, len(missing))
+			return None
+		return files
+
+	def put(self, pr_number: int, head_sha: str, files: list[dict[str, Any]]) -> None:
+		if head_sha:
+			self._entries[pr_number] = (head_sha, files)
+
+	def pr_numbers(self) -> set[int]:
+		return set(self._entries)
+
+	def discard(self, pr_numbers: Iterable[int]) -> None:
+		for number in pr_numbers:
+			self._entries.pop(number, None)
+
+	def save(self) -> None:
+		if self.path is None:
+			return
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		payload = {str(number): [head_sha, files] for number, (head_sha, files) in self._entries.items()}
+		self.path.write_text(json.dumps(payload), encoding="utf-8")
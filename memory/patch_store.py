@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Iterable
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PatchStore:
+	"""Content-addressed store for diff text.
+
+	Patches are keyed by the SHA-256 of their UTF-8 bytes, so the same patch shared by
+	stacked or rebased PRs is held once in memory and written once on disk. Records keep
+	only the ``patch_sha`` reference.
+	"""
+
+	def __init__(self) -> None:
+		self._blobs: dict[str, str] = {}
+		self._references = 0
+		self._referenced_bytes = 0
+
+	def __contains__(self, key: object) -> bool:
+		return key in self._blobs
+
+	def __len__(self) -> int:
+		return len(self._blobs)
+
+	def put(self, patch: str) -> str:
+		if not patch:
+			return ""
+		encoded = patch.encode("utf-8")
+		key = hashlib.sha256(encoded).hexdigest()
+		self._blobs.setdefault(key, patch)
+		self._references += 1
+		self._referenced_bytes += len(encoded)
+		return key
+
+	def get(self, key: str) -> str:
+		if not key:
+			return ""
+		return self._blobs[key]
+
+	def update(self, other: PatchStore) -> int:
+		"""Adds the blobs of ``other`` (e.g. a store restored from a checkpoint)."""
+		if other is self:
+			return 0
+		added = 0
+		for key, blob in other._blobs.items():
+			if key not in self._blobs:
+				self._blobs[key] = blob
+				added += 1
+		return added
+
+	def take(self, keys: Iterable[str]) -> PatchStore:
+		"""Moves the blobs of ``keys`` into a new store, e.g. to spill one chunk of PRs to disk."""
+		taken = PatchStore()
+		for key in keys:
+			blob = self._blobs.pop(key, None)
+			if blob is not None:
+				taken._blobs[key] = blob
+		return taken
+
+	def content_digest(self) -> str:
+		"""Identifies the stored blobs (keys are content hashes); usage counters are ignored."""
+		return hashlib.sha256("\n".join(sorted(self._blobs)).encode("ascii")).hexdigest()
+
+	def stats(self) -> dict[str, int]:
+		stored_bytes = sum(len(blob.encode("utf-8")) for blob in self._blobs.values())
+		return {
+			"blobs": len(self._blobs),
+			"references": self._references,
+			"referenced_bytes": self._referenced_bytes,
+			"stored_bytes": stored_bytes,
+			"saved_bytes": self._referenced_bytes - stored_bytes,
+		}
+
+	def save(self, directory: str | Path, *, measure: bool = True) -> dict[str, int]:
+		"""Writes blobs as ``<dir>/<sha[:2]>/<sha>``; blobs already on disk are skipped.
+
+		``measure=False`` skips sizing the whole directory, for frequent incremental saves.
+		"""
+		root = Path(directory)
+		written = 0
+		for key, blob in self._blobs.items():
+			target = root / key[:2] / key
+			if target.exists():
+				continue
+			target.parent.mkdir(parents=True, exist_ok=True)
+			target.write_text(blob, encoding="utf-8")
+			written += 1
+
+		report = {"blobs_written": written}
+		if measure:
+			report["disk_bytes"] = sum(path.stat().st_size for path in root.glob("*/*") if path.is_file())
+			report["referenced_bytes"] = self._referenced_bytes
+			LOGGER.info("Patch store saved to %s: %s", root, report)
+		return report
+
+	@classmethod
+	def load(cls, directory: str | Path, keys: Iterable[str] | None = None) -> PatchStore:
+		"""Reads a saved store; with ``keys``, only those blobs (missing ones are skipped)."""
+		store = cls()
+		root = Path(directory)
+		if keys is None:
+			paths: Iterable[Path] = root.glob("*/*")
+		else:
+			paths = (root / key[:2] / key for key in set(keys) if key)
+		for path in paths:
+			if path.is_file():
+				store._blobs[path.name] = path.read_text(encoding="utf-8")
+		return store
+
+
+DEFAULT_PATCH_STORE = PatchStore()
+
+
+def resolve_patch(file_item: Any, store: PatchStore | None = None) -> str:
+	"""Returns the patch text of a file entry, following its ``patch_sha`` reference."""
+	patch = file_item.get("patch")
+	if patch is not None:
+		return str(patch)
+	return (store if store is not None else DEFAULT_PATCH_STORE).get(str(file_item.get("patch_sha") or ""))
+
+
+def build_combined_diff(files: Any, store: PatchStore | None = None) -> str:
+	"""Builds the PR-wide diff on demand instead of storing it next to the file patches."""
+	if not isinstance(files, list):
+		return ""
+	patches = (resolve_patch(item, store) for item in files)
+	return "\n\n".join(patch for patch in patches if patch)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import logging
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+LOGGER = logging.getLogger(__name__)
+
+# (-priority_score, risk_score, pr_number): ascending order is "review first" order.
+QueueKey = tuple[float, float, int]
+
+
+class PersistentPriorityQueue:
+	"""Review queue of open PRs ordered by priority (desc), risk (asc), PR number.
+
+	Entries live in a sorted list persisted in queue order, so loading needs no sort and
+	``top(k)`` is a slice. Updates touch only PRs whose scores changed (O(log n) search
+	each), and PRs missing from a full ingestion can be pruned.
+	"""
+
+	def __init__(self, path: str | Path | None = None) -> None:
+		self.path = Path(path) if path else None
+		self._order: list[QueueKey] = []
+		self._keys: dict[int, QueueKey] = {}
+		if self.path is not None and self.path.exists():
+			payload = json.loads(self.path.read_text(encoding="utf-8"))
+			self._order = [(-float(score), float(risk), int(number)) for number, score, risk in payload.get("queue", [])]
+			self._keys = {key[2]: key for key in self._order}
+
+	def __len__(self) -> int:
+		return len(self._order)
+
+	def __contains__(self, number: object) -> bool:
+		return number in self._keys
+
+	def _remove_key(self, key: QueueKey) -> None:
+		index = bisect.bisect_left(self._order, key)
+		del self._order[index]
+
+	def push(self, number: int, priority_score: float, risk_score: float = 0.0) -> bool:
+		"""Inserts or re-positions PR ``number``; returns ``False`` when nothing changed."""
+		key = (-float(priority_score), float(risk_score), int(number))
+		previous = self._keys.get(key[2])
+		if previous == key:
+			return False
+		if previous is not None:
+			self._remove_key(previous)
+		bisect.insort(self._order, key)
+		self._keys[key[2]] = key
+		return True
+
+	def remove(self, number: int) -> bool:
+		key = self._keys.pop(int(number), None)
+		if key is None:
+			return False
+		self._remove_key(key)
+		return True
+
+	def update(
+		self,
+		numbers: Iterable[int],
+		priority_scores: Iterable[float],
+		risk_scores: Iterable[float],
+		*,
+		prune: bool = False,
+	) -> dict[str, int]:
+		"""Applies a batch of scores; with ``prune`` PRs absent from the batch are dropped."""
+		seen: set[int] = set()
+		changed = 0
+		for number, priority_score, risk_score in zip(numbers, priority_scores, risk_scores):
+			seen.add(int(number))
+			changed += self.push(int(number), priority_score, risk_score)
+		removed = 0
+		if prune:
+			for number in [number for number in self._keys if number not in seen]:
+				removed += self.remove(number)
+		return {"changed": changed, "removed": removed, "size": len(self._order)}
+
+	def update_from_frame(self, df: pd.DataFrame, *, prune: bool = False) -> dict[str, int]:
+		risk = df["risk_score"] if "risk_score" in df.columns else [0.0] * len(df)
+		summary = self.update(df["pr_number"].tolist(), df["priority_score"].tolist(), list(risk), prune=prune)
+		LOGGER.info("Priority queue update: %s", summary)
+		return summary
+
+	def top(self, k: int) -> list[dict[str, float | int]]:
+		"""The ``k`` PRs to review next, best first."""
+		return [
+			{"pr_number": number, "priority_score": -negated, "risk_score": risk}
+			for negated, risk, number in self._order[: max(0, k)]
+		]
+
+	def save(self) -> None:
+		if self.path is None:
+			return
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		payload = {"queue": [[number, -negated, risk] for negated, risk, number in self._order]}
+		self.path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Print the top of a persisted PR review queue.")
+	parser.add_argument("path")
+	parser.add_argument("--top", type=int, default=10)
+	args = parser.parse_args()
+	for position, item in enumerate(PersistentPriorityQueue(args.path).top(args.top), start=1):
+		print(f"{position:>3}. #{item['pr_number']} priority={item['priority_score']} risk={item['risk_score']}")
+
+
+if __name__ == "__main__":
+	main()
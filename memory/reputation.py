@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from agents.engine import AgentSpec, register_agent
+
+LOGGER = logging.getLogger(__name__)
+
+# How much endorsement a review passes from the reviewer to the reviewed PR. A
+# ``CHANGES_REQUESTED`` review replaces an earlier approval but endorses nothing.
+REVIEW_WEIGHTS: dict[str, float] = {
+	"APPROVED": 1.0,
+	"COMMENTED": 0.3,
+	"CHANGES_REQUESTED": 0.0,
+	"DISMISSED": 0.0,
+}
+
+
+def _user(login: str) -> str:
+	return f"user:{login}"
+
+
+def _pr(number: int) -> str:
+	return f"pr:{number}"
+
+
+class ReputationGraph:
+	"""Sparse reviewer -> PR -> author graph with PageRank-style reputation.
+
+	A reviewer's reputation flows into the PRs they reviewed (weighted by review state)
+	and from each PR to its author, so authors whose work was approved by reputable
+	reviewers rank higher. Ranks are kept between runs and used as the starting vector
+	of the next computation, so adding a day's reviews converges in a few iterations.
+	"""
+
+	def __init__(
+		self,
+		path: str | Path | None = None,
+		*,
+		damping: float = 0.85,
+		tolerance: float = 1e-9,
+		max_iterations: int = 200,
+	) -> None:
+		self.path = Path(path) if path else None
+		self.damping = damping
+		self.tolerance = tolerance
+		self.max_iterations = max_iterations
+		self._authors: dict[int, str] = {}
+		self._reviews: dict[tuple[int, str], str] = {}
+		self._nodes: dict[str, int] = {}
+		self._rank = np.zeros(0, dtype=np.float64)
+		self._dirty = False
+		self.iterations = 0
+		if self.path is not None and self.path.exists():
+			payload = json.loads(self.path.read_text(encoding="utf-8"))
+			for number, login in payload.get("authors", {}).items():
+				self.add_pull_request(int(number), login)
+			for number, reviewer, state in payload.get("reviews", []):
+				self.add_review(int(number), reviewer, state)
+			ranks = payload.get("rank", {})
+			self._rank = np.array([ranks.get(node, 0.0) for node in self._nodes], dtype=np.float64)
+
+	def __len__(self) -> int:
+		return len(self._reviews)
+
+	def _node(self, name: str) -> int:
+		index = self._nodes.get(name)
+		if index is None:
+			index = self._nodes[name] = len(self._nodes)
+		return index
+
+	def add_pull_request(self, number: int, author: str) -> None:
+		if author and self._authors.get(number) != author:
+			self._authors[number] = author
+			self._node(_pr(number))
+			self._node(_user(author))
+			self._dirty = True
+
+	def add_review(self, number: int, reviewer: str, state: str) -> None:
+		"""Records the latest review state of ``reviewer`` on PR ``number``."""
+		state = state.upper()
+		if not reviewer or state not in REVIEW_WEIGHTS or self._reviews.get((number, reviewer)) == state:
+			return
+		self._reviews[(number, reviewer)] = state
+		self._node(_user(reviewer))
+		self._node(_pr(number))
+		self._dirty = True
+
+	def update_from_reviews(self, number: int, author: str, reviews: Iterable[dict[str, Any]]) -> None:
+		"""Adds PR ``number`` and its reviews (``reviewer``/``state`` dicts, oldest first)."""
+		self.add_pull_request(number, author)
+		for review in reviews:
+			self.add_review(number, review.get("reviewer") or "", review.get("state") or "")
+
+	def update_from_frame(self, pr_df: pd.DataFrame) -> int:
+		"""Updates from a PR frame with ``author`` and (optionally) ``reviews`` columns."""
+		if "author" not in pr_df.columns:
+			return 0
+		reviews = pr_df["reviews"] if "reviews" in pr_df.columns else [None] * len(pr_df)
+		for number, author, pr_reviews in zip(pr_df["pr_number"], pr_df["author"], reviews):
+			self.update_from_reviews(int(number), str(author or ""), pr_reviews if isinstance(pr_reviews, list) else [])
+		return len(pr_df)
+
+	def _edges(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+		sources: list[int] = []
+		targets: list[int] = []
+		weights: list[float] = []
+		for (number, reviewer), state in self._reviews.items():
+			author = self._authors.get(number)
+			weight = REVIEW_WEIGHTS[state]
+			if weight <= 0 or reviewer == author:
+				continue
+			sources.append(self._nodes[_user(reviewer)])
+			targets.append(self._nodes[_pr(number)])
+			weights.append(weight)
+		for number, author in self._authors.items():
+			sources.append(self._nodes[_pr(number)])
+			targets.append(self._nodes[_user(author)])
+			weights.append(1.0)
+		return (
+			np.asarray(sources, dtype=np.int64),
+			np.asarray(targets, dtype=np.int64),
+			np.asarray(weights, dtype=np.float64),
+		)
+
+	def compute(self) -> np.ndarray:
+		"""Runs power iteration until the L1 change drops below ``tolerance``.
+
+		Each step is one sparse matrix-vector product over the edge list (``bincount``
+		over COO targets); nodes without outgoing edges spread their rank uniformly.
+		"""
+		nodes = len(self._nodes)
+		if not nodes:
+			self._dirty = False
+			return self._rank
+		sources, targets, weights = self._edges()
+		out_weight = np.bincount(sources, weights=weights, minlength=nodes)
+		transition = weights / out_weight[sources]
+		dangling = out_weight == 0
+
+		# Warm start: previous ranks for known nodes, uniform mass for new ones.
+		rank = np.full(nodes, 1.0 / nodes)
+		known = min(len(self._rank), nodes)
+		if known and self._rank[:known].sum() > 0:
+			rank[:known] = self._rank[:known]
+			rank /= rank.sum()
+
+		teleport = (1.0 - self.damping) / nodes
+		iterations = 0
+		for iterations in range(1, self.max_iterations + 1):
+			spread = np.bincount(targets, weights=rank[sources] * transition, minlength=nodes)
+			updated = self.damping * (spread + rank[dangling].sum() / nodes) + teleport
+			delta = float(np.abs(updated - rank).sum())
+			rank = updated
+			if delta < self.tolerance:
+				break
+		self.iterations = iterations
+		LOGGER.info("Reputation converged in %s iterations over %s edges", iterations, len(sources))
+		self._rank = rank
+		self._dirty = False
+		return rank
+
+	def scores(self) -> dict[str, float]:
+		"""Per-login reputation normalised so the average user scores 1.0."""
+		if self._dirty or len(self._rank) != len(self._nodes):
+			self.compute()
+		users = [(name[5:], index) for name, index in self._nodes.items() if name.startswith("user:")]
+		if not users:
+			return {}
+		values = self._rank[[index for _, index in users]]
+		values = values * (len(users) / values.sum())
+		return {login: float(value) for (login, _), value in zip(users, values)}
+
+	def save(self) -> None:
+		if self.path is None:
+			return
+		if self._dirty:
+			self.compute()
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		payload = {
+			"authors": {str(number): login for number, login in self._authors.items()},
+			"reviews": [[number, reviewer, state] for (number, reviewer), state in self._reviews.items()],
+			"rank": {node: float(self._rank[index]) for node, index in self._nodes.items() if index < len(self._rank)},
+		}
+		self.path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def reputation_columns(pr_df: pd.DataFrame, *, graph: ReputationGraph | None = None) -> dict[str, np.ndarray]:
+	"""Reputation kernel: ``author_reputation`` per PR, 0.0 without a graph or history."""
+	reputation = np.zeros(len(pr_df), dtype=np.float64)
+	if graph is not None and "author" in pr_df.columns and len(pr_df):
+		scores = graph.scores()
+		codes, logins = pd.factorize(pr_df["author"].fillna("").astype(str))
+		per_author = np.array([scores.get(login, 0.0) for login in logins], dtype=np.float64)
+		reputation = np.round(per_author[codes], 4)
+	return {"pr_number": pr_df["pr_number"].to_numpy(dtype=np.int64), "author_reputation": reputation}
+
+
+register_agent(
+	AgentSpec(
+		name="reputation",
+		inputs=("author",),
+		outputs=("author_reputation",),
+		compute=reputation_columns,
+	)
+)
@@ -0,0 +1,335 @@
+"""In-process run metrics: counters, gauges and latency histograms.
+
+Instrumented code records into the shared ``METRICS`` registry; ``write_run_manifest``
+and ``write_prometheus_textfile`` export a snapshot at the end of a run (or daemon cycle).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+_NUMBER_SEGMENT = re.compile(r"/\d+(?=/|$)")
+_REPO_PREFIX = re.compile(r"^/repos/[^/]+/[^/]+")
+
+
+def _labels(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[int]:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms keyed by metric name and labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._help: dict[str, str] = {}
+        self.started_at = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = float(value)
+
+    def set_state(self, name: str, label: str, state: str, **labels: Any) -> None:
+        """State-set gauge: ``name{labels, label=state} 1``, replacing the previous state of ``labels``."""
+        base = _labels(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            for key in [key for key in series if tuple(pair for pair in key if pair[0] != label) == base]:
+                del series[key]
+            series[_labels({**labels, label: state})] = 1.0
+
+    def max_gauge(self, name: str, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = max(series.get(key, float(value)), float(value))
+
+    def observe(self, name: str, value: float, *, buckets: tuple[float, ...] = LATENCY_BUCKETS, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(float(value))
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        """Plain-data copy of every series (``labels`` plus value or histogram fields)."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            gauges = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._gauges.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "buckets": dict(zip((str(bound) for bound in histogram.buckets), histogram.cumulative())),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (for the node_exporter textfile collector)."""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for kind, section in (("counter", "counters"), ("gauge", "gauges")):
+            for name in sorted(snapshot[section]):
+                header(name, kind)
+                for item in snapshot[section][name]:
+                    lines.append(f"{name}{_format_labels(item['labels'])} {_format_value(item['value'])}")
+        for name in sorted(snapshot["histograms"]):
+            header(name, "histogram")
+            for item in snapshot["histograms"][name]:
+                for bound, count in item["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels({**item['labels'], 'le': bound})} {count}")
+                lines.append(f"{name}_bucket{_format_labels({**item['labels'], 'le': '+Inf'})} {item['count']}")
+                lines.append(f"{name}_sum{_format_labels(item['labels'])} {_format_value(item['sum'])}")
+                lines.append(f"{name}_count{_format_labels(item['labels'])} {item['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+METRICS = MetricsRegistry()
+METRICS.describe("prion_stage_seconds", "Wall time of each pipeline stage in the last run")
+METRICS.describe("prion_stage_status", "Status of each pipeline stage in the last run (ok, cached, restored, failed)")
+METRICS.describe("prion_rows_processed_total", "Rows produced by stages and agents")
+METRICS.describe("prion_http_requests_total", "HTTP requests by service, endpoint, method and status")
+METRICS.describe("prion_http_request_seconds", "HTTP request latency")
+METRICS.describe("prion_github_rate_limit_remaining", "X-RateLimit-Remaining of the latest GitHub response")
+METRICS.describe("prion_cache_requests_total", "Cache lookups by cache and result (hit/miss)")
+METRICS.describe("prion_agent_seconds", "Compute time of each scoring agent")
+METRICS.describe("prion_peak_rss_bytes", "Peak resident set size of the process")
+METRICS.describe("prion_frame_bytes", "Deep memory of the pipeline frames and their side tables")
+
+
+def endpoint_label(url: str) -> str:
+    """Low-cardinality endpoint name: GitHub API paths with ids replaced, else the host.
+
+    Webhook URLs carry secrets in their path, so only their host is ever recorded.
+    """
+    parts = urlsplit(url)
+    if parts.netloc != "api.github.com":
+        return parts.netloc or "unknown"
+    path = _REPO_PREFIX.sub("/repos/{owner}/{repo}", parts.path)
+    return _NUMBER_SEGMENT.sub("/{number}", path) or "/"
+
+
+def instrument_session(session: Any, *, service: str, registry: MetricsRegistry | None = None) -> Any:
+    """Adds a response hook recording request counts, latency and GitHub rate limits."""
+    registry = registry if registry is not None else METRICS
+
+    def record(response: Any, *args: Any, **kwargs: Any) -> Any:
+        endpoint = endpoint_label(response.url or "")
+        method = getattr(response.request, "method", "GET") or "GET"
+        registry.inc(
+            "prion_http_requests_total",
+            service=service,
+            endpoint=endpoint,
+            method=method,
+            status=response.status_code,
+        )
+        registry.observe(
+            "prion_http_request_seconds",
+            response.elapsed.total_seconds(),
+            service=service,
+            endpoint=endpoint,
+        )
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            registry.set_gauge("prion_github_rate_limit_remaining", int(remaining), service=service)
+        return response
+
+    session.hooks.setdefault("response", []).append(record)
+    return session
+
+
+def record_cache(cache: str, hits: int, misses: int, registry: MetricsRegistry | None = None) -> None:
+    registry = registry if registry is not None else METRICS
+    if hits:
+        registry.inc("prion_cache_requests_total", hits, cache=cache, result="hit")
+    if misses:
+        registry.inc("prion_cache_requests_total", misses, cache=cache, result="miss")
+
+
+def peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def run_manifest(registry: MetricsRegistry | None = None, **extra: Any) -> dict[str, Any]:
+    """Summary of a run: stage timings, HTTP calls, cache hit ratios and the raw series."""
+    registry = registry if registry is not None else METRICS
+    rss = peak_rss_bytes()
+    if rss is not None:
+        registry.max_gauge("prion_peak_rss_bytes", rss)
+    snapshot = registry.snapshot()
+
+    statuses = {item["labels"]["stage"]: item["labels"]["status"] for item in snapshot["gauges"].get("prion_stage_status", [])}
+    stages = {
+        item["labels"]["stage"]: {"status": statuses.get(item["labels"]["stage"]), "seconds": round(item["value"], 6)}
+        for item in snapshot["gauges"].get("prion_stage_seconds", [])
+    }
+    http: dict[str, dict[str, Any]] = {}
+    for item in snapshot["counters"].get("prion_http_requests_total", []):
+        labels = item["labels"]
+        entry = http.setdefault(f"{labels['method']} {labels['endpoint']}", {"service": labels["service"], "requests": 0, "statuses": {}})
+        entry["requests"] += int(item["value"])
+        entry["statuses"][labels["status"]] = entry["statuses"].get(labels["status"], 0) + int(item["value"])
+    caches: dict[str, dict[str, float]] = {}
+    for item in snapshot["counters"].get("prion_cache_requests_total", []):
+        entry = caches.setdefault(item["labels"]["cache"], {"hits": 0, "misses": 0})
+        entry["hits" if item["labels"]["result"] == "hit" else "misses"] += int(item["value"])
+    for entry in caches.values():
+        lookups = entry["hits"] + entry["misses"]
+        entry["hit_ratio"] = round(entry["hits"] / lookups, 4) if lookups else 0.0
+    rows = {
+        ":".join(next(iter(item["labels"].items()))): int(item["value"])
+        for item in snapshot["counters"].get("prion_rows_processed_total", [])
+    }
+    rate_limit = [item["value"] for item in snapshot["gauges"].get("prion_github_rate_limit_remaining", [])]
+    frame_bytes = {item["labels"]["frame"]: int(item["value"]) for item in snapshot["gauges"].get("prion_frame_bytes", [])}
+
+    finished = time.time()
+    return {
+        "started_at": datetime.fromtimestamp(registry.started_at, timezone.utc).isoformat(),
+        "finished_at": datetime.fromtimestamp(finished, timezone.utc).isoformat(),
+        "duration_seconds": round(finished - registry.started_at, 3),
+        "peak_rss_bytes": rss,
+        "stages": stages,
+        "rows_processed": rows,
+        "http": http,
+        "github_rate_limit_remaining": int(min(rate_limit)) if rate_limit else None,
+        "caches": caches,
+        "frame_bytes": frame_bytes,
+        **extra,
+        "metrics": snapshot,
+    }
+
+
+def _write_atomic(path: str | Path, text: str) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, path)
+    return path
+
+
+def write_run_manifest(path: str | Path, registry: MetricsRegistry | None = None, **extra: Any) -> Path:
+    return _write_atomic(path, json.dumps(run_manifest(registry, **extra), indent=2, default=str))
+
+
+def write_prometheus_textfile(path: str | Path, registry: MetricsRegistry | None = None) -> Path:
+    """Writes atomically, as the textfile collector may read the file at any time."""
+    registry = registry if registry is not None else METRICS
+    rss = peak_rss_bytes()
+    if rss is not None:
+        registry.max_gauge("prion_peak_rss_bytes", rss)
+    return _write_atomic(path, registry.to_prometheus())
@@ -1,5 +1,5 @@
 from .github_labeler import label_prs
-from .webhook_delivery import deliver_webhook_payloads
+from .webhook_delivery import WebhookDeliveryError, deliver_webhook_payloads, require_delivered
 from .webhook_exporter import (
 	build_discord_payload,
 	build_notion_payload,
@@ -14,4 +14,6 @@ __all__ = [
 	"build_notion_payload",
 	"export_webhook_payloads",
 	"deliver_webhook_payloads",
+	"require_delivered",
+	"WebhookDeliveryError",
 ]
@@ -6,6 +6,8 @@ from typing import Any
 import pandas as pd
 import requests
 
+from metrics import instrument_session
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -14,6 +16,7 @@ def _labels_for_row(row: pd.Series) -> list[str]:
 	risk_score = float(row.get("risk_score", 0))
 	trust_score = float(row.get("trust_score", 50))
 	duplicate_count = int(row.get("duplicate_count", 0))
+	duplicate_count += int(row.get("patch_duplicate_count", 0)) + int(row.get("patch_near_duplicate_count", 0))
 
 	if risk_score >= 30:
 		labels.append("requires-attention")
@@ -56,6 +59,7 @@ def label_prs(
 			"X-GitHub-Api-Version": "2022-11-28",
 		}
 	)
+	instrument_session(session, service="github")
 
 	processed = 0
 	labeled = 0
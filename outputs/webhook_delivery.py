@@ -8,9 +8,20 @@ from typing import Any
 
 import requests
 
+from metrics import instrument_session
+
 LOGGER = logging.getLogger(__name__)
 
 
+class WebhookDeliveryError(RuntimeError):
+    """Raised by ``require_delivered`` when a provider could not be reached; ``status`` has the details."""
+
+    def __init__(self, status: dict[str, Any]) -> None:
+        failed = sorted(provider for provider, result in status["results"].items() if str(result).startswith("error:"))
+        super().__init__(f"Webhook delivery failed for {', '.join(failed)}")
+        self.status = status
+
+
 def _post_with_retry(
     session: requests.Session,
     *,
@@ -77,6 +88,7 @@ def deliver_webhook_payloads(
 
     session = requests.Session()
     session.headers.update({"Content-Type": "application/json"})
+    instrument_session(session, service="webhook")
 
     for provider, payload_path in payload_paths.items():
         url = webhook_urls.get(provider, "").strip()
@@ -97,3 +109,10 @@ def deliver_webhook_payloads(
             LOGGER.error("Webhook delivery error for %s: %s", provider, exc)
 
     return status
+
+
+def require_delivered(status: dict[str, Any]) -> dict[str, Any]:
+    """Returns ``status`` unless a delivery failed, so a pipeline stage can fail and be retried."""
+    if status["errors"]:
+        raise WebhookDeliveryError(status)
+    return status
@@ -8,13 +8,15 @@ from typing import Any
 
 import pandas as pd
 
+from agents.columns import top_k_rows
+
 LOGGER = logging.getLogger(__name__)
 
 
 def _top_priority_records(df: pd.DataFrame, limit: int = 20) -> list[dict[str, Any]]:
     if df.empty:
         return []
-    top = df.sort_values(by=["priority_score", "risk_score"], ascending=[False, False]).head(limit)
+    top = top_k_rows(df, ["priority_score", "risk_score"], limit, ascending=[False, False])
     return top.to_dict(orient="records")
 
 
@@ -30,9 +32,9 @@ def _base_export_payload(df: pd.DataFrame) -> dict[str, Any]:
     }
 
 
-def build_slack_payload(df: pd.DataFrame) -> dict[str, Any]:
+def build_slack_payload(df: pd.DataFrame, top: list[dict[str, Any]] | None = None) -> dict[str, Any]:
     base = _base_export_payload(df)
-    top = _top_priority_records(df)
+    top = _top_priority_records(df) if top is None else top[:20]
     lines = [
         f"*PRion Daily Summary*",
         f"Total PRs: {base['total_prs']}",
@@ -50,9 +52,9 @@ def build_slack_payload(df: pd.DataFrame) -> dict[str, Any]:
     }
 
 
-def build_discord_payload(df: pd.DataFrame) -> dict[str, Any]:
+def build_discord_payload(df: pd.DataFrame, top: list[dict[str, Any]] | None = None) -> dict[str, Any]:
     base = _base_export_payload(df)
-    top = _top_priority_records(df, limit=10)
+    top = _top_priority_records(df, limit=10) if top is None else top[:10]
     embed_lines = [
         {
             "name": f"PR #{item['pr_number']}",
@@ -79,9 +81,9 @@ def build_discord_payload(df: pd.DataFrame) -> dict[str, Any]:
     }
 
 
-def build_notion_payload(df: pd.DataFrame) -> dict[str, Any]:
+def build_notion_payload(df: pd.DataFrame, top: list[dict[str, Any]] | None = None) -> dict[str, Any]:
     base = _base_export_payload(df)
-    top = _top_priority_records(df)
+    top = _top_priority_records(df) if top is None else top[:20]
     items = []
     for item in top:
         items.append(
@@ -102,14 +104,21 @@ def build_notion_payload(df: pd.DataFrame) -> dict[str, Any]:
     }
 
 
-def export_webhook_payloads(df: pd.DataFrame, reports_dir: str) -> dict[str, Path]:
+def export_webhook_payloads(
+    df: pd.DataFrame,
+    reports_dir: str,
+    top: list[dict[str, Any]] | None = None,
+) -> dict[str, Path]:
+    """Writes the provider payloads; ``top`` overrides the ranked records taken from ``df``."""
     path = Path(reports_dir)
     path.mkdir(parents=True, exist_ok=True)
 
+    # Selected once and shared: each provider only needs a prefix of the same ranking.
+    top = _top_priority_records(df) if top is None else top
     payloads = {
-        "slack": build_slack_payload(df),
-        "discord": build_discord_payload(df),
-        "notion": build_notion_payload(df),
+        "slack": build_slack_payload(df, top),
+        "discord": build_discord_payload(df, top),
+        "notion": build_notion_payload(df, top),
     }
 
     output_paths: dict[str, Path] = {}
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from metrics import METRICS, record_cache
+
+LOGGER = logging.getLogger("prion.dag")
+
+StageFunc = Callable[..., dict[str, Any]]
+
+# Checkpoints kept per stage; older objects are pruned at the end of each run.
+DEFAULT_CHECKPOINT_KEEP = 3
+
+
+@dataclass(slots=True, frozen=True)
+class Stage:
+    """A pipeline step: ``func(**inputs)`` returns a dict containing ``outputs``.
+
+    ``cacheable`` stages are skipped when a checkpoint exists for the same inputs and
+    code version. Stages reading external state (e.g. the GitHub fetch) are not: they
+    always run unless resumed from their latest checkpoint. Non-cacheable stages with
+    ``side_effects`` (labels, webhooks) are not restored by a resume either, so a rerun
+    after they failed performs them again. ``key_extra`` adds state that is not a stage
+    input, such as the day scores are computed for, to the checkpoint key.
+    """
+
+    name: str
+    func: StageFunc
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    cacheable: bool = True
+    side_effects: bool = False
+    key_extra: Callable[[], str] | None = None
+
+
+@dataclass(slots=True)
+class StageTiming:
+    name: str
+    status: str
+    seconds: float = 0.0
+
+
+class StageError(RuntimeError):
+    """Raised by ``run_stages`` when a stage fails; the original error is ``__cause__``."""
+
+    def __init__(self, stage: str, timings: list[StageTiming]) -> None:
+        super().__init__(f"Pipeline stage '{stage}' failed")
+        self.stage = stage
+        self.timings = timings
+
+
+def _sha256(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def source_digest(paths: Iterable[str | Path], extra: Iterable[str] = ()) -> str:
+    """Digest of the given source files (directories are searched for ``*.py``) and strings."""
+    digest = hashlib.sha256()
+    for root in sorted(Path(path) for path in paths):
+        files = sorted(root.rglob("*.py")) if root.is_dir() else [root]
+        for file in files:
+            if file.is_file():
+                digest.update(file.as_posix().encode("utf-8"))
+                digest.update(file.read_bytes())
+    for item in extra:
+        digest.update(item.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Content-addressed stage outputs under ``objects/<key[:2]>/<key>.pkl``.
+
+    ``latest/<stage>.json`` points at the most recent checkpoint of each stage; it is what
+    resume, ``from_stage`` and ``only_stage`` restore upstream results from. It also lists
+    the stage's ``keep`` most recent keys, and ``prune`` deletes every other object.
+    """
+
+    def __init__(self, directory: str | Path, *, keep: int = DEFAULT_CHECKPOINT_KEEP) -> None:
+        if keep < 1:
+            raise ValueError("keep must be positive")
+        self.root = Path(directory)
+        self.keep = keep
+
+    def _object(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / f"{key}.pkl"
+
+    def _pointer(self, stage: str) -> Path:
+        return self.root / "latest" / f"{stage}.json"
+
+    def has(self, key: str) -> bool:
+        return self._object(key).exists()
+
+    def load(self, key: str) -> dict[str, Any]:
+        with self._object(key).open("rb") as handle:
+            return pickle.load(handle)
+
+    def save(self, stage: str, key: str, outputs: dict[str, Any], digests: dict[str, str]) -> None:
+        target = self._object(key)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temporary = target.with_suffix(".tmp")
+            with temporary.open("wb") as handle:
+                pickle.dump(outputs, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            temporary.replace(target)
+        previous = self.latest(stage) or {}
+        recent = [key, *(older for older in previous.get("recent", [previous.get("key")]) if older and older != key)]
+        pointer = self._pointer(stage)
+        pointer.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "key": key,
+            "digests": digests,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "recent": recent[: self.keep],
+        }
+        pointer.write_text(json.dumps(payload), encoding="utf-8")
+
+    def prune(self, *, before: float | None = None) -> int:
+        """Deletes objects no stage lists among its recent keys; returns how many.
+
+        Objects modified at or after ``before`` (a timestamp) are kept, so a run does not
+        delete what a concurrent run sharing the directory has not pointed at yet.
+        """
+        referenced: set[str] = set()
+        for stage in self.stages():
+            pointer = self.latest(stage) or {}
+            referenced.update(pointer.get("recent", [pointer.get("key")]))
+        removed = 0
+        for path in (self.root / "objects").glob("*/*.pkl"):
+            if path.stem in referenced or (before is not None and path.stat().st_mtime >= before):
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        if removed:
+            LOGGER.info("Pruned %s unreferenced checkpoints", removed)
+        return removed
+
+    def stages(self) -> list[str]:
+        """Names of the stages that have a latest checkpoint."""
+        return sorted(path.stem for path in (self.root / "latest").glob("*.json"))
+
+    def latest(self, stage: str) -> dict[str, Any] | None:
+        pointer = self._pointer(stage)
+        if not pointer.exists():
+            return None
+        return json.loads(pointer.read_text(encoding="utf-8"))
+
+
+def validate_stages(stages: Iterable[Stage], available: Iterable[str] = ()) -> list[Stage]:
+    """Checks names, single producers per value and that every input has a producer."""
+    stages = list(stages)
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {sorted(name for name in set(names) if names.count(name) > 1)}")
+    producers: dict[str, str] = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"'{output}' is produced by both '{producers[output]}' and '{stage.name}'")
+            producers[output] = stage.name
+    known = set(producers) | set(available)
+    for stage in stages:
+        missing = [value for value in stage.inputs if value not in known]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' has no producer for inputs: {missing}")
+    return stages
+
+
+def _reachable(stages: list[Stage], start: str, *, downstream: bool) -> set[str]:
+    """Stages reachable from ``start`` along data edges, excluding ``start`` itself."""
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    edges: dict[str, set[str]] = {stage.name: set() for stage in stages}
+    for stage in stages:
+        for value in stage.inputs:
+            if value in producers:
+                if downstream:
+                    edges[producers[value]].add(stage.name)
+                else:
+                    edges[stage.name].add(producers[value])
+    seen: set[str] = set()
+    frontier = [start]
+    while frontier:
+        for name in edges[frontier.pop()] - seen:
+            seen.add(name)
+            frontier.append(name)
+    return seen
+
+
+def plan_stages(
+    stages: Iterable[Stage],
+    *,
+    from_stage: str | None = None,
+    only_stage: str | Iterable[str] | None = None,
+) -> tuple[list[Stage], set[str], set[str]]:
+    """Returns ``(stages to run, stages forced to execute, stages restored from checkpoints)``.
+
+    ``from_stage`` re-executes that stage and everything downstream of it; ``only_stage``
+    (one name or several) re-executes just those stages. Upstream stages they need are
+    restored from their latest checkpoints and unrelated stages are left out.
+    """
+    stages = list(stages)
+    if from_stage and only_stage:
+        raise ValueError("Use either from_stage or only_stage, not both")
+    if from_stage:
+        targets = {from_stage}
+    elif only_stage:
+        targets = {only_stage} if isinstance(only_stage, str) else set(only_stage)
+    else:
+        return stages, set(), set()
+    names = {stage.name for stage in stages}
+    unknown = sorted(targets - names)
+    if unknown:
+        raise ValueError(f"Unknown stage '{unknown[0]}'; stages: {sorted(names)}")
+
+    forced = set(targets)
+    if from_stage:
+        forced |= _reachable(stages, from_stage, downstream=True)
+    restored: set[str] = set()
+    for name in forced:
+        restored |= _reachable(stages, name, downstream=False)
+    restored -= forced
+    return [stage for stage in stages if stage.name in forced | restored], forced, restored
+
+
+def log_timings(timings: list[StageTiming]) -> None:
+    total = sum(timing.seconds for timing in timings)
+    LOGGER.info("Stage timings (%.3fs of stage time):", total)
+    for timing in timings:
+        LOGGER.info("  %-16s %-8s %8.3fs", timing.name, timing.status, timing.seconds)
+
+
+def _record_stage(stage: Stage, status: str, seconds: float, result: dict[str, Any], checkpointed: bool) -> None:
+    METRICS.set_gauge("prion_stage_seconds", seconds, stage=stage.name)
+    METRICS.set_state("prion_stage_status", "status", status, stage=stage.name)
+    rows = max((value.shape[0] for value in result.values() if len(getattr(value, "shape", ())) > 0), default=0)
+    if rows:
+        METRICS.inc("prion_rows_processed_total", rows, stage=stage.name)
+    if checkpointed and stage.cacheable and status != "restored":
+        record_cache("checkpoint", hits=int(status == "cached"), misses=int(status == "ok"))
+
+
+def _timed_call(func: Callable[[], dict[str, Any]]) -> tuple[dict[str, Any], float]:
+    started = time.perf_counter()
+    result = func() or {}
+    return result, time.perf_counter() - started
+
+
+def _stage_key(stage: Stage, code_version: str, digests: dict[str, str]) -> str:
+    material = {"stage": stage.name, "code": code_version, "inputs": {value: digests[value] for value in stage.inputs}}
+    if stage.key_extra is not None:
+        material["extra"] = stage.key_extra()
+    return _sha256(json.dumps(material, sort_keys=True).encode("utf-8"))
+
+
+def _value_digest(value: Any) -> str:
+    """Content digest of a stage value; objects may provide their own ``content_digest()``."""
+    content_digest = getattr(value, "content_digest", None)
+    if callable(content_digest):
+        return str(content_digest())
+    return _sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def run_stages(
+    stages: Iterable[Stage],
+    *,
+    initial: dict[str, Any] | None = None,
+    max_workers: int = 1,
+    checkpoints: CheckpointStore | None = None,
+    code_version: str = "",
+    from_stage: str | None = None,
+    only_stage: str | Iterable[str] | None = None,
+    resume: bool = False,
+) -> dict[str, Any]:
+    """Runs ``stages`` in dependency order, independent stages concurrently in threads.
+
+    At most ``max_workers`` stages run at once. When a stage fails no further stages are
+    started, running ones are allowed to finish, the timing summary is logged and a
+    ``StageError`` chained to the original exception is raised. Returns all values
+    (``initial`` plus every stage output).
+
+    With ``checkpoints`` each stage's outputs are persisted under a key derived from the
+    stage name, ``code_version`` and the digests of its inputs, and cacheable stages whose
+    key is already stored are loaded instead of executed. ``resume`` also restores
+    non-cacheable stages from their latest checkpoint, so a rerun after a failure picks
+    up at the failing stage. See ``plan_stages`` for ``from_stage``/``only_stage``.
+    Checkpoints beyond the ``keep`` most recent per stage are pruned after the run.
+    """
+    started_at = time.time()
+    values: dict[str, Any] = dict(initial or {})
+    digests: dict[str, str] = {name: _value_digest(value) for name, value in values.items()}
+    selected, forced, restored = plan_stages(
+        validate_stages(stages, values), from_stage=from_stage, only_stage=only_stage
+    )
+    if (forced or resume) and checkpoints is None:
+        raise ValueError("from_stage, only_stage and resume require a checkpoint directory")
+
+    pending = {stage.name: stage for stage in selected}
+    timings: dict[str, StageTiming] = {}
+    running: dict[Future, tuple[Stage, float, str, str]] = {}
+    failure: tuple[str, BaseException] | None = None
+
+    def schedule(stage: Stage) -> tuple[Callable[[], dict[str, Any]], str, str]:
+        resumable = resume and not stage.cacheable and not stage.side_effects and stage.name not in forced
+        if stage.name in restored or resumable:
+            pointer = checkpoints.latest(stage.name)
+            if pointer is None or not checkpoints.has(pointer["key"]):
+                raise ValueError(f"No checkpoint for stage '{stage.name}'; run the full pipeline first")
+            digests.update(pointer["digests"])
+            return (lambda: checkpoints.load(pointer["key"])), pointer["key"], "restored"
+        key = _stage_key(stage, code_version, digests)
+        if checkpoints is not None and stage.cacheable and stage.name not in forced and checkpoints.has(key):
+            return (lambda: checkpoints.load(key)), key, "cached"
+        kwargs = {value: values[value] for value in stage.inputs}
+        return (lambda: stage.func(**kwargs)), key, "ok"
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="prion-stage") as pool:
+        while pending or running:
+            if failure is None:
+                ready = [stage for stage in pending.values() if all(value in values for value in stage.inputs)]
+                for stage in ready[: max(0, max_workers - len(running))]:
+                    del pending[stage.name]
+                    call, key, status = schedule(stage)
+                    LOGGER.info("Stage '%s' %s", stage.name, "started" if status == "ok" else f"{status} from checkpoint")
+                    running[pool.submit(_timed_call, call)] = (stage, time.perf_counter(), key, status)
+            if not running:
+                if pending and failure is None:
+                    raise ValueError(f"Stage dependency cycle between: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, submitted, key, status = running.pop(future)
+                try:
+                    result, seconds = future.result()
+                except Exception as exc:  # noqa: BLE001 - re-raised below as StageError
+                    LOGGER.error("Stage '%s' failed: %s", stage.name, exc)
+                    timings[stage.name] = StageTiming(stage.name, "failed", time.perf_counter() - submitted)
+                    _record_stage(stage, "failed", timings[stage.name].seconds, {}, False)
+                    if failure is None:
+                        failure = (stage.name, exc)
+                    continue
+                missing = [value for value in stage.outputs if value not in result]
+                if missing:
+                    timings[stage.name] = StageTiming(stage.name, "failed", seconds)
+                    if failure is None:
+                        failure = (stage.name, ValueError(f"Stage '{stage.name}' did not produce outputs: {missing}"))
+                    continue
+                values.update(result)
+                timings[stage.name] = StageTiming(stage.name, status, seconds)
+                _record_stage(stage, status, seconds, result, checkpoints is not None)
+                if status == "restored":
+                    continue
+
+                if stage.cacheable:
+                    # Outputs are determined by the key (inputs + code); no need to hash them.
+                    stage_digests = {output: _sha256(f"{key}:{output}".encode("utf-8")) for output in result}
+                else:
+                    stage_digests = {output: _value_digest(value) for output, value in result.items()}
+                    key = _sha256(json.dumps(stage_digests, sort_keys=True).encode("utf-8"))
+                digests.update(stage_digests)
+                if checkpoints is not None:
+                    try:
+                        checkpoints.save(stage.name, key, result, stage_digests)
+                    except (OSError, pickle.PicklingError, TypeError, AttributeError) as exc:
+                        LOGGER.warning("Could not checkpoint stage '%s': %s", stage.name, exc)
+
+    if checkpoints is not None:
+        try:
+            checkpoints.prune(before=started_at)
+        except OSError as exc:
+            LOGGER.warning("Could not prune checkpoints: %s", exc)
+    ordered = [timings[name] for name in timings] + [StageTiming(name, "skipped") for name in pending]
+    log_timings(ordered)
+    if failure is not None:
+        raise StageError(failure[0], ordered) from failure[1]
+    return values
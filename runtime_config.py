@@ -2,6 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from importlib import import_module
+from typing import Any
+
+
+FRESHNESS_MODEL_KEYS = frozenset(
+    {"idle_half_life_days", "age_half_life_days", "idle_weight", "age_weight", "time_weight"}
+)
 
 
 @dataclass(slots=True)
@@ -20,6 +26,30 @@ class RuntimeSettings:
     slack_webhook_url: str
     discord_webhook_url: str
     notion_webhook_url: str
+    dedupe_workers: int | None = None
+    patch_store_dir: str | None = None
+    sensitive_path_rules: list[dict[str, Any]] | None = None
+    content_scan_workers: int | None = None
+    content_scan_cache_path: str | None = None
+    trust_rules_file: str | None = None
+    risk_rules_file: str | None = None
+    author_history_path: str | None = None
+    reputation_graph_path: str | None = None
+    priority_queue_path: str | None = None
+    freshness_model: dict[str, float] | None = None
+    pipeline_workers: int = 4
+    checkpoint_dir: str | None = None
+    daemon_interval_seconds: float = 900.0
+    daemon_host: str = "127.0.0.1"
+    daemon_port: int | None = 8787
+    run_manifest_path: str | None = None
+    prometheus_textfile_path: str | None = None
+    score_shards: int | None = None
+    shard_strategy: str = "hash"
+    shard_work_dir: str | None = None
+    chunk_size: int | None = None
+    github_page_workers: int = 4
+    pr_files_cache_path: str | None = None
 
 
 def _read_config_module() -> object:
@@ -49,12 +79,95 @@ def load_settings() -> RuntimeSettings:
     slack_webhook_url = str(getattr(config, "SLACK_WEBHOOK_URL", ""))
     discord_webhook_url = str(getattr(config, "DISCORD_WEBHOOK_URL", ""))
     notion_webhook_url = str(getattr(config, "NOTION_WEBHOOK_URL", ""))
+    dedupe_workers = getattr(config, "DEDUPE_WORKERS", None)
+    patch_store_dir = getattr(config, "PATCH_STORE_DIR", None)
+    sensitive_path_rules = getattr(config, "SENSITIVE_PATH_RULES", None)
+    content_scan_workers = getattr(config, "CONTENT_SCAN_WORKERS", None)
+    content_scan_cache_path = getattr(config, "CONTENT_SCAN_CACHE_PATH", None)
+    trust_rules_file = getattr(config, "TRUST_RULES_FILE", None)
+    risk_rules_file = getattr(config, "RISK_RULES_FILE", None)
+    author_history_path = getattr(config, "AUTHOR_HISTORY_PATH", None)
+    reputation_graph_path = getattr(config, "REPUTATION_GRAPH_PATH", None)
+    priority_queue_path = getattr(config, "PRIORITY_QUEUE_PATH", None)
+    freshness_model = getattr(config, "FRESHNESS_MODEL", None)
+    pipeline_workers = int(getattr(config, "PIPELINE_WORKERS", 4))
+    checkpoint_dir = getattr(config, "CHECKPOINT_DIR", None)
+    daemon_interval_seconds = float(getattr(config, "DAEMON_INTERVAL_SECONDS", 900))
+    daemon_host = str(getattr(config, "DAEMON_HOST", "127.0.0.1"))
+    daemon_port = getattr(config, "DAEMON_PORT", 8787)
+    run_manifest_path = getattr(config, "RUN_MANIFEST_PATH", None)
+    if run_manifest_path is None:
+        run_manifest_path = f"{report_dir}/run_manifest.json"
+    prometheus_textfile_path = getattr(config, "PROMETHEUS_TEXTFILE_PATH", None)
+    score_shards = getattr(config, "SCORE_SHARDS", None)
+    shard_strategy = str(getattr(config, "SHARD_STRATEGY", "hash"))
+    shard_work_dir = getattr(config, "SHARD_WORK_DIR", None)
+    chunk_size = getattr(config, "CHUNK_SIZE", None)
+    github_page_workers = int(getattr(config, "GITHUB_PAGE_WORKERS", 4))
+    pr_files_cache_path = getattr(config, "PR_FILES_CACHE_PATH", None)
 
     if max_prs is not None:
         max_prs = int(max_prs)
         if max_prs <= 0:
             raise ValueError("MAX_PRS must be positive if provided")
 
+    if dedupe_workers is not None:
+        dedupe_workers = int(dedupe_workers)
+        if dedupe_workers <= 0:
+            raise ValueError("DEDUPE_WORKERS must be positive if provided")
+
+    if content_scan_workers is not None:
+        content_scan_workers = int(content_scan_workers)
+        if content_scan_workers <= 0:
+            raise ValueError("CONTENT_SCAN_WORKERS must be positive if provided")
+
+    if pipeline_workers <= 0:
+        raise ValueError("PIPELINE_WORKERS must be positive")
+
+    if daemon_interval_seconds <= 0:
+        raise ValueError("DAEMON_INTERVAL_SECONDS must be positive")
+
+    if score_shards is not None:
+        score_shards = int(score_shards)
+        if score_shards <= 0:
+            raise ValueError("SCORE_SHARDS must be positive if provided")
+
+    if chunk_size is not None:
+        chunk_size = int(chunk_size)
+        if chunk_size <= 0:
+            raise ValueError("CHUNK_SIZE must be positive if provided")
+
+    if github_page_workers <= 0:
+        raise ValueError("GITHUB_PAGE_WORKERS must be positive")
+
+    if pr_files_cache_path and not patch_store_dir:
+        raise ValueError("PR_FILES_CACHE_PATH requires PATCH_STORE_DIR (cached file entries reference stored patches)")
+
+    if shard_strategy not in ("hash", "range"):
+        raise ValueError("SHARD_STRATEGY must be 'hash' or 'range'")
+
+    if daemon_port is not None:
+        daemon_port = int(daemon_port)
+        if not 0 <= daemon_port <= 65535:
+            raise ValueError("DAEMON_PORT must be between 0 and 65535 (or None to disable)")
+
+    if sensitive_path_rules is not None:
+        sensitive_path_rules = [dict(rule) for rule in sensitive_path_rules]
+        if any("name" not in rule or "pattern" not in rule for rule in sensitive_path_rules):
+            raise ValueError("SENSITIVE_PATH_RULES entries require 'name' and 'pattern'")
+
+    if freshness_model is not None:
+        freshness_model = {str(key): float(value) for key, value in dict(freshness_model).items()}
+        unknown = set(freshness_model) - FRESHNESS_MODEL_KEYS
+        if unknown:
+            raise ValueError(f"Unknown FRESHNESS_MODEL keys: {sorted(unknown)}")
+        if any(value < 0 for value in freshness_model.values()):
+            raise ValueError("FRESHNESS_MODEL values must be non-negative")
+        if freshness_model.get("idle_half_life_days") == 0 or freshness_model.get("age_half_life_days") == 0:
+            raise ValueError("FRESHNESS_MODEL half-lives must be positive")
+        if freshness_model.get("idle_weight", 0.7) + freshness_model.get("age_weight", 0.3) == 0:
+            raise ValueError("FRESHNESS_MODEL idle_weight + age_weight must be positive")
+
     if not token or not owner or not repo:
         raise ValueError(
             "Missing GitHub credentials. Set GITHUB_TOKEN, REPO_OWNER and REPO_NAME in config.py/config_template.py"
@@ -84,4 +197,28 @@ def load_settings() -> RuntimeSettings:
         slack_webhook_url=slack_webhook_url,
         discord_webhook_url=discord_webhook_url,
         notion_webhook_url=notion_webhook_url,
+        dedupe_workers=dedupe_workers,
+        patch_store_dir=str(patch_store_dir) if patch_store_dir else None,
+        sensitive_path_rules=sensitive_path_rules,
+        content_scan_workers=content_scan_workers,
+        content_scan_cache_path=str(content_scan_cache_path) if content_scan_cache_path else None,
+        trust_rules_file=str(trust_rules_file) if trust_rules_file else None,
+        risk_rules_file=str(risk_rules_file) if risk_rules_file else None,
+        author_history_path=str(author_history_path) if author_history_path else None,
+        reputation_graph_path=str(reputation_graph_path) if reputation_graph_path else None,
+        priority_queue_path=str(priority_queue_path) if priority_queue_path else None,
+        freshness_model=freshness_model,
+        pipeline_workers=pipeline_workers,
+        checkpoint_dir=str(checkpoint_dir) if checkpoint_dir else None,
+        daemon_interval_seconds=daemon_interval_seconds,
+        daemon_host=daemon_host,
+        daemon_port=daemon_port,
+        run_manifest_path=str(run_manifest_path) if run_manifest_path else None,
+        prometheus_textfile_path=str(prometheus_textfile_path) if prometheus_textfile_path else None,
+        score_shards=score_shards,
+        shard_strategy=shard_strategy,
+        shard_work_dir=str(shard_work_dir) if shard_work_dir else None,
+        chunk_size=chunk_size,
+        github_page_workers=github_page_workers,
+        pr_files_cache_path=str(pr_files_cache_path) if pr_files_cache_path else None,
     )
@@ -0,0 +1,312 @@
+"""Sharded scoring: agents run per PR partition in worker processes or on other machines.
+
+The PR frame is partitioned by ``pr_number`` (``hash`` or contiguous ``range`` shards).
+Each shard runs the row-local agents on its slice and asks a candidate index, shared by
+all shards, for the title pairs its rows start; the index covers every title, so pairs
+across shard boundaries are found too. A deterministic reduce step reassembles the
+columns in the original row order, merges the sorted pairs and runs the cross-row agents
+(``dedupe`` with the merged pairs, ``priority`` for global ranks) once, so the result
+equals a single ``run_agents`` call.
+
+Locally the shards run in a process pool. With a work directory on a shared filesystem
+the coordinator writes a plan there, and any machine can help with::
+
+    python main.py shard-worker --work-dir /shared/prion-shards
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+import memory.embeddings  # noqa: F401  registers the embeddings agent
+from agents.content_scanner import ScanCache
+from agents.dedupe_agent import TitleCandidateIndex, dedupe_titles
+from agents.engine import AGENT_REGISTRY, execution_order, process_pool_context, run_agents, with_option_inputs
+from frame_schema import apply_schema
+from memory.patch_store import DEFAULT_PATCH_STORE, PatchStore
+
+LOGGER = logging.getLogger(__name__)
+
+SHARD_STRATEGIES = ("hash", "range")
+# Agents whose outputs depend on other rows; they (and their dependants) run in the reduce step.
+CROSS_ROW_AGENTS = ("dedupe", "priority")
+DEFAULT_SHARD_TIMEOUT_SECONDS = 3600.0
+
+_GOLDEN_RATIO_64 = np.uint64(0x9E3779B97F4A7C15)
+
+
+def assign_shards(pr_numbers: Iterable[int], shards: int, *, strategy: str = "hash") -> np.ndarray:
+    """Shard id per PR: a stable multiplicative hash, or equal-sized ``pr_number`` ranges."""
+    if shards < 1:
+        raise ValueError("shards must be positive")
+    numbers = np.asarray(list(pr_numbers), dtype=np.int64)
+    if strategy == "hash":
+        mixed = (numbers.astype(np.uint64) * _GOLDEN_RATIO_64) >> np.uint64(32)
+        return (mixed % np.uint64(shards)).astype(np.int64)
+    if strategy == "range":
+        shard_ids = np.empty(len(numbers), dtype=np.int64)
+        shard_ids[np.argsort(numbers, kind="stable")] = np.arange(len(numbers)) * shards // max(1, len(numbers))
+        return shard_ids
+    raise ValueError(f"Unknown shard strategy {strategy!r}; expected one of {SHARD_STRATEGIES}")
+
+
+def local_agents(
+    agents: Iterable[str] | None = None,
+    *,
+    options: dict[str, dict[str, Any]] | None = None,
+) -> tuple[str, ...]:
+    """Agents that can run on a shard: everything not downstream of ``CROSS_ROW_AGENTS``.
+
+    ``options`` are the per-agent options of the run; a custom rule set may make an
+    agent read cross-row outputs (see ``with_option_inputs``).
+    """
+    specs = with_option_inputs((AGENT_REGISTRY[name] for name in (AGENT_REGISTRY if agents is None else agents)), options)
+    cross = set(CROSS_ROW_AGENTS)
+    for spec in execution_order(specs):
+        upstream = {column for name in cross if name in AGENT_REGISTRY for column in AGENT_REGISTRY[name].outputs}
+        if upstream.intersection(spec.inputs):
+            cross.add(spec.name)
+    return tuple(spec.name for spec in specs if spec.name not in cross)
+
+
+@dataclass(slots=True)
+class ShardJob:
+    """Everything a shard needs; pickled once per worker process or into the work dir."""
+
+    frame: pd.DataFrame
+    shard_ids: np.ndarray
+    shards: int
+    index: TitleCandidateIndex
+    options: dict[str, dict[str, Any]] = field(default_factory=dict)
+    patch_store: PatchStore | None = None
+    agents: tuple[str, ...] = ()
+    plan_id: str = ""
+
+
+def build_shard_job(
+    frame: pd.DataFrame,
+    *,
+    shards: int,
+    strategy: str = "hash",
+    options: dict[str, dict[str, Any]] | None = None,
+    patch_store: PatchStore | None = None,
+) -> ShardJob:
+    options = {name: dict(values) for name, values in (options or {}).items()}
+    cache = options.get("content_scan", {}).get("cache")
+    if cache is not None:
+        # Shards scan into a path-less copy; only ``reduce_shards`` writes the cache file.
+        options["content_scan"]["cache"] = ScanCache()
+        options["content_scan"]["cache"].results = dict(cache.results)
+    return ShardJob(
+        frame=frame,
+        shard_ids=assign_shards(frame["pr_number"].astype(int), shards, strategy=strategy),
+        shards=shards,
+        index=TitleCandidateIndex(dedupe_titles(frame)),
+        options=options,
+        # Workers do not inherit the parent's memory, so the patches travel with the job.
+        patch_store=patch_store if patch_store is not None else DEFAULT_PATCH_STORE,
+        agents=local_agents(options=options),
+        plan_id=uuid.uuid4().hex,
+    )
+
+
+def run_shard(job: ShardJob, shard: int) -> dict[str, Any]:
+    """Row-local agent columns and title pairs for the rows of ``shard``."""
+    rows = np.flatnonzero(job.shard_ids == shard)
+    if job.patch_store is not None:
+        DEFAULT_PATCH_STORE.update(job.patch_store)
+    cache = job.options.get("content_scan", {}).get("cache")
+    known = set(cache.results) if cache is not None else set()
+
+    LOGGER.info("Scoring shard %s/%s (%s PRs)", shard + 1, job.shards, len(rows))
+    part = run_agents(job.frame.iloc[rows].copy(), agents=job.agents, options=job.options)
+    columns = part[[column for column in part.columns if column not in job.frame.columns]]
+    columns.index = rows
+    return {
+        "shard": shard,
+        "rows": len(rows),
+        "columns": columns,
+        "pairs": job.index.pairs(rows.tolist()),
+        "scan_results": {key: value for key, value in cache.results.items() if key not in known} if cache is not None else {},
+    }
+
+
+def reduce_shards(job: ShardJob, results: Iterable[dict[str, Any]], *, scan_cache: ScanCache | None = None) -> pd.DataFrame:
+    """Merges shard outputs in shard order and runs the cross-row agents once.
+
+    New scan results are merged into ``scan_cache`` (the caller's content-scan cache),
+    which is then saved once.
+    """
+    results = sorted(results, key=lambda result: result["shard"])
+    frame = job.frame.copy()
+    parts = [result["columns"] for result in results if result["rows"]]
+    if parts:
+        columns = pd.concat(parts).sort_index()
+        for column in columns.columns:
+            frame[column] = columns[column].to_numpy()
+        # Categories inferred per shard differ, so the concatenated columns are recast.
+        apply_schema(frame, columns.columns)
+
+    if scan_cache is not None:
+        for result in results:
+            scan_cache.results.update(result["scan_results"])
+        scan_cache.save()
+
+    pairs = sorted(pair for result in results for pair in result["pairs"])
+    options = {name: dict(values) for name, values in job.options.items()}
+    options.setdefault("dedupe", {})["pairs"] = pairs
+    cross = [name for name in AGENT_REGISTRY if name not in job.agents]
+    LOGGER.info("Reducing %s shards: %s title pairs, agents %s", len(results), len(pairs), cross)
+    return run_agents(frame, agents=cross, options=options)
+
+
+_WORKER_JOB: ShardJob | None = None
+
+
+def _init_shard_worker(job: ShardJob) -> None:
+    global _WORKER_JOB
+    _WORKER_JOB = job
+
+
+def _run_shard_in_worker(shard: int) -> dict[str, Any]:
+    return run_shard(_WORKER_JOB, shard)
+
+
+def _write_atomic(path: Path, payload: object) -> None:
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_bytes(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp_path, path)
+
+
+def _plan_path(work_dir: Path, plan_id: str) -> Path:
+    return work_dir / "plans" / f"{plan_id}.pkl"
+
+
+def write_shard_plan(job: ShardJob, work_dir: str | Path) -> Path:
+    """Publishes ``job`` as ``plans/<plan_id>.pkl`` in ``work_dir``; results land in
+    ``results/<plan_id>-<shard>.pkl``. Several coordinators can share one ``work_dir``."""
+    work_dir = Path(work_dir)
+    for name in ("plans", "claims", "results"):
+        (work_dir / name).mkdir(parents=True, exist_ok=True)
+    path = _plan_path(work_dir, job.plan_id)
+    _write_atomic(path, job)
+    return path
+
+
+def work_shards(work_dir: str | Path, *, plan_id: str | None = None) -> list[tuple[str, int]]:
+    """Claims and runs shards of the pending plans (or only ``plan_id``) until none are
+    left; returns the ``(plan_id, shard)`` pairs run.
+
+    A claim is an exclusively created file, so coordinators and workers on any number of
+    machines sharing ``work_dir`` never run the same shard twice.
+    """
+    work_dir = Path(work_dir)
+    paths = [_plan_path(work_dir, plan_id)] if plan_id else sorted((work_dir / "plans").glob("*.pkl"))
+    done: list[tuple[str, int]] = []
+    for path in paths:
+        try:
+            job: ShardJob = pickle.loads(path.read_bytes())
+        except FileNotFoundError:  # collected in the meantime
+            continue
+        for shard in range(job.shards):
+            claim = work_dir / "claims" / f"{job.plan_id}-{shard}"
+            try:
+                os.close(os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue
+            if not path.exists():
+                # The coordinator gave up on the plan and removed its claims.
+                claim.unlink(missing_ok=True)
+                break
+            _write_atomic(work_dir / "results" / f"{job.plan_id}-{shard}.pkl", run_shard(job, shard))
+            done.append((job.plan_id, shard))
+    return done
+
+
+def remove_shard_plan(job: ShardJob, work_dir: str | Path) -> None:
+    """Deletes the plan of ``job``, its claims and any results left in ``work_dir``."""
+    work_dir = Path(work_dir)
+    _plan_path(work_dir, job.plan_id).unlink(missing_ok=True)
+    for shard in range(job.shards):
+        (work_dir / "claims" / f"{job.plan_id}-{shard}").unlink(missing_ok=True)
+        (work_dir / "results" / f"{job.plan_id}-{shard}.pkl").unlink(missing_ok=True)
+
+
+def collect_shard_results(
+    job: ShardJob,
+    work_dir: str | Path,
+    *,
+    timeout: float = DEFAULT_SHARD_TIMEOUT_SECONDS,
+    poll_seconds: float = 1.0,
+) -> list[dict[str, Any]]:
+    """Waits for every shard result of ``job`` in ``work_dir``, then removes the plan."""
+    paths = [Path(work_dir) / "results" / f"{job.plan_id}-{shard}.pkl" for shard in range(job.shards)]
+    deadline = time.monotonic() + timeout
+    try:
+        while not all(path.exists() for path in paths):
+            if time.monotonic() > deadline:
+                missing = [shard for shard, path in enumerate(paths) if not path.exists()]
+                raise TimeoutError(f"Shards {missing} of plan {job.plan_id} did not finish within {timeout}s")
+            time.sleep(poll_seconds)
+        return [pickle.loads(path.read_bytes()) for path in paths]
+    finally:
+        remove_shard_plan(job, work_dir)
+
+
+def score_sharded(
+    frame: pd.DataFrame,
+    *,
+    shards: int,
+    workers: int | None = None,
+    strategy: str = "hash",
+    options: dict[str, dict[str, Any]] | None = None,
+    patch_store: PatchStore | None = None,
+    work_dir: str | Path | None = None,
+    timeout: float = DEFAULT_SHARD_TIMEOUT_SECONDS,
+) -> pd.DataFrame:
+    """Scores ``frame`` in ``shards`` partitions; the result equals ``run_agents(frame)``.
+
+    Shards run in ``workers`` local processes. With ``work_dir`` (a shared filesystem)
+    they are claimed from a published plan, so ``shard-worker`` processes on other
+    machines take part; the local workers claim shards of this plan the same way.
+    """
+    if frame.empty:
+        return run_agents(frame, options=options)
+    options = {name: dict(values) for name, values in (options or {}).items()}
+    if workers is not None and workers > 1 and "content_scan" in options:
+        # The shards already use every worker; no nested scanner pools.
+        options["content_scan"]["workers"] = None
+    job = build_shard_job(frame, shards=shards, strategy=strategy, options=options, patch_store=patch_store)
+    LOGGER.info("Scoring %s PRs in %s shards (%s) with %s workers", len(frame), shards, strategy, workers or 1)
+
+    if work_dir is not None:
+        write_shard_plan(job, work_dir)
+        if workers is None or workers <= 1:
+            work_shards(work_dir, plan_id=job.plan_id)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as executor:
+                for future in [executor.submit(work_shards, work_dir, plan_id=job.plan_id) for _ in range(workers)]:
+                    future.result()
+        results = collect_shard_results(job, work_dir, timeout=timeout)
+    elif workers is None or workers <= 1:
+        results = [run_shard(job, shard) for shard in range(shards)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=process_pool_context(),
+            initializer=_init_shard_worker,
+            initargs=(job,),
+        ) as executor:
+            results = list(executor.map(_run_shard_in_worker, range(shards)))
+    return reduce_shards(job, results, scan_cache=options.get("content_scan", {}).get("cache"))
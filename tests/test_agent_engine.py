@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import memory.embeddings  # noqa: F401
+from agents import (
+    AGENT_REGISTRY,
+    AgentSpec,
+    calculate_priority,
+    calculate_risk,
+    calculate_trust,
+    register_agent,
+    run_agents,
+)
+from agents.engine import execution_levels, execution_order, with_option_inputs
+from agents.rules import TRUST_RULES, compile_rule_set
+
+
+def _pr_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "pr_number": [7, 3, 9],
+            "title": ["fix auth refresh", "fix auth refresh", "docs"],
+            "body": ["", "", "typo"],
+            "additions": [10, 5000, 3],
+            "deletions": [2, 100, 1],
+            "changed_files": [1, 80, 1],
+            "comments": [0, 3, 6],
+            "review_comments": [0, 1, 0],
+            "files": [[{"filename": "src/auth.py", "patch": "+x"}], [], [{"filename": "README.md"}]],
+        }
+    )
+
+
+def test_run_agents_matches_merge_chain() -> None:
+    frame = _pr_frame()
+    result = run_agents(frame)
+
+    assert result is frame
+    trust = calculate_trust(_pr_frame())
+    risk = calculate_risk(_pr_frame())
+    assert frame["trust_score"].tolist() == trust["trust_score"].tolist()
+    assert frame["risk_band"].tolist() == risk["risk_band"].tolist()
+    assert frame["duplicate_count"].tolist() == [1, 1, 0]
+
+    merged = _pr_frame().merge(trust, on="pr_number").merge(risk, on="pr_number")
+    merged["dedupe_score"] = frame["dedupe_score"].to_numpy()
+    expected = calculate_priority(merged).set_index("pr_number")
+    assert frame.set_index("pr_number")["priority_rank"].to_dict() == expected["priority_rank"].to_dict()
+
+
+def test_registered_agent_plugs_in_without_pipeline_changes() -> None:
+    spec = AgentSpec(
+        name="review_load",
+        inputs=("comments", "priority_score"),
+        outputs=("review_load",),
+        compute=lambda frame: {"review_load": frame["comments"].to_numpy() * frame["priority_score"].to_numpy()},
+    )
+    register_agent(spec)
+    try:
+        frame = run_agents(_pr_frame())
+    finally:
+        del AGENT_REGISTRY[spec.name]
+
+    assert np.allclose(frame["review_load"], frame["comments"] * frame["priority_score"])
+    order = [agent.name for agent in execution_order([spec, AGENT_REGISTRY["priority"], AGENT_REGISTRY["trust"]])]
+    assert order.index("trust") < order.index("priority") < order.index("review_load")
+
+
+def test_execution_order_rejects_cycles() -> None:
+    left = AgentSpec("left", inputs=("b",), outputs=("a",), compute=dict)
+    right = AgentSpec("right", inputs=("a",), outputs=("b",), compute=dict)
+
+    with pytest.raises(ValueError):
+        execution_order([left, right])
+
+
+def test_concurrent_levels_match_sequential_run() -> None:
+    sequential = run_agents(_pr_frame())
+    concurrent = run_agents(_pr_frame(), max_workers=4)
+    for column in ("trust_score", "risk_score", "dedupe_score", "priority_rank", "embedding_norm"):
+        assert concurrent[column].tolist() == sequential[column].tolist()
+
+
+def test_rule_inputs_order_agents_so_workers_do_not_change_results() -> None:
+    rules = compile_rule_set(
+        {**TRUST_RULES, "rules": [*TRUST_RULES["rules"], {"name": "risky", "when": "risk_score > 0", "score": -50}]}
+    )
+    options = {"trust": {"rules": rules}}
+    levels = [[spec.name for spec in level] for level in execution_levels(with_option_inputs(AGENT_REGISTRY.values(), options))]
+    assert next(index for index, level in enumerate(levels) if "risk" in level) < next(
+        index for index, level in enumerate(levels) if "trust" in level
+    )
+
+    sequential = run_agents(_pr_frame(), options=options, max_workers=1)
+    concurrent = run_agents(_pr_frame(), options=options, max_workers=4)
+    assert (sequential["trust_rule_risky"] < 0).any()
+    for column in ("trust_score", "trust_rule_risky", "priority_rank"):
+        assert concurrent[column].tolist() == sequential[column].tolist()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+
+from agents.trust_agent import trust_columns
+from memory.author_store import AuthorHistoryStore, author_columns
+
+
+def _summary(number: int, login: str, state: str, title: str, merged: bool = False) -> dict[str, object]:
+    return {
+        "number": number,
+        "user": {"login": login},
+        "state": state,
+        "merged_at": "2025-06-01T00:00:00Z" if merged else None,
+        "created_at": f"2025-0{min(number, 9)}-01T00:00:00Z",
+        "title": title,
+    }
+
+
+def _backfilled_store(path) -> AuthorHistoryStore:
+    summaries = [
+        _summary(1, "alice", "closed", "add cache", merged=True),
+        _summary(2, "alice", "closed", "tune cache", merged=True),
+        _summary(3, "bob", "closed", "rewrite parser", merged=True),
+        _summary(4, "carol", "closed", 'Revert "rewrite parser"', merged=True),
+        _summary(5, "bob", "closed", "drop tests"),
+        _summary(6, "bob", "open", "new feature"),
+    ]
+    store = AuthorHistoryStore(path)
+    store.backfill(SimpleNamespace(iter_pull_summaries=lambda state: iter(summaries)))
+    return store
+
+
+def test_backfill_and_incremental_updates(tmp_path) -> None:
+    store = _backfilled_store(tmp_path / "authors.json")
+    bob = store.get("bob")
+    assert (bob.merged, bob.closed, bob.open, bob.reverted) == (1, 1, 1, 1)
+    assert store.get("alice").first_contribution_at == "2025-01-01T00:00:00Z"
+
+    store.record_pull_request(
+        number=6, login="bob", state="closed", merged_at="2025-07-01T00:00:00Z", created_at="", title="new feature"
+    )
+    store.record_pull_request(
+        number=6, login="bob", state="closed", merged_at="2025-07-01T00:00:00Z", created_at="", title="new feature"
+    )
+    assert (store.get("bob").merged, store.get("bob").open) == (2, 0)
+
+    store.save()
+    reloaded = AuthorHistoryStore(tmp_path / "authors.json")
+    assert reloaded.get("bob") == store.get("bob")
+
+
+def test_author_columns_feed_trust_rules(tmp_path) -> None:
+    store = _backfilled_store(tmp_path / "authors.json")
+    pr_df = pd.DataFrame(
+        {"pr_number": [10, 11, 12], "author": ["bob", "dave", "carol"], "additions": 10, "comments": 1}
+    )
+    columns = author_columns(pr_df, store=store, now=datetime(2025, 8, 1, tzinfo=timezone.utc))
+    assert columns["author_history_known"].tolist() == [1, 0, 1]
+    assert columns["author_reverted_prs"].tolist() == [1, 0, 0]
+    assert columns["author_tenure_days"][0] == 153.0
+
+    trust = trust_columns(pr_df.assign(**{k: v for k, v in columns.items() if k != "pr_number"}))
+    assert trust["trust_reasons"].tolist() == ["small_change,reverted_history", "small_change", "small_change"]
+    assert trust_columns(pr_df)["trust_score"].tolist() == [62.0, 62.0, 62.0]
+
+
+def test_catch_up_reads_the_closed_listing_down_to_the_watermark(tmp_path) -> None:
+    store = AuthorHistoryStore(tmp_path / "authors.json")
+    backfill = [
+        {**_summary(1, "alice", "closed", "add cache", merged=True), "updated_at": "2025-06-01T00:00:00Z"},
+        {**_summary(6, "bob", "open", "new feature"), "updated_at": "2025-06-10T00:00:00Z"},
+        {**_summary(7, "bob", "open", "tune parser"), "updated_at": "2025-06-11T00:00:00Z"},
+    ]
+    store.backfill(SimpleNamespace(iter_pull_summaries=lambda state: iter(backfill)))
+    store.save()
+    assert (store.get("bob").open, store.get("bob").merged) == (2, 0)
+
+    # Newest update first; PR 1 predates the watermark, so the listing stops there.
+    closed = [
+        {**_summary(7, "bob", "closed", "tune parser"), "updated_at": "2025-07-02T00:00:00Z"},
+        {**_summary(6, "bob", "closed", "new feature", merged=True), "updated_at": "2025-07-01T00:00:00Z"},
+        {**_summary(1, "alice", "closed", "add cache", merged=True), "updated_at": "2025-06-01T00:00:00Z"},
+    ]
+    read: list[int] = []
+
+    def listing(state: str, sort: str, direction: str):  # noqa: ANN202
+        assert (state, sort, direction) == ("closed", "updated", "desc")
+        for pr in closed:
+            read.append(pr["number"])
+            yield pr
+
+    reloaded = AuthorHistoryStore(tmp_path / "authors.json")
+    assert reloaded.catch_up(SimpleNamespace(iter_pull_summaries=listing)) == 2
+    assert read == [7, 6, 1]
+    bob = reloaded.get("bob")
+    assert (bob.open, bob.merged, bob.closed) == (0, 1, 1)
+    assert reloaded.updated_through == "2025-07-02T00:00:00Z"
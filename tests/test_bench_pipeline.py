@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from benchmarks.bench_pipeline import compare_results, synthetic_pull_requests
+from ingestion.github_fetch import records_to_frame
+
+
+def test_synthetic_prs_are_deterministic_and_contain_duplicates() -> None:
+    records = synthetic_pull_requests(400, duplicate_rate=0.2)
+    assert records == synthetic_pull_requests(400, duplicate_rate=0.2)
+
+    frame = records_to_frame(records)
+    assert len(frame) == 400
+    diffs = frame["files"].map(lambda files: tuple(item["patch_sha"] for item in files))
+    assert 0.1 < diffs.duplicated().mean() < 0.3
+
+
+def test_compare_flags_throughput_and_memory_regressions() -> None:
+    def result(rows_per_second: float | None, peak_bytes: int) -> dict:
+        return {"seconds": 1.0, "rows_per_second": rows_per_second, "peak_bytes": peak_bytes}
+
+    skipped = {"skipped": "x"}
+    baseline = {"results": {"1000": {"trust": result(1000, 100), "risk": result(1000, 100), "labels": result(None, 100), "dedupe": skipped}}}
+    current = {"results": {"1000": {"trust": result(950, 105), "risk": result(700, 200), "labels": result(5000, 200), "dedupe": skipped}}}
+
+    rows = {row["stage"]: row for row in compare_results(baseline, current, threshold=0.1)}
+    assert set(rows) == {"trust", "risk", "labels"}
+    assert rows["trust"]["regression"] == []
+    assert rows["risk"]["regression"] == ["throughput", "memory"]
+    # A timing that rounded to zero has no rows_per_second: only memory is compared.
+    assert rows["labels"]["throughput_ratio"] is None
+    assert rows["labels"]["regression"] == ["memory"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import main_pipeline
+from benchmarks.bench_pipeline import synthetic_pull_requests
+from ingestion.github_fetch import records_to_frame
+from main import SNAPSHOT_COMMANDS
+from metrics import METRICS
+from pipeline_dag import CheckpointStore, run_stages
+from runtime_config import RuntimeSettings
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import time allowed for ``main`` plus everything ``status`` imports.
+IMPORT_BUDGET_MS = 100
+HEAVY_MODULES = ("pandas", "numpy", "requests", "main_pipeline", "agents", "outputs")
+
+
+def _python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_status_runs_without_heavy_imports() -> None:
+    result = _python(
+        "import json, sys, main\n"
+        "code = main.main(['status', '--json'])\n"
+        f"print(json.dumps({{'code': code, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+    )
+    assert result.returncode == 0, result.stderr
+    outcome = json.loads(result.stdout.strip().splitlines()[-1])
+    assert outcome["heavy"] == []
+    assert outcome["code"] in (0, 1)  # 1 when no credentials are configured
+
+
+def test_cli_import_time_budget() -> None:
+    result = _python("import main, runtime_config, pipeline_dag", "-X", "importtime")
+    assert result.returncode == 0, result.stderr
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; top-level imports only.
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() in {"main", "runtime_config", "pipeline_dag"}:
+            cumulative_us += int(parts[1])
+    assert 0 < cumulative_us / 1000 < IMPORT_BUDGET_MS
+
+
+def _settings(tmp_path: Path) -> RuntimeSettings:
+    return RuntimeSettings(
+        github_token="token",
+        repo_owner="owner",
+        repo_name="repo",
+        shadow_mode=True,
+        comment_mode=False,
+        max_prs=None,
+        report_dir=str(tmp_path / "reports"),
+        log_level="INFO",
+        write_labels_in_shadow_mode=False,
+        enable_webhook_delivery=False,
+        allow_webhook_delivery_in_shadow_mode=False,
+        slack_webhook_url="",
+        discord_webhook_url="",
+        notion_webhook_url="",
+        checkpoint_dir=str(tmp_path / "snapshots"),
+        priority_queue_path=str(tmp_path / "queue.json"),
+    )
+
+
+def test_snapshot_commands_restore_upstream_stages(tmp_path, monkeypatch) -> None:
+    settings = _settings(tmp_path)
+    frame = records_to_frame(synthetic_pull_requests(30))
+    run_stages(
+        main_pipeline.build_pipeline_stages(settings, fetch=lambda: frame.copy()),
+        checkpoints=CheckpointStore(settings.checkpoint_dir),
+        code_version=main_pipeline.pipeline_code_version(settings),
+        only_stage=SNAPSHOT_COMMANDS["ingest"],
+    )
+
+    def no_fetch(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        raise AssertionError("the fetch stage must be restored, not re-run")
+
+    monkeypatch.setattr(main_pipeline, "fetch_all_prs", no_fetch)
+    values = main_pipeline.run_pipeline(settings, only_stage=SNAPSHOT_COMMANDS["score"])
+    statuses = {item["labels"]["stage"]: item["labels"]["status"] for item in METRICS.snapshot()["gauges"]["prion_stage_status"]}
+    assert statuses == {"fetch": "restored", "author_history": "restored", "reputation": "restored", "score": "ok", "queue": "ok"}
+    assert sorted(values["df"]["pr_number"]) == sorted(frame["pr_number"])
+    assert values["queue_summary"] is not None
+    assert "report_paths" not in values
+
+    values = main_pipeline.run_pipeline(settings, only_stage=SNAPSHOT_COMMANDS["report"])
+    assert all(Path(path).exists() for path in values["report_paths"].values())
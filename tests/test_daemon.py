@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from dataclasses import asdict
+
+from agents import ScanCache
+from daemon import IncrementalPullRequests, PipelineDaemon
+from ingestion.github_fetch import PullRequestRecord, records_to_frame
+from main_pipeline import PipelineCaches, _fetch_stage
+from memory.embeddings import EmbeddingCache
+from memory.files_cache import PullRequestFilesCache
+from memory.patch_store import PatchStore
+from runtime_config import RuntimeSettings
+
+
+class FakeIngestor:
+    def __init__(self, summaries: list[dict]) -> None:
+        self.summaries = summaries
+        self.hydrated: list[int] = []
+        self.files_cache = PullRequestFilesCache()
+        self.patch_store = PatchStore()
+
+    def fetch_pull_summaries(self, **_: object) -> list[dict]:
+        return list(self.summaries)
+
+    def hydrate_pull_request(self, pr_number: int, **_: object) -> dict:
+        self.hydrated.append(pr_number)
+        summary = next(item for item in self.summaries if item["number"] == pr_number)
+        record = PullRequestRecord(
+            number=pr_number,
+            title=f"PR {pr_number}",
+            state="open",
+            draft=False,
+            user_login="dev",
+            created_at="2024-01-01T00:00:00Z",
+            updated_at=summary["updated_at"],
+            merged_at=None,
+            html_url="",
+            body="",
+            labels=[],
+            additions=1,
+            deletions=0,
+            changed_files=0,
+            commits=1,
+            comments=0,
+            review_comments=0,
+            files=[
+                {"filename": "a.py", "patch_sha": self.patch_store.put(f"+{pr_number}:{summary['updated_at']}")},
+                {"filename": "shared.py", "patch_sha": self.patch_store.put("+shared")},
+            ],
+        )
+        return asdict(record)
+
+
+def _settings(**overrides: object) -> RuntimeSettings:
+    values = dict(
+        github_token="token",
+        repo_owner="owner",
+        repo_name="repo",
+        shadow_mode=True,
+        comment_mode=False,
+        max_prs=None,
+        report_dir="reports",
+        log_level="INFO",
+        write_labels_in_shadow_mode=False,
+        enable_webhook_delivery=False,
+        allow_webhook_delivery_in_shadow_mode=False,
+        slack_webhook_url="",
+        discord_webhook_url="",
+        notion_webhook_url="",
+        daemon_port=0,
+    )
+    values.update(overrides)
+    return RuntimeSettings(**values)
+
+
+def test_refresh_hydrates_only_new_or_updated_prs() -> None:
+    ingestor = FakeIngestor([{"number": 1, "updated_at": "t1"}, {"number": 2, "updated_at": "t1"}])
+    caches = PipelineCaches(scan_cache=ScanCache(), embeddings=EmbeddingCache())
+    pull_requests = IncrementalPullRequests(ingestor, caches=caches)
+
+    assert pull_requests.refresh()["pr_number"].tolist() == [1, 2]
+    assert ingestor.hydrated == [1, 2]
+    caches.scan_cache.results = {key: {} for key in ingestor.patch_store._blobs}
+
+    ingestor.summaries = [{"number": 2, "updated_at": "t2"}, {"number": 3, "updated_at": "t1"}]
+    frame = pull_requests.refresh()
+    assert frame["pr_number"].tolist() == [2, 3]
+    assert ingestor.hydrated == [1, 2, 2, 3]
+    assert pull_requests.last_refresh == {"open": 2, "hydrated": 2, "removed": 1, "evicted_patches": 2}
+    assert len(pull_requests) == 2
+    # PR 1's patch and PR 2's previous patch are gone; the patch PR 2 still shares is kept.
+    assert len(ingestor.patch_store) == 3
+    assert "+shared" in {ingestor.patch_store.get(key) for key in ingestor.patch_store._blobs}
+    assert set(caches.scan_cache.results) < set(ingestor.patch_store._blobs) | {""}
+
+
+def test_triggers_during_a_cycle_coalesce_into_one_run() -> None:
+    daemon = PipelineDaemon(_settings(), interval_seconds=3600)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+    cycles: list[int] = []
+
+    def slow_cycle() -> dict:
+        cycles.append(len(cycles))
+        with daemon._lock:
+            daemon._status["running"] = True
+        started.release()
+        release.wait(5)
+        with daemon._lock:
+            daemon._status["running"] = False
+        return {}
+
+    daemon.run_cycle = slow_cycle
+    daemon.start(serve=False)
+    assert started.acquire(timeout=5)
+    for _ in range(3):
+        daemon.trigger()
+    release.set()
+    assert started.acquire(timeout=5)  # exactly one follow-up cycle
+    assert not started.acquire(timeout=0.3)
+    daemon.stop()
+
+    assert daemon.status()["coalesced_triggers"] == 3
+    assert len(cycles) == 2
+
+
+def test_status_endpoints_report_cycles_and_accept_triggers(monkeypatch) -> None:
+    daemon = PipelineDaemon(_settings(), interval_seconds=3600)
+    ran = threading.Event()
+    monkeypatch.setattr("daemon.run_stages", lambda *_, **__: ran.set() or {})
+    try:
+        daemon.start()
+        assert ran.wait(5)
+        base = "http://%s:%s" % daemon._server.server_address[:2]
+        with urllib.request.urlopen(f"{base}/healthz", timeout=5) as response:
+            assert json.load(response) == {"status": "ok"}
+        request = urllib.request.Request(f"{base}/trigger", method="POST")
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.status == 202
+        with urllib.request.urlopen(f"{base}/status", timeout=5) as response:
+            status = json.load(response)
+    finally:
+        daemon.stop()
+
+    assert status["cycles"] >= 1
+    assert status["failures"] == 0
+    assert status["last_cycle"]["status"] == "ok"
+
+
+def test_fetch_stage_drops_files_cache_entries_of_closed_prs(tmp_path, monkeypatch) -> None:
+    cache_path = tmp_path / "files.json"
+    cache = PullRequestFilesCache(cache_path)
+    for number in (1, 2, 3):
+        cache.put(number, "sha", [])
+    cache.save()
+    ingestor = FakeIngestor([{"number": 2, "updated_at": "t1"}, {"number": 3, "updated_at": "t1"}])
+    frame = records_to_frame([ingestor.hydrate_pull_request(number) for number in (2, 3)])
+    monkeypatch.setattr("main_pipeline.fetch_all_prs", lambda *args, **kwargs: frame)
+
+    _fetch_stage(_settings(pr_files_cache_path=str(cache_path), patch_store_dir=str(tmp_path / "patches"), max_prs=5))
+    assert PullRequestFilesCache(cache_path).pr_numbers() == {1, 2, 3}
+    _fetch_stage(_settings(pr_files_cache_path=str(cache_path), patch_store_dir=str(tmp_path / "patches")))
+    assert PullRequestFilesCache(cache_path).pr_numbers() == {2, 3}
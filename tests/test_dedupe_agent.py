@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+
+import pandas as pd
+
+from agents.dedupe_agent import (
+    TitleCandidateIndex,
+    TitlePairCache,
+    cluster_prs,
+    indexed_title_pairs,
+    run_dedupe_agent,
+    similar_title_pairs,
+)
+
+
+def _titles() -> list[str]:
+    return [
+        "fix auth token refresh",
+        "fix auth token refresh!",
+        "add webhook retries",
+        "update readme",
+        "fix auth token refresh",
+        "add webhook retries.",
+    ]
+
+
+def test_parallel_pairs_match_serial() -> None:
+    titles = _titles()
+    serial = similar_title_pairs(titles)
+    parallel = similar_title_pairs(titles, workers=2, block_size=2)
+
+    assert parallel == serial
+    assert [(i, j) for i, j, _ in serial] == [(0, 1), (0, 4), (1, 4), (2, 5)]
+
+
+def test_run_dedupe_agent_parallel_structure() -> None:
+    records = [{"number": 10 + idx, "title": title} for idx, title in enumerate(_titles())]
+    serial = run_dedupe_agent(records)
+    parallel = run_dedupe_agent(records, workers=2)
+
+    assert parallel == serial
+    assert serial[10]["potential_duplicates"] == [11, 14]
+    assert serial[13] == {"potential_duplicates": [], "dedupe_score": 0.0}
+
+
+def test_cluster_prs_parallel_matches_serial() -> None:
+    pr_df = pd.DataFrame({"pr_number": range(1, 7), "title": _titles()})
+
+    pd.testing.assert_frame_equal(cluster_prs(pr_df, workers=2), cluster_prs(pr_df))
+
+
+def test_candidate_index_finds_exactly_the_brute_force_pairs() -> None:
+    rng = random.Random(7)
+    words = ["fix", "add", "auth", "token", "refresh", "webhook", "retries", "docs", "a"]
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 5))) for _ in range(300)]
+    titles += [title + rng.choice(["", "!", "s"]) for title in titles[:80]] + ["", ""]
+    rng.shuffle(titles)
+    index = TitleCandidateIndex(titles)
+    expected = similar_title_pairs(titles)
+
+    assert index.pairs() == expected
+    assert indexed_title_pairs(titles, workers=2, block_size=64) == expected
+    rows = set(rng.sample(range(len(titles)), 60))
+    assert index.pairs(rows) == [pair for pair in expected if pair[0] in rows]
+
+
+def test_title_pair_cache_matches_a_fresh_computation_across_cycles() -> None:
+    rng = random.Random(11)
+    words = ["fix", "add", "auth", "token", "refresh", "webhook", "retries", "docs"]
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 5))) for _ in range(150)]
+    cache = TitlePairCache()
+    for _ in range(4):
+        assert cache.pairs(titles) == similar_title_pairs(titles)
+        # Next cycle: some PRs close, some are retitled, some open.
+        titles = [title for title in titles if rng.random() > 0.1]
+        titles = [title + "!" if rng.random() < 0.1 else title for title in titles]
+        titles += [" ".join(rng.choice(words) for _ in range(3)) for _ in range(10)]
+        rng.shuffle(titles)
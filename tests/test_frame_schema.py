@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+
+from agents import run_agents
+from benchmarks.bench_pipeline import synthetic_pull_requests
+from frame_schema import (
+    PR_FRAME_SCHEMA,
+    STRING_DTYPE,
+    apply_schema,
+    frame_bytes,
+    join_side_tables,
+    record_frame_memory,
+    split_side_tables,
+)
+from ingestion.github_fetch import record_to_row, records_to_frame
+from metrics import MetricsRegistry, run_manifest
+
+
+def test_frames_and_agent_outputs_follow_the_schema() -> None:
+    frame = run_agents(records_to_frame(synthetic_pull_requests(200, duplicate_rate=0.2)))
+    for column, dtype in PR_FRAME_SCHEMA.items():
+        if dtype is not None and column in frame.columns:
+            assert frame[column].dtype == dtype, column
+    assert frame["risk_rule_sensitive_file_touched"].dtype == "float32"
+    assert frame["risk_score"].dtype == "float64"
+    assert frame["priority_bucket"].cat.ordered
+
+
+def test_schema_skips_casts_that_would_lose_data() -> None:
+    frame = pd.DataFrame(
+        {
+            "pr_number": [1, 2],
+            "additions": [3.0, None],
+            "author": [["not", "text"], "dev"],
+            "comments": [1, 2**40],
+        }
+    )
+    apply_schema(frame)
+    assert frame["pr_number"].dtype == "int32"
+    assert frame["additions"].dtype == "float64"
+    assert frame["author"].dtype == object
+    assert frame["comments"].dtype == "int64"
+
+
+def test_side_tables_round_trip_and_shrink_the_frame() -> None:
+    records = json.loads(json.dumps(synthetic_pull_requests(300)))
+    frame = records_to_frame(records)
+    compact, tables = split_side_tables(frame)
+
+    assert set(tables) == {"files", "labels", "reviews"}
+    assert "files" not in compact.columns
+    assert tables["files"]["pr_number"].nunique() == (frame["files"].map(len) > 0).sum()
+    pd.testing.assert_frame_equal(join_side_tables(compact, tables)[frame.columns], frame)
+
+    # Free text only shrinks with pyarrow; the categorical and int32 columns always do.
+    typed = [column for column, dtype in PR_FRAME_SCHEMA.items() if column in compact.columns and dtype != STRING_DTYPE]
+    untyped = pd.DataFrame([record_to_row(record) for record in records])
+    assert frame_bytes(compact[typed]) * 2 < frame_bytes(untyped[typed])
+
+
+def test_frame_memory_lands_in_the_run_manifest(monkeypatch) -> None:
+    registry = MetricsRegistry()
+    monkeypatch.setattr("frame_schema.METRICS", registry)
+    compact, tables = split_side_tables(records_to_frame(synthetic_pull_requests(20)))
+
+    report = record_frame_memory("pr_df", compact, tables)
+    assert set(report) == {"pr_df", "pr_df.files", "pr_df.labels", "pr_df.reviews"}
+    assert run_manifest(registry)["frame_bytes"] == report
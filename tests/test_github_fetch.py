@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlsplit
+
+from ingestion.github_fetch import GitHubPullRequestIngestor, GitHubRepoConfig
+from memory.files_cache import PullRequestFilesCache
+from memory.patch_store import PatchStore
+
+PULLS = "https://api.github.com/repos/o/r/pulls"
+
+
+def _ingestor(pages: int, *, page_workers: int = 4, last_link: bool = True) -> tuple[GitHubPullRequestIngestor, list[int]]:
+    ingestor = GitHubPullRequestIngestor(GitHubRepoConfig(token="t", owner="o", repo="r", page_workers=page_workers))
+    requested: list[int] = []  # in completion order
+    lock = threading.Lock()
+
+    def request(method: str, url: str, params=None):  # noqa: ANN001, ANN202
+        query = dict(parse_qsl(urlsplit(url).query))
+        page = int(query.get("page", 1))
+        assert (params or query)["state"] == "all"
+        # Later pages answer first, so ordering cannot come from completion order.
+        time.sleep(0.002 * (pages - page))
+        with lock:
+            requested.append(page)
+        links = {}
+        if page < pages:
+            links["next"] = {"url": f"{PULLS}?state=all&per_page=100&page={page + 1}"}
+            if last_link:
+                links["last"] = {"url": f"{PULLS}?state=all&per_page=100&page={pages}"}
+        payload = [{"number": page * 100 + index} for index in range(3)]
+        return SimpleNamespace(json=lambda: payload, links=links)
+
+    ingestor._request = request  # type: ignore[method-assign]
+    return ingestor, requested
+
+
+def _expected(pages: int) -> list[int]:
+    return [page * 100 + index for page in range(1, pages + 1) for index in range(3)]
+
+
+def test_pages_are_fetched_concurrently_and_reassembled_in_order() -> None:
+    ingestor, requested = _ingestor(12)
+    numbers = [pr["number"] for pr in ingestor.iter_pull_summaries(state="all")]
+    assert numbers == _expected(12)
+    assert sorted(requested) == list(range(1, 13))
+    assert requested != sorted(requested)
+
+
+def test_listings_without_a_last_link_follow_next_links() -> None:
+    for ingestor, requested in (_ingestor(5, last_link=False), _ingestor(5, page_workers=1)):
+        assert [pr["number"] for pr in ingestor.fetch_pull_summaries(state="all")] == _expected(5)
+        assert requested == [1, 2, 3, 4, 5]
+
+
+def test_closing_the_listing_stops_requesting_pages() -> None:
+    ingestor, requested = _ingestor(40, page_workers=2)
+    summaries = ingestor.iter_pull_summaries(state="all")
+    assert [next(summaries)["number"] for _ in range(6)] == _expected(2)
+    summaries.close()
+    # Page 1, plus at most the 2 * page_workers pages already in flight.
+    assert len(requested) <= 6
+
+
+def _hydrating_ingestor(files_cache: PullRequestFilesCache, store: PatchStore) -> tuple[GitHubPullRequestIngestor, dict, list[str]]:
+    ingestor = GitHubPullRequestIngestor(GitHubRepoConfig(token="t", owner="o", repo="r"), patch_store=store, files_cache=files_cache)
+    detail = {"title": "a", "head": {"sha": "aaa"}, "updated_at": "t1"}
+    listed: list[str] = []
+
+    def paginate(url, params=None):  # noqa: ANN001, ANN202
+        listed.append(url)
+        return [{"filename": "app.py", "patch": f"@@ -1 +1 @@\n+{detail['head']['sha']}"}]
+
+    ingestor._request = lambda method, url, params=None: SimpleNamespace(json=lambda: dict(detail))  # type: ignore[method-assign]
+    ingestor._paginate = paginate  # type: ignore[method-assign]
+    return ingestor, detail, listed
+
+
+def test_files_are_refetched_only_when_the_head_moves() -> None:
+    ingestor, detail, listed = _hydrating_ingestor(PullRequestFilesCache(), PatchStore())
+    first = ingestor.hydrate_pull_request(7)
+    detail["updated_at"] = "t2"  # a comment or label: same head
+    assert ingestor.hydrate_pull_request(7)["files"] == first["files"]
+    assert len(listed) == 1
+
+    detail["head"] = {"sha": "bbb"}
+    assert ingestor.hydrate_pull_request(7)["files"] != first["files"]
+    assert len(listed) == 2
+
+
+def test_persisted_files_cache_reloads_patches_from_the_patch_dir(tmp_path) -> None:
+    cache_path, patch_dir = tmp_path / "files.json", tmp_path / "patches"
+    store = PatchStore()
+    ingestor, _, _ = _hydrating_ingestor(PullRequestFilesCache(cache_path, patch_dir=patch_dir), store)
+    files = ingestor.hydrate_pull_request(7)["files"]
+    ingestor.files_cache.save()
+
+    # Without the blobs on disk the entry cannot be used.
+    ingestor, _, listed = _hydrating_ingestor(PullRequestFilesCache(cache_path, patch_dir=patch_dir), PatchStore())
+    ingestor.hydrate_pull_request(7)
+    assert len(listed) == 1
+
+    store.save(patch_dir)
+    fresh = PatchStore()
+    ingestor, _, listed = _hydrating_ingestor(PullRequestFilesCache(cache_path, patch_dir=patch_dir), fresh)
+    assert ingestor.hydrate_pull_request(7)["files"] == files
+    assert listed == []
+    assert fresh.get(files[0]["patch_sha"]) == store.get(files[0]["patch_sha"])
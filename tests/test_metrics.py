@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+import requests
+from requests.hooks import dispatch_hook
+
+from metrics import MetricsRegistry, endpoint_label, instrument_session, run_manifest, write_run_manifest
+from pipeline_dag import CheckpointStore, Stage, run_stages
+
+
+def _response(url: str, status: int = 200, headers: dict[str, str] | None = None) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.elapsed = timedelta(milliseconds=120)
+    response.request = requests.Request("GET", url).prepare()
+    return response
+
+
+def test_endpoint_labels_are_low_cardinality_and_hide_webhook_paths() -> None:
+    assert endpoint_label("https://api.github.com/repos/acme/app/pulls/42/files?page=2") == "/repos/{owner}/{repo}/pulls/{number}/files"
+    assert endpoint_label("https://hooks.slack.com/services/T000/B000/secret") == "hooks.slack.com"
+
+
+def test_instrumented_session_records_requests_latency_and_rate_limit() -> None:
+    registry = MetricsRegistry()
+    session = instrument_session(requests.Session(), service="github", registry=registry)
+    for number in (1, 2):
+        response = _response(
+            f"https://api.github.com/repos/acme/app/pulls/{number}",
+            headers={"X-RateLimit-Remaining": str(4999 - number)},
+        )
+        dispatch_hook("response", session.hooks, response)
+
+    manifest = run_manifest(registry)
+    assert manifest["http"]["GET /repos/{owner}/{repo}/pulls/{number}"]["requests"] == 2
+    assert manifest["github_rate_limit_remaining"] == 4997
+    text = registry.to_prometheus()
+    assert 'prion_http_request_seconds_bucket{endpoint="/repos/{owner}/{repo}/pulls/{number}",le="0.25",service="github"} 2' in text
+    assert 'prion_http_requests_total{endpoint="/repos/{owner}/{repo}/pulls/{number}",method="GET",service="github",status="200"} 2' in text
+
+
+def test_stage_timings_rows_and_checkpoint_hit_ratio(tmp_path, monkeypatch) -> None:
+    registry = MetricsRegistry()
+    monkeypatch.setattr("pipeline_dag.METRICS", registry)
+    monkeypatch.setattr("metrics.METRICS", registry)
+    stages = [
+        Stage("source", lambda: {"rows": list(range(3))}, (), ("rows",), cacheable=False),
+        Stage("double", lambda rows: {"doubled": [2 * row for row in rows]}, ("rows",), ("doubled",)),
+    ]
+    checkpoints = CheckpointStore(tmp_path)
+    run_stages(stages, checkpoints=checkpoints)
+    run_stages(stages, checkpoints=checkpoints)
+
+    path = write_run_manifest(tmp_path / "run_manifest.json", registry, status="ok")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    assert manifest["stages"]["double"]["status"] == "cached"
+    assert [item["labels"] for item in manifest["metrics"]["gauges"]["prion_stage_seconds"]] == [{"stage": "source"}, {"stage": "double"}]
+    assert manifest["caches"]["checkpoint"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+    assert manifest["status"] == "ok"
+    assert manifest["peak_rss_bytes"] is None or manifest["peak_rss_bytes"] > 0
+
+
+def test_manifest_reports_the_latest_stage_status_without_mutating_series(tmp_path, monkeypatch) -> None:
+    registry = MetricsRegistry()  # never reset, as in the daemon
+    monkeypatch.setattr("pipeline_dag.METRICS", registry)
+    stages = [Stage("double", lambda: {"doubled": [2]}, (), ("doubled",))]
+    checkpoints = CheckpointStore(tmp_path)
+    run_stages(stages, checkpoints=checkpoints)
+    run_stages(stages, checkpoints=checkpoints)
+    run_stages(stages)
+    registry.inc("prion_rows_processed_total", 3, stage="double")
+
+    manifest = run_manifest(registry)
+    assert manifest["stages"]["double"]["status"] == "ok"
+    assert manifest["metrics"]["gauges"]["prion_stage_status"] == [{"labels": {"stage": "double", "status": "ok"}, "value": 1.0}]
+    assert manifest["rows_processed"] == {"stage:double": 3}
+    assert manifest["metrics"]["counters"]["prion_rows_processed_total"][0]["labels"] == {"stage": "double"}
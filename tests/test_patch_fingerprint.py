@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from agents.dedupe_agent import cluster_prs
+from agents.patch_fingerprint import file_fingerprint, find_patch_duplicates, normalise_patch
+
+PATCH = "@@ -10,3 +10,4 @@ def login():\n     user = load()\n-    check(user)\n+    check(user, strict=True)\n+    audit(user)\n"
+
+
+def _files(*patches: tuple[str, str]) -> list[dict[str, str]]:
+    return [{"filename": name, "patch": patch} for name, patch in patches]
+
+
+def test_normalisation_ignores_whitespace_context_and_offsets() -> None:
+    reformatted = "@@ -42,3 +57,4 @@\n  user = load()\n-check( user )\n+check(user,  strict=True)\n+\taudit(user)\n+\n"
+
+    assert normalise_patch(PATCH) == ["-check(user)", "+check(user,strict=True)", "+audit(user)"]
+    assert file_fingerprint("auth.py", PATCH) == file_fingerprint("auth.py", reformatted)
+    assert file_fingerprint("auth.py", PATCH) != file_fingerprint("other.py", PATCH)
+    assert file_fingerprint("auth.py", "@@ -1 +1 @@\n context\n") == ""
+
+
+def test_changed_lines_that_look_like_file_headers_are_kept() -> None:
+    assert normalise_patch("@@ -1,2 +1,2 @@\n--- comment\n+++i;\n") == ["---comment", "+++i;"]
+    assert normalise_patch("--- a/x.c\n+++ b/x.c\n@@ -1 +1 @@\n-a\n+b\n") == ["-a", "+b"]
+    assert file_fingerprint("x.c", "@@ -1 +1 @@\n+++i;\n") != file_fingerprint("x.c", "@@ -1 +1 @@\n+--i;\n")
+
+
+def test_exact_and_near_duplicate_groups() -> None:
+    files_per_pr = [
+        _files(("auth.py", PATCH), ("a.py", "+a"), ("b.py", "+b"), ("c.py", "+c"), ("d.py", "+d")),
+        _files(("auth.py", PATCH), ("a.py", "+a"), ("b.py", "+b"), ("c.py", "+c"), ("d.py", "+d")),
+        _files(("auth.py", PATCH), ("a.py", "+a"), ("b.py", "+b"), ("c.py", "+c"), ("d.py", "+d"), ("e.py", "+e")),
+        _files(("auth.py", PATCH)),
+        [],
+    ]
+    result = find_patch_duplicates(files_per_pr)
+
+    assert result["patch_fingerprint"][0] == result["patch_fingerprint"][1]
+    assert result["patch_duplicate_count"] == [1, 1, 0, 0, 0]
+    assert result["patch_near_duplicate_count"] == [1, 1, 2, 0, 0]
+    assert result["patch_fingerprint"][4] == ""
+
+
+def test_cluster_prs_reports_patch_duplicates() -> None:
+    pr_df = pd.DataFrame(
+        {
+            "pr_number": [1, 2, 3],
+            "title": ["fix login audit", "harden sessions", "update docs"],
+            "files": [_files(("auth.py", PATCH)), _files(("auth.py", PATCH)), _files(("README.md", "+docs"))],
+        }
+    )
+    report = cluster_prs(pr_df)
+
+    assert report["duplicate_count"].tolist() == [0, 0, 0]
+    assert report["patch_duplicate_count"].tolist() == [1, 1, 0]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import fields
+from unittest.mock import MagicMock, patch
+
+from ingestion.github_fetch import (
+    GitHubPullRequestIngestor,
+    GitHubRepoConfig,
+    PullRequestFile,
+    PullRequestRecord,
+    records_to_frame,
+)
+from memory.patch_store import PatchStore, build_combined_diff
+
+SHARED_PATCH = "@@ -1 +1 @@\n-old\n+new\n"
+
+
+def test_patch_store_deduplicates_in_memory_and_on_disk(tmp_path) -> None:
+    store = PatchStore()
+    first = store.put(SHARED_PATCH)
+    second = store.put(SHARED_PATCH)
+    other = store.put("+other\n")
+
+    assert first == second != other
+    assert store.put("") == ""
+    stats = store.stats()
+    assert stats["blobs"] == 2
+    assert stats["references"] == 3
+    assert stats["saved_bytes"] == len(SHARED_PATCH)
+
+    report = store.save(tmp_path)
+    assert report["blobs_written"] == 2
+    assert store.save(tmp_path)["blobs_written"] == 0
+    assert PatchStore.load(tmp_path).get(first) == SHARED_PATCH
+
+
+def test_ingestor_records_reference_patches_by_hash() -> None:
+    store = PatchStore()
+    ingestor = GitHubPullRequestIngestor(GitHubRepoConfig(token="t", owner="o", repo="r"), patch_store=store)
+
+    def fake_paginate(url, params=None):
+        return [{"filename": "app.py", "patch": SHARED_PATCH}, {"filename": "big.bin"}]
+
+    detail = MagicMock()
+    detail.json.side_effect = [{"title": "a"}, {"title": "b"}]
+    with patch.object(ingestor, "_paginate", side_effect=fake_paginate), patch.object(
+        ingestor, "_iter_pages", return_value=iter([[{"number": 1}, {"number": 2}]])
+    ), patch.object(ingestor, "_request", return_value=detail):
+        records = ingestor.fetch_pull_requests()
+
+    assert "combined_diff" not in records[0]
+    assert list(records[0]) == [item.name for item in fields(PullRequestRecord)]
+    assert list(records[0]["files"][0]) == [item.name for item in fields(PullRequestFile)]
+    frame = records_to_frame(iter(records))
+    assert frame["pr_number"].tolist() == [1, 2]
+    assert frame["files"][0] is records[0]["files"]
+    assert records[0]["files"][0]["patch_sha"] == records[1]["files"][0]["patch_sha"]
+    assert records[0]["files"][1]["patch_sha"] == ""
+    assert store.stats()["blobs"] == 1
+    assert build_combined_diff(records[0]["files"], store) == SHARED_PATCH
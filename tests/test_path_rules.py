@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+
+import pandas as pd
+
+from agents.deception_agent import calculate_risk, risk_columns
+from agents.path_rules import CompiledPathRules, PathRule, compile_path_rules
+
+
+def test_glob_rules_follow_codeowners_semantics() -> None:
+    rules = compile_path_rules(
+        [
+            {"name": "ci", "pattern": "/.github/workflows/"},
+            {"name": "auth_dirs", "pattern": "**/auth/**"},
+            {"name": "root_setup", "pattern": "/setup.py"},
+            {"name": "any_lock", "pattern": "*.lock"},
+            {"name": "docs_md", "pattern": "docs/*.md"},
+            {"name": "keys", "pattern": "key", "kind": "substring"},
+        ]
+    )
+
+    assert rules.match(".github/workflows/ci.yml") == {"ci"}
+    assert rules.match("vendor/.github/workflows/ci.yml") == frozenset()
+    assert rules.match("src/auth/login.py") == {"auth_dirs"}
+    assert rules.match("setup.py") == {"root_setup"}
+    assert rules.match("pkg/setup.py") == frozenset()
+    assert rules.match("deep/poetry.lock") == {"any_lock"}
+    assert rules.match("docs/index.md") == {"docs_md"}
+    assert rules.match("docs/api/index.md") == frozenset()
+    assert rules.match("src/Monkey.py") == {"keys"}
+
+
+def test_wildcards_in_the_last_segment_do_not_match_descendants() -> None:
+    rules = compile_path_rules(
+        [
+            {"name": "docs_top", "pattern": "docs/*"},
+            {"name": "js", "pattern": "*.js"},
+            {"name": "vendor", "pattern": "vendor"},
+        ]
+    )
+
+    assert rules.match("docs/b.md") == {"docs_top"}
+    assert rules.match("docs/sub/b.md") == frozenset()
+    assert rules.match("src/x.js") == {"js"}
+    assert rules.match("src/x.js/inner") == frozenset()
+    # A plain name still covers a directory of that name and everything below it.
+    assert rules.match("lib/vendor/pkg/a.py") == {"vendor"}
+
+
+def test_automaton_matches_bruteforce_substrings() -> None:
+    rng = random.Random(31)
+    alphabet = "ab/"
+    hints = sorted({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)})
+    rules = CompiledPathRules(PathRule(name=hint, pattern=hint, kind="substring") for hint in hints)
+
+    for _ in range(300):
+        path = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+        assert rules.match(path) == {hint for hint in hints if hint in path}
+
+
+def test_risk_uses_rule_weights_and_reports_matches() -> None:
+    pr_df = pd.DataFrame(
+        {
+            "pr_number": [1, 2, 3],
+            "files": [[{"filename": ".github/workflows/release.yml"}], [{"filename": "src/TOKEN.py"}], []],
+        }
+    )
+    rules = compile_path_rules(
+        [
+            {"name": "ci", "pattern": "/.github/workflows/", "weight": 45},
+            {"name": "token", "pattern": "token", "kind": "substring"},
+        ]
+    )
+    columns = risk_columns(pr_df, path_rules=rules)
+
+    assert columns["risk_score"].tolist() == [45.0, 20.0, 0.0]
+    assert columns["risk_path_rules"].tolist() == ["ci", "token", ""]
+    assert calculate_risk(pr_df)["risk_score"].tolist() == [20.0, 20.0, 0.0]
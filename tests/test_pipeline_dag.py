@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from pipeline_dag import CheckpointStore, Stage, StageError, run_stages
+
+
+def test_independent_stages_run_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(name: str):
+        def run(source: int) -> dict[str, int]:
+            barrier.wait()  # deadlocks (and times out) unless both branches run at once
+            return {name: source + 1}
+
+        return run
+
+    stages = [
+        Stage("source", lambda: {"source": 1}, (), ("source",)),
+        Stage("left", branch("left"), ("source",), ("left",)),
+        Stage("right", branch("right"), ("source",), ("right",)),
+        Stage("join", lambda left, right: {"total": left + right}, ("left", "right"), ("total",)),
+    ]
+    assert run_stages(stages, max_workers=2)["total"] == 4
+
+
+def test_failure_propagates_and_skips_downstream() -> None:
+    ran: list[str] = []
+
+    def broken(source: int) -> dict[str, int]:
+        raise RuntimeError("labeling API down")
+
+    stages = [
+        Stage("source", lambda: {"source": 1}, (), ("source",)),
+        Stage("label", broken, ("source",), ("labels",)),
+        Stage("deliver", lambda labels: ran.append("deliver") or {}, ("labels",), ()),
+    ]
+    with pytest.raises(StageError) as error:
+        run_stages(stages, max_workers=2)
+
+    assert error.value.stage == "label"
+    assert isinstance(error.value.__cause__, RuntimeError)
+    assert {timing.name: timing.status for timing in error.value.timings} == {
+        "source": "ok",
+        "label": "failed",
+        "deliver": "skipped",
+    }
+    assert not ran
+
+
+def test_missing_producer_is_rejected() -> None:
+    with pytest.raises(ValueError, match="no producer"):
+        run_stages([Stage("report", lambda df: {}, ("df",), ())])
+
+
+def _counting_stages(calls: list[str], source: int = 1, fail_label: bool = False) -> list[Stage]:
+    def stage(name: str, func):
+        def run(**inputs):
+            calls.append(name)
+            return func(**inputs)
+
+        return run
+
+    def label(scores: int) -> dict[str, int]:
+        if fail_label:
+            raise RuntimeError("labeling API down")
+        return {"labels": scores}
+
+    return [
+        Stage("fetch", stage("fetch", lambda: {"pr_df": source}), (), ("pr_df",), cacheable=False),
+        Stage("score", stage("score", lambda pr_df: {"scores": pr_df * 10}), ("pr_df",), ("scores",)),
+        Stage("label", stage("label", label), ("scores",), ("labels",), cacheable=False, side_effects=True),
+        Stage("report", stage("report", lambda scores: {"report": f"r{scores}"}), ("scores",), ("report",)),
+    ]
+
+
+def test_checkpoints_skip_unchanged_stages_and_resume(tmp_path) -> None:
+    store = CheckpointStore(tmp_path)
+    calls: list[str] = []
+    with pytest.raises(StageError):
+        run_stages(_counting_stages(calls, fail_label=True), checkpoints=store, code_version="v1", max_workers=2)
+    assert sorted(calls) == ["fetch", "label", "report", "score"]
+
+    calls.clear()
+    values = run_stages(_counting_stages(calls, source=2), checkpoints=store, code_version="v1", resume=True)
+    assert calls == ["label"]
+    assert values["labels"] == 10
+
+    calls.clear()
+    run_stages(_counting_stages(calls), checkpoints=store, code_version="v1")
+    assert sorted(calls) == ["fetch", "label"]
+
+    calls.clear()
+    run_stages(_counting_stages(calls), checkpoints=store, code_version="v2")
+    assert sorted(calls) == ["fetch", "label", "report", "score"]
+
+
+def test_side_effect_stages_rerun_and_key_extra_invalidates(tmp_path) -> None:
+    store = CheckpointStore(tmp_path)
+    calls: list[str] = []
+    for _ in range(2):
+        with pytest.raises(StageError):
+            run_stages(_counting_stages(calls, fail_label=True), checkpoints=store, code_version="v1", resume=bool(calls))
+    assert calls.count("label") == 2
+
+    day = ["2026-10-19"]
+    scored: list[str] = []
+
+    def stages() -> list[Stage]:
+        return [
+            Stage("fetch", lambda: {"pr_df": 1}, (), ("pr_df",), cacheable=False),
+            Stage(
+                "score",
+                lambda pr_df: scored.append(day[0]) or {"scores": pr_df},
+                ("pr_df",),
+                ("scores",),
+                key_extra=lambda: day[0],
+            ),
+        ]
+
+    run_stages(stages(), checkpoints=store)
+    run_stages(stages(), checkpoints=store)
+    day[0] = "2026-10-20"
+    run_stages(stages(), checkpoints=store)
+    assert scored == ["2026-10-19", "2026-10-20"]
+
+
+def test_from_and_only_stage_use_latest_upstream_results(tmp_path) -> None:
+    store = CheckpointStore(tmp_path)
+    run_stages(_counting_stages([]), checkpoints=store, code_version="v1")
+
+    calls: list[str] = []
+    values = run_stages(_counting_stages(calls, source=5), checkpoints=store, code_version="v1", from_stage="score")
+    assert sorted(calls) == ["label", "report", "score"]
+    assert values["report"] == "r10"
+
+    calls.clear()
+    run_stages(_counting_stages(calls), checkpoints=store, code_version="v1", only_stage="report")
+    assert calls == ["report"]
+
+    with pytest.raises(ValueError, match="checkpoint"):
+        run_stages(_counting_stages([]), only_stage="report")
+
+
+def test_checkpoints_beyond_keep_are_pruned(tmp_path) -> None:
+    source = {"value": 0}
+    stages = [
+        Stage("fetch", lambda: {"rows": source["value"]}, (), ("rows",), cacheable=False),
+        Stage("score", lambda rows: {"scores": rows * 2}, ("rows",), ("scores",)),
+    ]
+    checkpoints = CheckpointStore(tmp_path, keep=2)
+    for value in range(5):
+        source["value"] = value
+        assert run_stages(stages, checkpoints=checkpoints)["scores"] == value * 2
+
+    objects = sorted((tmp_path / "objects").glob("*/*.pkl"))
+    assert len(objects) == 4  # the last two of each stage
+    assert {path.stem for path in objects} == {key for stage in ("fetch", "score") for key in checkpoints.latest(stage)["recent"]}
+    # The previous fetch result is still a cache hit for score.
+    source["value"] = 3
+    calls: list[int] = []
+    stages[1] = Stage("score", lambda rows: calls.append(rows) or {"scores": rows * 2}, ("rows",), ("scores",))
+    assert run_stages(stages, checkpoints=checkpoints)["scores"] == 6
+    assert calls == []
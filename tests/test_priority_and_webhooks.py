@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timezone
 
 import pandas as pd
 
-from agents.prioritization_agent import calculate_priority
+from agents.prioritization_agent import FreshnessModel, calculate_priority
 from outputs.webhook_exporter import (
     build_discord_payload,
     build_notion_payload,
@@ -82,4 +83,33 @@ def test_export_webhook_payloads(tmp_path) -> None:
     for target in paths.values():
         assert target.exists()
         content = json.loads(target.read_text(encoding="utf-8"))
-        assert isinstance(content, dict)
\ No newline at end of file
+        assert isinstance(content, dict)
+
+def test_freshness_decays_with_idle_time() -> None:
+    df = pd.concat([_sample_df().iloc[[0]]] * 3, ignore_index=True)
+    df["pr_number"] = [1, 2, 3]
+    df["created_at"] = ["2026-09-01T00:00:00Z", "2024-09-01T00:00:00Z", None]
+    df["updated_at"] = ["2026-10-18T00:00:00Z", "2024-10-01T00:00:00Z", None]
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+    priority_df = calculate_priority(df, now=now, include_signals=True).set_index("pr_number")
+    freshness = priority_df["priority_signal_freshness"]
+    assert freshness[1] > freshness[3] > freshness[2]
+    activity_only = calculate_priority(df.drop(columns=["created_at", "updated_at"]), include_signals=True)
+    assert freshness[3] == activity_only.set_index("pr_number")["priority_signal_freshness"][3]
+
+    slower = calculate_priority(df, now=now, freshness=FreshnessModel(idle_half_life_days=365.0), include_signals=True)
+    assert slower.set_index("pr_number")["priority_signal_freshness"][2] > freshness[2]
+
+
+def test_recent_update_without_comments_is_not_active_discussion() -> None:
+    df = pd.concat([_sample_df().iloc[[0]]] * 2, ignore_index=True)
+    df["pr_number"] = [1, 2]
+    df["comments"], df["review_comments"] = [0, 6], [0, 0]
+    df["created_at"] = df["updated_at"] = "2026-10-19T00:00:00Z"
+
+    priority_df = calculate_priority(df, now=datetime(2026, 10, 19, tzinfo=timezone.utc), include_signals=True)
+    priority_df = priority_df.set_index("pr_number")
+    assert priority_df["priority_signal_freshness"][1] >= 60
+    assert "active_discussion" not in priority_df["priority_reasons"][1]
+    assert "active_discussion" in priority_df["priority_reasons"][2]
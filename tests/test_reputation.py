@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from agents.trust_agent import trust_columns
+from memory.reputation import ReputationGraph, reputation_columns
+
+
+def _graph(path=None) -> ReputationGraph:
+    graph = ReputationGraph(path)
+    graph.update_from_reviews(1, "maintainer", [])
+    graph.update_from_reviews(2, "alice", [{"reviewer": "maintainer", "state": "APPROVED"}])
+    graph.update_from_reviews(3, "alice", [{"reviewer": "maintainer", "state": "APPROVED"}])
+    graph.update_from_reviews(
+        4,
+        "bob",
+        [
+            {"reviewer": "maintainer", "state": "APPROVED"},
+            {"reviewer": "maintainer", "state": "CHANGES_REQUESTED"},
+            {"reviewer": "bob", "state": "APPROVED"},
+        ],
+    )
+    return graph
+
+
+def test_reputation_flows_from_reviewers_to_authors() -> None:
+    scores = _graph().scores()
+    assert scores["alice"] > scores["bob"]
+    assert abs(sum(scores.values()) / len(scores) - 1.0) < 1e-9
+
+
+def test_warm_start_matches_cold_start(tmp_path) -> None:
+    graph = _graph(tmp_path / "reputation.json")
+    graph.save()
+
+    warm = ReputationGraph(tmp_path / "reputation.json")
+    warm.update_from_reviews(5, "bob", [{"reviewer": "alice", "state": "COMMENTED"}])
+    cold = _graph()
+    cold.update_from_reviews(5, "bob", [{"reviewer": "alice", "state": "COMMENTED"}])
+
+    warm_scores, cold_scores = warm.scores(), cold.scores()
+    assert warm.iterations < cold.iterations
+    assert all(abs(warm_scores[login] - cold_scores[login]) < 1e-6 for login in cold_scores)
+
+
+def test_author_reputation_feeds_trust() -> None:
+    frame = pd.DataFrame(
+        {
+            "pr_number": [10, 11, 12],
+            "author": ["alice", "bob", "stranger"],
+            "additions": [50, 50, 50],
+            "deletions": [5, 5, 5],
+            "comments": [1, 1, 1],
+            "review_comments": [0, 0, 0],
+        }
+    )
+    assert not reputation_columns(frame)["author_reputation"].any()
+
+    frame["author_reputation"] = reputation_columns(frame, graph=_graph())["author_reputation"]
+    assert frame["author_reputation"].iloc[2] == 0.0
+    trust = trust_columns(frame)
+    assert "reputable_author" in trust["trust_reasons"][0]
+    assert trust["trust_score"][0] == trust["trust_score"][1] + 8
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import numpy as np
+
+from agents.prioritization_agent import PriorityWeights, calculate_priority
+from agents.reweight import compare_weightings, reweight
+from benchmarks.bench_scoring import synthetic_frame
+
+
+def _components():
+    frame = synthetic_frame(500).assign(
+        trust_score=lambda df: (df["comments"] * 11 + df["changed_files"]) % 101,
+        risk_score=lambda df: df["additions"] % 97,
+        dedupe_score=lambda df: df["deletions"] % 89,
+    )
+    return frame, calculate_priority(frame, include_signals=True).sort_index()
+
+
+def test_reweight_matches_full_recompute() -> None:
+    frame, components = _components()
+    weights = PriorityWeights(trust_weight=0.7, risk_weight=0.1, dedupe_weight=0.05, freshness_weight=0.15)
+    expected = calculate_priority(frame, weights=weights).sort_index()
+    result = reweight(components, weights)
+    for column in ("pr_number", "priority_score", "priority_bucket", "priority_rank"):
+        assert result[column].tolist() == expected[column].tolist()
+
+
+def test_compare_weightings_reports_rank_correlation() -> None:
+    _, components = _components()
+    default = PriorityWeights()
+    result = compare_weightings(components, [default, default, PriorityWeights(0.0, 1.0, 0.0, 0.0)])
+    assert result["ranks"].shape == (3, len(components))
+    assert result["ranks"][0].tolist() == components["priority_rank"].tolist()
+    assert np.allclose(np.diag(result["spearman"]), 1.0)
+    assert result["spearman"][0, 1] == 1.0
+    assert result["spearman"][0, 2] < 1.0
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.deception_agent import run_deception_agent, risk_columns
+from agents.rules import RISK_RULES, TRUST_RULES, compile_expression, compile_rule_set, load_rule_file
+from agents.trust_agent import calculate_trust, run_trust_agent
+
+
+def _records() -> list[dict[str, object]]:
+    return [
+        {"number": 1, "additions": 5000, "deletions": 10, "changed_files": 90, "comments": 6, "files": []},
+        {
+            "number": 2,
+            "additions": 20,
+            "deletions": 5,
+            "changed_files": 2,
+            "comments": 0,
+            "draft": True,
+            "labels": ["hotfix"],
+            "files": [{"filename": ".github/workflows/ci.yml"}],
+        },
+    ]
+
+
+def test_expressions_compile_to_vectorised_columns() -> None:
+    expression = compile_expression("additions > deletions * ratio and not draft")
+    env = {
+        "additions": np.array([50.0, 50.0, 5.0]),
+        "deletions": np.array([10.0, 10.0, 1.0]),
+        "ratio": 4,
+        "draft": np.array([0, 1, 0]),
+    }
+
+    assert expression.names == {"additions", "deletions", "ratio", "draft"}
+    assert expression.evaluate(env).tolist() == [True, False, True]
+    with pytest.raises(ValueError):
+        compile_expression("__import__('os')")
+
+
+def test_record_and_frame_variants_share_rules() -> None:
+    records = _records()
+    frame = pd.DataFrame(records).rename(columns={"number": "pr_number"})
+    trust = calculate_trust(frame).set_index("pr_number")["trust_score"]
+    risk = risk_columns(frame)
+
+    assert run_trust_agent(records)[2] == {
+        "trust_score": round(trust[2] / 100, 3),
+        "trust_reasons": ["small_change", "no_engagement", "draft_pr", "hotfix_requires_attention"],
+    }
+    assert run_deception_agent(records)[1] == {
+        "risk_flags": ["addition_heavy", "high_file_spread", "very_large_change"],
+        "risk_score": round(risk["risk_score"][0] / 100, 3),
+    }
+    assert risk["risk_rule_very_large_change"].tolist() == [35.0, 0.0]
+
+
+def test_retuning_reevaluates_cached_features(tmp_path) -> None:
+    frame = pd.DataFrame(_records()).rename(columns={"number": "pr_number"})
+    rule_file = tmp_path / "risk.json"
+    rule_file.write_text(json.dumps(RISK_RULES), encoding="utf-8")
+    rule_set = load_rule_file(rule_file)
+
+    features = rule_set.extract_features(frame, {"sensitive_path_weight": np.zeros(2)})
+    default = rule_set.evaluate(features)
+    retuned = rule_set.evaluate(features, params={"very_large_change_lines": 10_000, "high_file_spread": 1})
+
+    assert default["score"].tolist() == [80.0, 0.0]
+    assert retuned["score"].tolist() == [45.0, 30.0]
+    assert retuned["reasons"].tolist() == ["high_file_spread,addition_heavy", "high_file_spread"]
+    assert compile_rule_set(RISK_RULES).input_columns() >= {"additions", "deletions", "changed_files"}
+
+
+def test_rule_files_reject_unknown_columns(tmp_path) -> None:
+    rule_file = tmp_path / "trust.json"
+    rule_file.write_text(json.dumps(TRUST_RULES), encoding="utf-8")
+    assert load_rule_file(rule_file).name == "trust"
+
+    typo = {**TRUST_RULES, "rules": [{"name": "busy", "when": "coments > 5", "score": 5}]}
+    rule_file.write_text(json.dumps(typo), encoding="utf-8")
+    with pytest.raises(ValueError, match="coments"):
+        load_rule_file(rule_file)
+
+
+def test_rule_files_may_only_read_outputs_of_upstream_agents(tmp_path) -> None:
+    rule_file = tmp_path / "trust.json"
+    risky = {**TRUST_RULES, "rules": [{"name": "risky", "when": "risk_score > 0", "score": -50}]}
+    rule_file.write_text(json.dumps(risky), encoding="utf-8")
+    assert "risk_score" in load_rule_file(rule_file, agent="trust").input_columns()
+
+    # priority reads trust_score, so a trust rule on priority_score could only read 0.
+    ranked = {**TRUST_RULES, "rules": [{"name": "urgent", "when": "priority_score > 50", "score": 5}]}
+    rule_file.write_text(json.dumps(ranked), encoding="utf-8")
+    with pytest.raises(ValueError, match="priority_score"):
+        load_rule_file(rule_file, agent="trust")
+    assert load_rule_file(rule_file).name == "trust"
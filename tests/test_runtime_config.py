@@ -66,4 +66,15 @@ def test_load_settings_webhook_enabled_requires_url() -> None:
     )
     with patch("runtime_config._read_config_module", return_value=fake_module):
         with pytest.raises(ValueError):
-            load_settings()
\ No newline at end of file
+            load_settings()
+
+def test_load_settings_rejects_zero_freshness_weights() -> None:
+    fake_module = SimpleNamespace(
+        GITHUB_TOKEN="abc",
+        REPO_OWNER="owner",
+        REPO_NAME="repo",
+        FRESHNESS_MODEL={"idle_weight": 0, "age_weight": 0},
+    )
+    with patch("runtime_config._read_config_module", return_value=fake_module):
+        with pytest.raises(ValueError, match="idle_weight"):
+            load_settings()
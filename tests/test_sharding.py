@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from agents import ScanCache, run_agents
+from benchmarks.bench_pipeline import synthetic_pull_requests
+from ingestion.github_fetch import records_to_frame
+from sharding import (
+    assign_shards,
+    build_shard_job,
+    collect_shard_results,
+    local_agents,
+    reduce_shards,
+    score_sharded,
+    work_shards,
+    write_shard_plan,
+)
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _options() -> dict:
+    return {"priority": {"now": NOW}, "content_scan": {"cache": ScanCache()}}
+
+
+def test_assign_shards_hash_is_stable_and_range_is_contiguous() -> None:
+    numbers = np.arange(1, 101)
+    hashed = assign_shards(numbers, 4)
+    assert hashed.tolist() == assign_shards(numbers[::-1], 4)[::-1].tolist()
+    assert set(hashed.tolist()) == {0, 1, 2, 3}
+
+    ranged = assign_shards(numbers[::-1], 4, strategy="range")[::-1]
+    assert ranged.tolist() == [number * 4 // 100 for number in range(100)]
+
+
+def test_priority_and_dedupe_run_in_the_reduce_step() -> None:
+    assert {"dedupe", "priority"}.isdisjoint(local_agents())
+    assert {"trust", "risk", "content_scan"} <= set(local_agents())
+
+
+def test_sharded_scoring_matches_single_process_run(tmp_path) -> None:
+    frame = records_to_frame(synthetic_pull_requests(120, duplicate_rate=0.2))
+    expected = run_agents(frame.copy(), options=_options())
+    shard_ids = assign_shards(frame["pr_number"], 3)
+    duplicates = expected[expected["duplicate_count"] > 0]
+    # Title duplicates land in different shards, so the reduce step must see cross-shard pairs.
+    assert duplicates.groupby("cluster").apply(lambda group: len(set(shard_ids[group.index]))).max() > 1
+
+    for kwargs in ({}, {"workers": 2, "strategy": "range"}, {"work_dir": tmp_path}):
+        scored = score_sharded(frame.copy(), shards=3, options=_options(), **kwargs)
+        pd.testing.assert_frame_equal(scored[expected.columns], expected)
+
+
+def test_shards_scan_into_copies_and_the_reduce_step_saves_the_cache_once(tmp_path, monkeypatch) -> None:
+    frame = records_to_frame(synthetic_pull_requests(60, duplicate_rate=0.2))
+    saves: list = []
+    save = ScanCache.save
+    monkeypatch.setattr(ScanCache, "save", lambda cache: (saves.append(cache.path), save(cache)))
+    cache = ScanCache(tmp_path / "scan_cache.json")
+    options = {"priority": {"now": NOW}, "content_scan": {"cache": cache}}
+
+    score_sharded(frame, shards=3, options=options)
+    assert [path for path in saves if path is not None] == [cache.path]
+    assert cache.results and ScanCache(cache.path).results == cache.results
+
+
+def test_coordinators_sharing_a_work_dir_keep_separate_plans(tmp_path) -> None:
+    frames = [records_to_frame(synthetic_pull_requests(count, duplicate_rate=0.2)) for count in (40, 30)]
+    jobs = [build_shard_job(frame, shards=2, options=_options()) for frame in frames]
+    for job in jobs:
+        write_shard_plan(job, tmp_path)
+
+    assert sorted(work_shards(tmp_path)) == sorted((job.plan_id, shard) for job in jobs for shard in range(2))
+    for frame, job in zip(frames, jobs):
+        expected = run_agents(frame.copy(), options=_options())
+        scored = reduce_shards(job, collect_shard_results(job, tmp_path, poll_seconds=0.01))
+        pd.testing.assert_frame_equal(scored[expected.columns], expected)
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
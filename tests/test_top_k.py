@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from agents.columns import top_k_rows
+from memory.priority_queue import PersistentPriorityQueue
+
+
+def test_top_k_rows_matches_sort_values_head() -> None:
+    rng = np.random.default_rng(36)
+    df = pd.DataFrame(
+        {
+            "priority_score": rng.integers(0, 25, 2000).astype(float),
+            "risk_score": rng.integers(0, 6, 2000).astype(float),
+        }
+    )
+    for k in (0, 1, 30, 5000):
+        for ascending in ([False, True], [False, False]):
+            expected = df.sort_values(by=["priority_score", "risk_score"], ascending=ascending).head(k)
+            selected = top_k_rows(df, ["priority_score", "risk_score"], k, ascending=ascending)
+            assert list(selected.index) == list(expected.index)
+
+
+def test_priority_queue_updates_only_changed_prs(tmp_path) -> None:
+    queue = PersistentPriorityQueue(tmp_path / "queue.json")
+    frame = pd.DataFrame({"pr_number": [1, 2, 3], "priority_score": [60.0, 80.0, 60.0], "risk_score": [5.0, 0.0, 1.0]})
+    assert queue.update_from_frame(frame)["changed"] == 3
+    assert [item["pr_number"] for item in queue.top(3)] == [2, 3, 1]
+    queue.save()
+
+    reloaded = PersistentPriorityQueue(tmp_path / "queue.json")
+    assert reloaded.top(3) == queue.top(3)
+    frame.loc[frame["pr_number"] == 1, "priority_score"] = 95.0
+    summary = reloaded.update_from_frame(frame[frame["pr_number"] != 3], prune=True)
+    assert summary == {"changed": 1, "removed": 1, "size": 2}
+    assert [item["pr_number"] for item in reloaded.top(5)] == [1, 2]
@@ -0,0 +1,112 @@
+"""Parity checks between the vectorised scorers and the original row-by-row logic."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from agents.deception_agent import SENSITIVE_FILE_HINTS, calculate_risk
+from agents.prioritization_agent import PriorityWeights, calculate_priority
+from agents.trust_agent import calculate_trust
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(100.0, value))
+
+
+def _reference_trust(pr_df: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for _, pr in pr_df.iterrows():
+        score = 50.0
+        changes = float(pr.get("additions", 0)) + float(pr.get("deletions", 0))
+        engagement = float(pr.get("comments", 0)) + float(pr.get("review_comments", 0))
+        score += 12 if changes < 600 else 0
+        score -= 20 if changes > 3000 else 0
+        score += 10 if engagement >= 5 else 0
+        score -= 8 if engagement == 0 else 0
+        score = _clamp(score)
+        band = "high" if score >= 70 else "medium" if score >= 45 else "low"
+        rows.append({"pr_number": int(pr["pr_number"]), "trust_score": round(score, 2), "trust_band": band})
+    return pd.DataFrame(rows)
+
+
+def _reference_risk(pr_df: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for _, pr in pr_df.iterrows():
+        additions, deletions = float(pr.get("additions", 0)), float(pr.get("deletions", 0))
+        score = 0.0
+        score += 35 if additions + deletions > 4000 else 0
+        score += 30 if float(pr.get("changed_files", 0)) > 70 else 0
+        score += 15 if additions > deletions * 4 and additions > 1000 else 0
+        names = [str(item.get("filename", "")).lower() for item in pr.get("files", [])]
+        score += 20 if any(token in name for name in names for token in SENSITIVE_FILE_HINTS) else 0
+        score = _clamp(score)
+        band = "high" if score >= 50 else "medium" if score >= 20 else "low"
+        rows.append({"pr_number": int(pr["pr_number"]), "risk_score": round(score, 2), "risk_band": band})
+    return pd.DataFrame(rows)
+
+
+def _reference_priority(df: pd.DataFrame, weights: PriorityWeights) -> pd.DataFrame:
+    rows = []
+    for _, row in df.iterrows():
+        trust, risk = _clamp(float(row.get("trust_score", 50.0))), _clamp(float(row.get("risk_score", 0.0)))
+        dedupe = _clamp(float(row.get("dedupe_score", 0.0)))
+        comments = float(row.get("comments", 0)) + float(row.get("review_comments", 0))
+        bonus = 20.0 if comments >= 4 else 10.0 if comments >= 1 else 0.0
+        freshness = _clamp(50.0 + bonus - (15.0 if float(row.get("changed_files", 0)) > 70 else 0.0))
+        composite = _clamp(
+            weights.trust_weight * trust
+            + weights.risk_weight * (100.0 - risk)
+            + weights.dedupe_weight * (100.0 - dedupe)
+            + weights.freshness_weight * freshness
+        )
+        flags = [(trust >= 70, "high_trust"), (risk >= 50, "high_risk"), (dedupe >= 60, "possible_duplicate")]
+        reasons = [name for hit, name in flags + [(freshness >= 60, "active_discussion")] if hit]
+        bucket = "critical" if composite >= 80 else "high" if composite >= 60 else "medium" if composite >= 40 else "low"
+        rows.append(
+            {
+                "pr_number": int(row["pr_number"]),
+                "priority_score": round(composite, 2),
+                "priority_bucket": bucket,
+                "priority_reasons": ",".join(reasons or ["balanced_profile"]),
+            }
+        )
+    out = pd.DataFrame(rows).sort_values(by=["priority_score", "pr_number"], ascending=[False, True])
+    out["priority_rank"] = range(1, len(out) + 1)
+    return out[["pr_number", "priority_score", "priority_bucket", "priority_rank", "priority_reasons"]]
+
+
+def _random_frame(rows: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(29)
+    filenames = ["src/app.py", "src/auth/login.py", ".github/workflows/ci.yml", "docs/index.md"]
+    return pd.DataFrame(
+        {
+            "pr_number": rng.permutation(rows) + 1,
+            "additions": rng.integers(0, 6000, rows),
+            "deletions": rng.integers(0, 2000, rows),
+            "changed_files": rng.integers(0, 120, rows),
+            "comments": rng.integers(0, 8, rows),
+            "review_comments": rng.integers(0, 4, rows),
+            "files": [[{"filename": name} for name in rng.choice(filenames, rng.integers(0, 3))] for _ in range(rows)],
+            "trust_score": np.where(rng.random(rows) < 0.05, np.nan, rng.uniform(-10, 110, rows)),
+            "risk_score": rng.choice([0.0, 15.0, 35.0, 50.0, 85.0, 100.0], rows),
+            "dedupe_score": rng.uniform(0, 100, rows).round(2),
+        }
+    )
+
+
+def test_trust_and_risk_match_row_wise_reference() -> None:
+    df = _random_frame()
+
+    pd.testing.assert_frame_equal(calculate_trust(df), _reference_trust(df), check_exact=True)
+    pd.testing.assert_frame_equal(calculate_risk(df), _reference_risk(df), check_exact=True)
+
+
+def test_priority_matches_row_wise_reference() -> None:
+    df = _random_frame()
+    weights = PriorityWeights(trust_weight=0.37, risk_weight=0.29, dedupe_weight=0.17, freshness_weight=0.17)
+
+    for selected in (PriorityWeights(), weights):
+        pd.testing.assert_frame_equal(
+            calculate_priority(df, weights=selected), _reference_priority(df, selected), check_exact=True
+        )
@@ -4,7 +4,10 @@ import json
 from pathlib import Path
 from unittest.mock import patch
 
-from outputs.webhook_delivery import deliver_webhook_payloads
+import pytest
+import requests
+
+from outputs.webhook_delivery import WebhookDeliveryError, deliver_webhook_payloads, require_delivered
 
 
 def _write_payload(path: Path, name: str) -> Path:
@@ -53,4 +56,21 @@ def test_delivery_live_success(tmp_path) -> None:
 
     assert mocked_post.call_count == 1
     assert result["delivered"] == 1
-    assert result["errors"] == 0
\ No newline at end of file
+    assert result["errors"] == 0
+
+def test_failed_delivery_fails_the_stage(tmp_path) -> None:
+    payloads = {"slack": _write_payload(tmp_path, "slack")}
+    with patch("outputs.webhook_delivery.requests.Session.post", side_effect=requests.ConnectionError("down")), patch(
+        "outputs.webhook_delivery.time.sleep"
+    ):
+        result = deliver_webhook_payloads(
+            payloads,
+            {"slack": "https://example.com"},
+            enabled=True,
+            shadow_mode=False,
+            allow_in_shadow_mode=False,
+        )
+
+    assert result["errors"] == 1
+    with pytest.raises(WebhookDeliveryError, match="slack"):
+        require_delivered(result)